@@ -0,0 +1,722 @@
+#!/usr/bin/env python
+"""Make the generated modules use the shared runtime of module_utils/vmware_rest.py.
+
+The content builder templates put the connection options, the session setup
+and the request logic in every module. This script replaces them with
+connection_argument_spec(), run_module(), info_entry_point() and
+operation_entry_point(), so a change to the runtime is done once in
+module_utils.
+The documentation of the connection options comes from the
+vmware.vmware_rest.connection doc fragment.
+
+The options that info_entry_point() implements on top of the API, like
+include_details, are not in the API specifications. They are listed in
+info_module_options.yml and added to the modules here.
+"""
+import ast
+import json
+import os
+import re
+import sys
+
+import yaml
+
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+NEW_MODULE_PATH = f"{SCRIPT_DIR}/output/plugins/modules"
+INFO_MODULE_OPTIONS_PATH = f"{SCRIPT_DIR}/info_module_options.yml"
+
+# The options of connection_argument_spec()
+CONNECTION_OPTIONS = [
+    "session_cache",
+    "session_cache_ttls",
+    "session_connection_limit",
+    "session_connection_limit_per_host",
+    "session_dns_cache_ttl",
+    "session_keepalive_timeout",
+    "session_retries",
+    "session_retry_backoff",
+    "session_timeout",
+    "session_timings",
+    "session_token_cache",
+    "vcenter_hostname",
+    "vcenter_password",
+    "vcenter_rest_log_file",
+    "vcenter_username",
+    "vcenter_validate_certs",
+]
+
+# The code generated by the info_*_module.j2 templates, the modules that still
+# match it use info_entry_point() instead.
+INFO_NO_LIST = """
+def build_url(params):
+    return ("https://{vcenter_hostname}" "%(get)s").format(**params)
+
+
+async def entry_point(module, session):
+    return await _info(module.params, session)
+
+
+async def _info(params, session):
+    payload_format = list(PAYLOAD_FORMAT.values())[0]
+    _in_query_parameters = payload_format["query"].keys()
+    _url = ("https://{vcenter_hostname}" "%(get)s").format(
+        **params
+    ) + gen_args(params, _in_query_parameters)
+    async with session.get(_url, **session_timeout(params)) as resp:
+        try:
+            if resp.headers["Content-Type"] == "application/json":
+                _json = await resp.json()
+        except KeyError:
+            _json = {}
+        return await update_changed_flag(_json, resp.status, "get")
+"""
+
+INFO_LIST_AND_GET = """
+def build_url(params):
+    import yarl
+
+    if params.get("%(id)s"):
+        _in_query_parameters = PAYLOAD_FORMAT["get"]["query"].keys()
+        return yarl.URL(
+            ("https://{vcenter_hostname}" "%(get)s").format(**params)
+            + params["%(id)s"]
+            + gen_args(params, _in_query_parameters),
+            encoded=True,
+        )
+    _in_query_parameters = PAYLOAD_FORMAT["list"]["query"].keys()
+    return yarl.URL(
+        ("https://{vcenter_hostname}" "%(list)s").format(**params)
+        + gen_args(params, _in_query_parameters),
+        encoded=True,
+    )
+
+
+async def entry_point(module, session):
+    url = build_url(module.params)
+    async with session.get(url, **session_timeout(module.params)) as resp:
+        _json = await resp.json()
+
+        if "value" not in _json:  # 7.0.2+
+            _json = {"value": _json}
+
+        if module.params.get("%(id)s"):
+            _json["id"] = module.params.get("%(id)s")
+        elif module.params.get("label"):  # TODO extend the list of filter
+            _json = await exists(module.params, session, str(url))
+        elif (
+            isinstance(_json["value"], list)
+            and len(_json["value"]) > 0
+            and isinstance(_json["value"][0], str)
+        ):
+            # this is a list of id, we fetch the details
+            full_device_list = await build_full_device_list(session, str(url), _json)
+            _json = {"value": [i["value"] for i in full_device_list]}
+
+        return await update_changed_flag(_json, resp.status, "get")
+"""
+
+INFO_LIST = """
+def build_url(params):
+    import yarl
+
+    _in_query_parameters = PAYLOAD_FORMAT["list"]["query"].keys()
+    return yarl.URL(
+        ("https://{vcenter_hostname}" "%(list)s").format(**params)
+        + gen_args(params, _in_query_parameters),
+        encoded=True,
+    )
+
+
+async def entry_point(module, session):
+    url = build_url(module.params)
+    async with session.get(url, **session_timeout(module.params)) as resp:
+        _json = await resp.json()
+
+        if "value" not in _json:  # 7.0.2+
+            _json = {"value": _json}
+
+        return await update_changed_flag(_json, resp.status, "get")
+"""
+
+INFO_ENTRY_POINT = """async def entry_point(module, session):
+    return await info_entry_point(module, session, RESOURCE, PAYLOAD_FORMAT)
+"""
+
+# The code generated by default_module.j2, the modules whose code is made of
+# these functions use operation_entry_point() instead.
+DEFAULT_BUILD_URL = """
+def build_url(params):
+    return ("https://{vcenter_hostname}" "%(url)s").format(**params)
+"""
+
+DEFAULT_ENTRY_POINT = """
+async def entry_point(module, session):
+    if module.params["state"] == "present":
+        if "_create" in globals():
+            operation = "create"
+        else:
+            operation = "update"
+    elif module.params["state"] == "absent":
+        operation = "delete"
+    else:
+        operation = module.params["state"]
+
+    func = globals()["_" + operation]
+
+    return await func(module.params, session)
+"""
+
+DEFAULT_SINGLE_ENTRY_POINT = """
+async def entry_point(module, session):
+    func = globals()["_%(name)s"]
+
+    return await func(module.params, session)
+"""
+
+DEFAULT_SUBDEVICE = """
+    _in_query_parameters = PAYLOAD_FORMAT["%(name)s"]["query"].keys()
+    payload = prepare_payload(params, PAYLOAD_FORMAT["%(name)s"])
+    subdevice_type = get_subdevice_type("%(path)s")
+    if subdevice_type and not params[subdevice_type]:
+        _json = await exists(params, session, build_url(params))
+        if _json:
+            params[subdevice_type] = _json["id"]
+    _url = ("https://{vcenter_hostname}" "%(path)s").format(
+        **params
+    ) + gen_args(params, _in_query_parameters)
+"""
+
+DEFAULT_ACTION = (
+    """
+async def _%(name)s(params, session):"""
+    + DEFAULT_SUBDEVICE
+    + """
+    async with session.%(method)s(_url, json=payload, **session_timeout(params)) as resp:
+        try:
+            if resp.headers["Content-Type"] == "application/json":
+                _json = await resp.json()
+        except KeyError:
+            _json = {}
+        if "value" not in _json:  # 7.0.2
+            _json = {"value": _json}
+
+        return await update_changed_flag(_json, resp.status, "%(name)s")
+"""
+)
+
+DEFAULT_DELETE = (
+    """
+async def _%(name)s(params, session):"""
+    + DEFAULT_SUBDEVICE
+    + """
+    async with session.%(method)s(_url, json=payload, **session_timeout(params)) as resp:
+        try:
+            if resp.headers["Content-Type"] == "application/json":
+                _json = await resp.json()
+        except KeyError:
+            _json = {}
+        return await update_changed_flag(_json, resp.status, "%(name)s")
+"""
+)
+
+DEFAULT_SET = (
+    """
+async def _%(name)s(params, session):"""
+    + DEFAULT_SUBDEVICE
+    + """
+    async with session.get(_url, json=payload, **session_timeout(params)) as resp:
+        before = await resp.json()
+
+    async with session.%(method)s(_url, json=payload, **session_timeout(params)) as resp:
+        try:
+            if resp.headers["Content-Type"] == "application/json":
+                _json = await resp.json()
+        except KeyError:
+            _json = {}
+        if "value" not in _json:  # 7.0.2
+            _json = {"value": _json}
+
+        # The PUT answer does not let us know if the resource has actually been
+        # modified
+        if resp.status < 300:
+            async with session.get(
+                _url, json=payload, **session_timeout(params)
+            ) as resp_get:
+                after = await resp_get.json()
+                if before == after:
+                    return await update_changed_flag(after, resp_get.status, "get")
+        return await update_changed_flag(_json, resp.status, "%(name)s")
+"""
+)
+
+DEFAULT_UPDATE = """
+async def _%(name)s(params, session):
+    payload = prepare_payload(params, PAYLOAD_FORMAT["%(name)s"])
+    _url = ("https://{vcenter_hostname}" "%(path)s").format(**params)
+    async with session.get(_url, **session_timeout(params)) as resp:
+        _json = await resp.json()
+        if "value" in _json:
+            value = _json["value"]
+        else:  # 7.0.2 and greater
+            value = _json
+        for k, v in value.items():
+            if k in payload:
+                if isinstance(payload[k], dict) and isinstance(v, dict):
+                    to_delete = True
+                    for _k in list(payload[k].keys()):
+                        if payload[k][_k] != v.get(_k):
+                            to_delete = False
+                    if to_delete:
+                        del payload[k]
+                elif payload[k] == v:
+                    del payload[k]
+                elif payload[k] == {}:
+                    del payload[k]
+
+        if payload == {} or payload == {"spec": {}}:
+            # Nothing has changed
+            if "value" not in _json:  # 7.0.2
+                _json = {"value": _json}
+            _json["id"] = params.get("%(id)s")
+            return await update_changed_flag(_json, resp.status, "get")
+    async with session.%(method)s(_url, json=payload, **session_timeout(params)) as resp:
+        try:
+            if resp.headers["Content-Type"] == "application/json":
+                _json = await resp.json()
+        except KeyError:
+            _json = {}
+        if "value" not in _json:  # 7.0.2
+            _json = {"value": _json}
+
+        # e.g: content_configuration
+        if not _json and resp.status == 204:
+            async with session.get(_url, **session_timeout(params)) as resp_get:
+                _json_get = await resp_get.json()
+                if _json_get:
+                    _json = _json_get
+
+        _json["id"] = params.get("%(id)s")
+        return await update_changed_flag(_json, resp.status, "%(name)s")
+"""
+
+DEFAULT_CREATE_LOOKUP_FILTER = """
+        if "%(lookup_filter)s" not in params:
+            return
+        search_filter = f"&%(lookup_filter)ss={params.get('%(lookup_filter)s')}"
+"""
+
+DEFAULT_CREATE_LOOKUP_WITH_FILTERS = """
+    async def lookup_with_filters(params, session, url):
+        search_filter = ""
+%(filter)s
+        if "name" not in params:
+            return
+        async with session.get(f"{url}?names={params['name']}{search_filter}") as resp:
+            _json = await resp.json()
+            if isinstance(_json, list) and len(_json) == 1:
+                return await get_device_info(session, url, _json[0]["%(id)s"])
+"""
+
+DEFAULT_CREATE_FIND = """
+    lookup_url = per_id_url = build_url(params)
+    uniquity_keys = %(uniquity_keys)s
+    comp_func = None
+%(lookup_with_filters)s
+    _json = None
+
+    if params["%(id)s"]:
+        _json = await get_device_info(session, build_url(params), params["%(id)s"])
+
+    if not _json and (uniquity_keys or comp_func):
+        _json = await exists(
+            params,
+            session,
+            url=lookup_url,
+            uniquity_keys=uniquity_keys,
+            per_id_url=per_id_url,
+            comp_func=comp_func,
+        )
+%(call_lookup_with_filters)s
+    if _json:
+        if "value" not in _json:  # 7.0.2+
+            _json = {"value": _json}
+        if "_update" in globals():
+            params["%(id)s"] = _json["id"]
+            return await globals()["_update"](params, session)
+
+        return await update_changed_flag(_json, 200, "get")
+"""
+
+DEFAULT_CREATE = """
+async def _%(name)s(params, session):
+%(find)s
+    payload = prepare_payload(params, PAYLOAD_FORMAT["%(name)s"])
+    _url = ("https://{vcenter_hostname}" "%(path)s").format(**params)
+    async with session.%(method)s(_url, json=payload, **session_timeout(params)) as resp:
+        if resp.status == 500:
+            text = await resp.text()
+            raise EmbeddedModuleFailure(
+                f"Request has failed: status={resp.status}, {text}"
+            )
+        try:
+            if resp.headers["Content-Type"] == "application/json":
+                _json = await resp.json()
+        except KeyError:
+            _json = {}
+
+        if (resp.status in [200, 201]) and "error" not in _json:
+            if isinstance(_json, str):  # 7.0.2 and greater
+                _id = _json  # TODO: fetch the object
+            elif isinstance(_json, dict) and "value" not in _json:
+                _id = list(_json["value"].values())[0]
+            elif isinstance(_json, dict) and "value" in _json:
+                _id = _json["value"]
+            _json_device_info = await get_device_info(session, _url, _id)
+            if _json_device_info:
+                _json = _json_device_info
+
+        return await update_changed_flag(_json, resp.status, "%(name)s")
+"""
+
+OPERATION_ENTRY_POINT = """async def entry_point(module, session):
+    return await operation_entry_point(module, session, RESOURCE, PAYLOAD_FORMAT)
+"""
+
+MODULE_UTILS_IMPORT_RE = re.compile(
+    r"from ansible_collections\.vmware\.vmware_rest\.plugins\.module_utils\.vmware_rest import \(\n(.*?)\)\n",
+    re.S,
+)
+
+PAYLOAD_FORMAT_END = "}  # pylint: disable=line-too-long\n"
+
+
+def info_resource(code):
+    """Return the RESOURCE of an info module if its code is the stock template one."""
+    urls = re.findall(r'"https://\{vcenter_hostname\}"\s*"([^"]*)"', code)
+    if "_info(module.params" in code:
+        resource = {"get": urls[0]}
+        template = INFO_NO_LIST
+    elif 'PAYLOAD_FORMAT["get"]' in code:
+        resource = {
+            "list": urls[1],
+            "get": urls[0],
+            "id": re.findall(r'if params.get\("(\w+)"\)', code)[0],
+        }
+        template = INFO_LIST_AND_GET
+    else:
+        resource = {"list": urls[0]}
+        template = INFO_LIST
+    if ast.dump(ast.parse(template % resource)) != ast.dump(ast.parse(code)):
+        return None
+    return resource
+
+
+def default_create(resource, name, path, method):
+    find = "    uniquity_keys = []\n"
+    if "id" in resource:
+        lookup_with_filters = call_lookup_with_filters = ""
+        if "lookup_filter" in resource:
+            _filter = ""
+            if resource["lookup_filter"]:
+                _filter = DEFAULT_CREATE_LOOKUP_FILTER % resource
+            lookup_with_filters = DEFAULT_CREATE_LOOKUP_WITH_FILTERS % dict(
+                resource, filter=_filter
+            )
+            call_lookup_with_filters = """
+    if not _json:
+        _json = await lookup_with_filters(params, session, build_url(params))
+"""
+        find = DEFAULT_CREATE_FIND % dict(
+            resource,
+            lookup_with_filters=lookup_with_filters,
+            call_lookup_with_filters=call_lookup_with_filters,
+        )
+    return DEFAULT_CREATE % {
+        "name": name,
+        "path": path,
+        "method": method,
+        "find": find,
+    }
+
+
+def default_code(resource, single):
+    """Return the code default_module.j2 generates for ``resource``."""
+    code = DEFAULT_BUILD_URL % resource
+    if single:
+        code += DEFAULT_SINGLE_ENTRY_POINT % {
+            "name": next(iter(resource["operations"]))
+        }
+    else:
+        code += DEFAULT_ENTRY_POINT
+    templates = {
+        "action": DEFAULT_ACTION,
+        "delete": DEFAULT_DELETE,
+        "set": DEFAULT_SET,
+        "update": DEFAULT_UPDATE,
+    }
+    for name, (template, method, path) in resource["operations"].items():
+        if template == "create":
+            code += default_create(resource, name, path, method)
+        else:
+            code += templates[template] % {
+                "name": name,
+                "path": path,
+                "method": method,
+                "id": resource.get("id"),
+            }
+    return code
+
+
+def operation(function, resource):
+    """Return the (template, HTTP method, path) of an operation function, and
+    store the identifier and the uniquity keys it uses in ``resource``."""
+    urls = []
+    methods = []
+    for node in ast.walk(function):
+        if (
+            isinstance(node, ast.Constant)
+            and isinstance(node.value, str)
+            and node.value.startswith("https://{vcenter_hostname}")
+        ):
+            urls.append(node.value[len("https://{vcenter_hostname}") :])
+        elif (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name)
+            and node.func.value.id == "session"
+            and node.args
+            and isinstance(node.args[0], ast.Name)
+            and node.args[0].id == "_url"
+            and any(k.arg == "json" for k in node.keywords)
+        ):
+            methods.append(node.func.attr)
+        elif (
+            isinstance(node, ast.Assign)
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == "uniquity_keys"
+        ):
+            resource["uniquity_keys"] = ast.literal_eval(node.value)
+        elif (
+            isinstance(node, ast.Compare)
+            and isinstance(node.ops[0], ast.NotIn)
+            and isinstance(node.left, ast.Constant)
+            and node.left.value != "name"
+            and isinstance(node.comparators[0], ast.Name)
+            and node.comparators[0].id == "params"
+        ):
+            resource["lookup_filter"] = node.left.value
+        elif (
+            isinstance(node, ast.AsyncFunctionDef)
+            and node.name == "lookup_with_filters"
+        ):
+            resource.setdefault("lookup_filter", "")
+    code = ast.unparse(function)
+    ids = re.findall(r"params\.get\('(\w+)'\)|params\['(\w+)'\] = _json\['id'\]", code)
+    for _id in ids:
+        _id = _id[0] or _id[1]
+        if _id not in ("None", resource.get("lookup_filter")):
+            resource["id"] = _id
+    if not urls or not methods:
+        return None
+    if "uniquity_keys" in code:
+        template = "create"
+    elif "before" in code:
+        template = "set"
+    elif "to_delete" in code:
+        template = "update"
+    elif "'value' not in _json" in code:
+        template = "action"
+    else:
+        template = "delete"
+    # the set operations also read the resource before and after the change
+    method = next((m for m in methods if m != "get"), "get")
+    return template, method, urls[-1]
+
+
+def default_resource(code):
+    """Return the RESOURCE of a module if its code is the stock default_module.j2 one."""
+    functions = ast.parse(code).body
+    if [f.name for f in functions[:2]] != ["build_url", "entry_point"]:
+        return None
+    urls = re.findall(r'"https://\{vcenter_hostname\}"\s*"([^"]*)"', code)
+    resource = {"url": urls[0], "operations": {}}
+    for function in functions[2:]:
+        if not isinstance(function, ast.AsyncFunctionDef):
+            return None
+        _operation = operation(function, resource)
+        if not _operation:
+            return None
+        resource["operations"][function.name[1:]] = _operation
+    single = '"state"' not in ast.get_source_segment(code, functions[1])
+    expected = default_code(resource, single)
+    if ast.dump(ast.parse(expected)) != ast.dump(ast.parse(code)):
+        return None
+    keys = ("url", "id", "uniquity_keys", "lookup_filter", "operations")
+    return {k: resource[k] for k in keys if k in resource}
+
+
+def literal(value):
+    """Return the Python code of a value, with the double quotes of black."""
+    if isinstance(value, tuple):
+        return "(" + ", ".join(literal(v) for v in value) + ")"
+    if isinstance(value, dict):
+        return (
+            "{"
+            + ", ".join(f"{literal(k)}: {literal(v)}" for k, v in value.items())
+            + "}"
+        )
+    return json.dumps(value)
+
+
+def format_resource(resource):
+    items = [f'"{k}": {literal(v)}' for k, v in resource.items()]
+    line = "RESOURCE = {" + ", ".join(items) + "}"
+    if len(line) <= 88:
+        return line + "\n"
+    return "RESOURCE = {\n" + "".join(f"    {i},\n" for i in items) + "}\n"
+
+
+def remove_connection_options(content):
+    """Document the connection options with the doc fragment."""
+    start = content.index("\noptions:\n") + len("\noptions:\n")
+    end = re.search(r"^\S", content[start:], re.M).start() + start
+    options = re.split(r"(?m)^(?=    \w+:\n)", content[start:end])
+    kept = "".join(
+        option
+        for option in options
+        if option and re.match(r"    (\w+):", option).group(1) not in CONNECTION_OPTIONS
+    )
+    if kept:
+        content = content[:start] + kept + content[end:]
+    else:
+        content = content[: start - len("options:\n")] + content[end:]
+    return content.replace(
+        "\nauthor:\n",
+        "\nextends_documentation_fragment:\n- vmware.vmware_rest.connection\nauthor:\n",
+        1,
+    )
+
+
+def add_options(content, options):
+    """Add the options of info_module_options.yml to a module.
+
+    The options are inserted in alphabetical order, like the generated ones,
+    in DOCUMENTATION and in prepare_argument_spec().
+    """
+    for name, option in sorted(options.items()):
+        start = content.index("\noptions:\n") + len("\noptions:\n")
+        end = re.search(r"^\S", content[start:], re.M).start() + start
+        documentation = f"    {name}:\n" + "".join(
+            f"        {line}\n" for line in option["documentation"].splitlines()
+        )
+        position = end
+        for m in re.finditer(r"^    (\w+):\n", content[start:end], re.M):
+            if m.group(1) > name:
+                position = start + m.start()
+                break
+        content = content[:position] + documentation + content[position:]
+
+        spec = f'    argument_spec["{name}"] = {option["argument_spec"]!r}\n'
+        position = content.index("\n    return argument_spec\n") + 1
+        for m in re.finditer(r'^    argument_spec\["(\w+)"\] = ', content, re.M):
+            if m.group(1) > name:
+                position = m.start()
+                break
+        content = content[:position] + spec + content[position:]
+    return content
+
+
+def use_shared_runtime(content, options=None):
+    content = remove_connection_options(content)
+    content = re.sub(
+        r"    argument_spec = \{\n        \"vcenter_hostname\".*?\n    \}\n",
+        "    argument_spec = connection_argument_spec()\n",
+        content,
+        count=1,
+        flags=re.S,
+    )
+    content = re.sub(
+        r'    if not module\.params\["vcenter_hostname"\]:\n.*?    module\.exit_json\(\*\*result\)\n',
+        "    await run_module(module, entry_point)\n",
+        content,
+        count=1,
+        flags=re.S,
+    )
+    new_names = {"connection_argument_spec", "run_module"}
+
+    m = re.search(
+        r"^# template: info_\w+_module\.j2\n(.*?)(?=\n\nif __name__)",
+        content,
+        re.S | re.M,
+    )
+    resource = m and info_resource(m.group(1))
+    if resource:
+        content = content[: m.start(1)] + INFO_ENTRY_POINT + content[m.end(1) :]
+        end = content.index(PAYLOAD_FORMAT_END) + len(PAYLOAD_FORMAT_END)
+        content = (
+            content[:end]
+            + "\n# The end-points of the module, see info_url() in module_utils\n"
+            + format_resource(resource)
+            + content[end:]
+        )
+        new_names.add("info_entry_point")
+        if options:
+            content = add_options(content, options)
+
+    m = re.search(
+        r"^# template: default_module\.j2\n(.*?)(?=\n\nif __name__)",
+        content,
+        re.S | re.M,
+    )
+    resource = m and default_resource(m.group(1))
+    if resource:
+        content = content[: m.start(1)] + OPERATION_ENTRY_POINT + content[m.end(1) :]
+        end = content.index(PAYLOAD_FORMAT_END) + len(PAYLOAD_FORMAT_END)
+        content = (
+            content[:end]
+            + "\n# The end-points of the module, see operation_entry_point() in module_utils\n"
+            + format_resource(resource)
+            + content[end:]
+        )
+        new_names.add("operation_entry_point")
+
+    # only import what the module still uses
+    m = MODULE_UTILS_IMPORT_RE.search(content)
+    rest = content[: m.start()] + content[m.end() :]
+    names = [i.strip().rstrip(",") for i in m.group(1).split("\n") if i.strip()]
+    names = sorted({i for i in names if re.search(rf"\b{i}\b", rest)} | new_names)
+    content = (
+        content[: m.start()]
+        + "from ansible_collections.vmware.vmware_rest.plugins.module_utils.vmware_rest import (\n"
+        + "".join(f"    {i},\n" for i in names)
+        + ")\n"
+        + content[m.end() :]
+    )
+    if content.count("env_fallback") == 1:
+        content = content.replace(
+            "from ansible.module_utils.basic import env_fallback\n\n", ""
+        )
+    if content.count("EmbeddedModuleFailure") == 1:
+        content = content.replace(
+            "    from ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions import (\n"
+            "        EmbeddedModuleFailure,\n"
+            "    )\n",
+            "",
+        )
+    return content
+
+
+if __name__ == "__main__":
+    module_path = sys.argv[1] if len(sys.argv) > 1 else NEW_MODULE_PATH
+    with open(INFO_MODULE_OPTIONS_PATH, "r") as f:
+        info_module_options = yaml.safe_load(f)
+    for module in sorted(os.listdir(module_path)):
+        if not module.endswith(".py"):
+            continue
+        path = os.path.join(module_path, module)
+        with open(path, "r") as f:
+            content = f.read()
+        options = info_module_options.get(module[:-3])
+        with open(path, "w") as f:
+            f.write(use_shared_runtime(content, options))
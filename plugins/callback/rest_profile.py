@@ -0,0 +1,201 @@
+# Copyright: (c) 2021, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = r"""
+name: rest_profile
+type: aggregate
+short_description: Profile the vCenter REST requests of a playbook run
+description:
+  - Aggregate the REST statistics returned by the vmware.vmware_rest modules over a whole playbook run.
+  - At the end of the run, display the endpoints that got the most requests and the tasks that did the most
+    round-trips, and optionally write a JSON report.
+  - The modules only return their statistics when their C(session_timings) option is enabled, for instance
+    with the E(VMWARE_SESSION_TIMINGS=true) environment variable.
+author:
+  - Ansible Cloud Team (@ansible-collections)
+version_added: 4.2.0
+requirements:
+  - enable in configuration
+options:
+  output_file:
+    description:
+      - Path of the JSON report written at the end of the run.
+      - No report is written if the option is not set.
+    type: path
+    env:
+      - name: VMWARE_REST_PROFILE_OUTPUT_FILE
+    ini:
+      - section: callback_rest_profile
+        key: output_file
+  top:
+    description:
+      - Number of endpoints and of tasks to display.
+    type: int
+    default: 10
+    env:
+      - name: VMWARE_REST_PROFILE_TOP
+    ini:
+      - section: callback_rest_profile
+        key: top
+"""
+
+
+EXAMPLES = r"""
+# ansible.cfg
+# [defaults]
+# callbacks_enabled = vmware.vmware_rest.rest_profile
+#
+# [callback_rest_profile]
+# output_file = /tmp/vmware_rest_profile.json
+
+# Then run the playbook with the statistics enabled in the modules:
+# VMWARE_SESSION_TIMINGS=true ansible-playbook site.yml
+"""
+
+
+import json
+
+from ansible.plugins.callback import CallbackBase
+from ansible_collections.vmware.vmware_rest.plugins.module_utils.vmware_rest import (
+    TIMING_HISTOGRAM_BUCKETS,
+)
+
+
+def histogram_percentile(histogram, q):
+    """Return the upper bound of the bucket of the ``q`` percentile."""
+    total = sum(histogram)
+    if not total:
+        return None
+    seen = 0
+    for bound, count in zip(TIMING_HISTOGRAM_BUCKETS, histogram):
+        seen += count
+        if seen >= q * total:
+            return bound
+    return float("inf")
+
+
+def format_bound(bound):
+    if bound is None:
+        return "-"
+    if bound == float("inf"):
+        return f">{TIMING_HISTOGRAM_BUCKETS[-1]}ms"
+    return f"<={bound}ms"
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "vmware.vmware_rest.rest_profile"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self.endpoints = {}
+        self.tasks = {}
+
+    def _record(self, task, host, result):
+        timings = result.get("_rest_timings")
+        if timings is None:
+            return
+        stats = self.tasks.setdefault(
+            task._uuid,
+            {
+                "task": task.get_name(),
+                "path": task.get_path(),
+                "hosts": [],
+                "requests": 0,
+                "bytes": 0,
+                "retries": 0,
+            },
+        )
+        if host not in stats["hosts"]:
+            stats["hosts"].append(host)
+        stats["retries"] += result.get("session_retries", 0)
+        for endpoint, endpoint_stats in timings.items():
+            stats["requests"] += endpoint_stats["count"]
+            stats["bytes"] += endpoint_stats["bytes"]
+            total = self.endpoints.setdefault(
+                endpoint,
+                {
+                    "count": 0,
+                    "bytes": 0,
+                    "histogram": [0] * (len(TIMING_HISTOGRAM_BUCKETS) + 1),
+                },
+            )
+            total["count"] += endpoint_stats["count"]
+            total["bytes"] += endpoint_stats["bytes"]
+            total["histogram"] = [
+                a + b for a, b in zip(total["histogram"], endpoint_stats["histogram"])
+            ]
+
+    def _on_result(self, result):
+        results = result._result.get("results")
+        if not isinstance(results, list):
+            results = [result._result]
+        for item in results:
+            if isinstance(item, dict):
+                self._record(result._task, result._host.get_name(), item)
+
+    def v2_runner_on_ok(self, result):
+        self._on_result(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._on_result(result)
+
+    def report(self):
+        endpoints = {}
+        for endpoint, stats in self.endpoints.items():
+            endpoints[endpoint] = dict(stats)
+            for name, q in (("p50", 0.5), ("p95", 0.95)):
+                endpoints[endpoint][name] = format_bound(
+                    histogram_percentile(stats["histogram"], q)
+                )
+        return {
+            "histogram_buckets": list(TIMING_HISTOGRAM_BUCKETS),
+            "endpoints": endpoints,
+            "tasks": sorted(
+                self.tasks.values(), key=lambda i: i["requests"], reverse=True
+            ),
+        }
+
+    def v2_playbook_on_stats(self, stats):
+        top = self.get_option("top")
+        self._display.banner("VMWARE REST PROFILE")
+        if not self.tasks:
+            self._display.display(
+                "No REST statistics were returned, enable the session_timings option "
+                "of the modules, e.g: VMWARE_SESSION_TIMINGS=true"
+            )
+            return
+
+        report = self.report()
+        self._display.display("Hottest endpoints:")
+        hottest = sorted(
+            report["endpoints"].items(), key=lambda i: i[1]["count"], reverse=True
+        )
+        for endpoint, endpoint_stats in hottest[:top]:
+            self._display.display(
+                "  {count:>7} requests {bytes:>12} bytes  p50 {p50:<9} p95 {p95:<9} {endpoint}".format(
+                    endpoint=endpoint, **endpoint_stats
+                )
+            )
+
+        self._display.display("Tasks with the most round-trips:")
+        for task_stats in report["tasks"][:top]:
+            self._display.display(
+                "  {requests:>7} requests {retries:>4} retries  {task} ({path})".format(
+                    **task_stats
+                )
+            )
+
+        output_file = self.get_option("output_file")
+        if output_file:
+            with open(output_file, "w") as fd:
+                json.dump(report, fd, indent=2)
+            self._display.display(f"Report written in {output_file}")
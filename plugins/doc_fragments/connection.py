@@ -0,0 +1,184 @@
+# Copyright: (c) 2021, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    # Parameters shared by all the modules to open the vCenter session
+    DOCUMENTATION = r"""
+options:
+    session_cache:
+        default: false
+        description:
+        - Keep the answers of the GET requests on the seldom changing resources (datacenters,
+            folders, networks and datastores) in memory, and reuse them in the following
+            requests of the session.
+        - A write request on a resource invalidates the cached answers of the same kind
+            of resource.
+        - This is mostly useful with the cloud.common turbo mode, where the session is
+            shared between the tasks.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_CACHE) will be used instead.
+        type: bool
+        version_added: 4.2.0
+    session_cache_ttls:
+        description:
+        - Number of seconds a cached answer remains valid, by path prefix of the REST
+            API. For instance, set C(/api/vcenter/cluster) to C(600) to also cache the
+            clusters for 10 minutes.
+        - The longest matching prefix wins, a value of C(0) disables the cache for the
+            prefix.
+        - The default value is 300s for C(/api/vcenter/datacenter), C(/api/vcenter/folder),
+            C(/api/vcenter/network) and C(/api/vcenter/datastore).
+        - Only used when I(session_cache) is enabled.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_CACHE_TTLS) will be used instead.
+        type: dict
+        version_added: 4.2.0
+    session_connection_limit:
+        description:
+        - Maximum number of simultaneous connections to vCenter opened by the session.
+        - C(0) means no limit.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_CONNECTION_LIMIT) will be used instead.
+        - The default value is 20.
+        - With O(session_timings) or in debug mode, the effective settings of the connection
+            pool are returned in C(session_pool).
+        - The connections are shared by all the sessions to the same vCenter with the
+            same connection pool and certificate validation settings, whatever their
+            credentials.
+        - Only the connections and the SSL context are shared, the TLS sessions are not
+            resumed and each new connection pays a full TLS handshake.
+        - In debug mode or with C(-vvv), the number of new and of reused connections of
+            the pool is returned in C(session_tls).
+        type: int
+        version_added: 4.2.0
+    session_connection_limit_per_host:
+        description:
+        - Maximum number of simultaneous connections to the same vCenter endpoint.
+        - C(0) means no limit.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_CONNECTION_LIMIT_PER_HOST) will be used instead.
+        - The default value is 0.
+        type: int
+        version_added: 4.2.0
+    session_dns_cache_ttl:
+        description:
+        - Number of seconds the resolved address of the vCenter is cached.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_DNS_CACHE_TTL) will be used instead.
+        - The default value is 10s.
+        type: int
+        version_added: 4.2.0
+    session_keepalive_timeout:
+        description:
+        - Number of seconds an idle connection to vCenter is kept open for reuse.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_KEEPALIVE_TIMEOUT) will be used instead.
+        - The default value is 15s.
+        type: float
+        version_added: 4.2.0
+    session_retries:
+        description:
+        - Number of times a request is sent again when vCenter is temporarily unavailable
+            or when the connection fails.
+        - Only the idempotent requests (GET, PUT, DELETE) are retried on an error answer.
+            The other requests are only retried if the connection to vCenter could not
+            be established.
+        - With O(session_timings) or in debug mode, the number of retries is returned in
+            C(session_retries).
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_RETRIES) will be used instead.
+        - The default value is 3.
+        type: int
+        version_added: 4.2.0
+    session_retry_backoff:
+        description:
+        - Base delay in seconds between two attempts. The delay doubles after each attempt
+            and a random jitter is applied. A C(Retry-After) header sent by vCenter takes
+            precedence.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_RETRY_BACKOFF) will be used instead.
+        - The default value is 1s.
+        type: float
+        version_added: 4.2.0
+    session_timeout:
+        description:
+        - 'Timeout settings for client session. '
+        - 'The maximal number of seconds for the whole operation including connection
+            establishment, request sending and response. '
+        - The default value is 300s.
+        type: float
+        version_added: 2.1.0
+    session_timings:
+        default: false
+        description:
+        - Measure the duration of the phases of each REST request (wait for a free
+            connection, DNS resolution, connection and TLS handshake, time to first
+            byte and body download).
+        - The result of the module then comes with a C(_rest_timings) key that gives,
+            for each endpoint, the number of requests, the number of bytes received,
+            the median and 95th percentile of each phase in milliseconds and a histogram
+            of the duration of the requests. The resource ids are replaced by C({id})
+            in the endpoint names.
+        - The P(vmware.vmware_rest.rest_profile#callback) callback plugin aggregates
+            these statistics over a whole playbook run.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_TIMINGS) will be used instead.
+        type: bool
+        version_added: 4.2.0
+    session_token_cache:
+        default: false
+        description:
+        - Store the vCenter session id in a local file and reuse it in the next module
+            executions instead of logging in again.
+        - This is mostly useful when the cloud.common turbo mode is not enabled.
+        - The file is only readable by the current user and is stored in the temporary
+            directory of the host that runs the module.
+        - The file content is encrypted when the C(cryptography) Python library is
+            available.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_SESSION_TOKEN_CACHE) will be used instead.
+        type: bool
+        version_added: 4.2.0
+    vcenter_hostname:
+        description:
+        - The hostname or IP address of the vSphere vCenter
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_HOST) will be used instead.
+        required: true
+        type: str
+    vcenter_password:
+        description:
+        - The vSphere vCenter password
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_PASSWORD) will be used instead.
+        required: true
+        type: str
+    vcenter_rest_log_file:
+        description:
+        - 'You can use this optional parameter to set the location of a log file. '
+        - 'This file will be used to record the HTTP REST interaction. '
+        - 'The file will be stored on the host that run the module. '
+        - 'If the value is not specified in the task, the value of '
+        - environment variable C(VMWARE_REST_LOG_FILE) will be used instead.
+        type: str
+    vcenter_username:
+        description:
+        - The vSphere vCenter username
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_USER) will be used instead.
+        required: true
+        type: str
+    vcenter_validate_certs:
+        default: true
+        description:
+        - Allows connection when SSL certificates are not valid. Set to C(false) when
+            certificates are not trusted.
+        - If the value is not specified in the task, the value of environment variable
+            C(VMWARE_VALIDATE_CERTS) will be used instead.
+        type: bool
+"""
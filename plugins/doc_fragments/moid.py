@@ -27,8 +27,184 @@ class ModuleDocFragment(object):
                     If the object is in a sub folder, the sub folder path should be added after the object type
                     (for example /my_dc/vm/some/sub_folder/vm_name_to_lookup).
                 - Enter the object or folder names as seen in the VCenter GUI. Do not escape spaces or special characters.
+                - >-
+                    Several paths can be looked up at once, the result of each path is returned in the same order.
+                    Use the C(query) function or C(wantlist=true) to get them as a list. The common parts of
+                    the paths are only resolved once, and the objects with the same parent are searched with a single request.
+                - >-
+                    The C(*) and C(?) wildcards can be used in any part of a path, for example /my_dc/vm/web-*/ or
+                    /my_dc/host/cluster-*/esx??. The result of such a path is the list of the MoIDs of all of the
+                    matching objects. The children of the matching parents are listed concurrently, with a single
+                    request per parent, and the names are matched locally.
             required: True
-            type: string
+            type: list
+            elements: string
+        inventory_snapshot:
+            description:
+                - Download the whole inventory of the vCenter once (datacenters, folders, clusters, hosts,
+                  resource pools, networks, datastores and VMs) and resolve the paths locally, without
+                  any other request.
+                - This is useful for very large inventories, when many paths are looked up.
+                - The snapshot is shared by all the lookup plugins that use the same vCenter session.
+                - The objects created or moved after the download are only seen once the snapshot
+                  has expired, see O(inventory_snapshot_ttl).
+            default: false
+            env:
+                - name: VMWARE_INVENTORY_SNAPSHOT
+            type: boolean
+            version_added: 4.2.0
+        inventory_snapshot_file:
+            description:
+                - Path of a file where the inventory snapshot is stored, to be reused by the next
+                  playbook runs until it expires.
+                - Only used when O(inventory_snapshot) is enabled.
+            env:
+                - name: VMWARE_INVENTORY_SNAPSHOT_FILE
+            type: path
+            version_added: 4.2.0
+        inventory_snapshot_ttl:
+            description:
+                - Number of seconds the inventory snapshot is used before it is downloaded again.
+                - Only used when O(inventory_snapshot) is enabled.
+            default: 300
+            env:
+                - name: VMWARE_INVENTORY_SNAPSHOT_TTL
+            type: float
+            version_added: 4.2.0
+        lookup_cache_file:
+            description:
+                - Path of a SQLite database where the lookups store the MoID found for each path, to reuse
+                  it in the next playbook runs.
+                - The cached MoIDs are validated with their name and the filters of their parent before
+                  they are used, with a single request for the objects of the same parent. The objects that
+                  were renamed, moved or deleted since are searched again.
+                - Only the paths of a single object are cached, not the children of a folder, the paths with
+                  wildcards or the objects that were not found.
+                - The file is only readable by the current user.
+            env:
+                - name: VMWARE_LOOKUP_CACHE_FILE
+            type: path
+            version_added: 4.2.0
+        lookup_cache_file_ttl:
+            description:
+                - Number of seconds a MoID is kept in O(lookup_cache_file).
+                - Only used when O(lookup_cache_file) is set.
+            default: 86400
+            env:
+                - name: VMWARE_LOOKUP_CACHE_FILE_TTL
+            type: float
+            version_added: 4.2.0
+        lookup_cache_ttl:
+            description:
+                - Number of seconds the lookups remember the MoID found for a given object name,
+                  type and parent, and reuse it instead of sending the same request again.
+                - The objects that were not found are remembered too.
+                - The cache is shared by all the lookup plugins that use the same vCenter session,
+                  this is mostly useful with the cloud.common turbo mode, when many paths under the same
+                  datacenter and folders are looked up.
+                - A write request sent by a module on the same session drops the cached MoIDs of the
+                  object type it changes.
+                - C(0) disables the cache.
+            default: 0
+            env:
+                - name: VMWARE_LOOKUP_CACHE_TTL
+            type: float
+            version_added: 4.2.0
+        object_type:
+            description:
+                - Should not be set by the user, it is set internally when using a specific lookup plugin.
+                - Describes the type of object to lookup. Example, cluster, datacenter, datastore, etc.
+            default: 'cluster'
+            type: str
+            required: False
+"""
+
+    # Parameters to open the vCenter session, shared by all the lookup plugins
+    SESSION = r"""
+    options:
+        session_cache:
+            description:
+                - Keep the answers of the GET requests on the seldom changing resources (datacenters,
+                  folders, networks and datastores) in memory, and reuse them in the following requests
+                  of the session.
+                - A write request on a resource invalidates the cached answers of the same kind of resource.
+            default: false
+            env:
+                - name: VMWARE_SESSION_CACHE
+            type: boolean
+            version_added: 4.2.0
+        session_cache_ttls:
+            description:
+                - Number of seconds a cached answer remains valid, by path prefix of the REST API.
+                - The longest matching prefix wins, a value of C(0) disables the cache for the prefix.
+                - Only used when O(session_cache) is enabled.
+            env:
+                - name: VMWARE_SESSION_CACHE_TTLS
+            type: dict
+            version_added: 4.2.0
+        session_connection_limit:
+            description:
+                - Maximum number of simultaneous connections to vCenter opened by the session.
+                - C(0) means no limit.
+            default: 20
+            env:
+                - name: VMWARE_SESSION_CONNECTION_LIMIT
+            type: int
+            version_added: 4.2.0
+        session_connection_limit_per_host:
+            description:
+                - Maximum number of simultaneous connections to the same vCenter endpoint.
+                - C(0) means no limit.
+            default: 0
+            env:
+                - name: VMWARE_SESSION_CONNECTION_LIMIT_PER_HOST
+            type: int
+            version_added: 4.2.0
+        session_dns_cache_ttl:
+            description:
+                - Number of seconds the resolved address of the vCenter is cached.
+            default: 10
+            env:
+                - name: VMWARE_SESSION_DNS_CACHE_TTL
+            type: int
+            version_added: 4.2.0
+        session_keepalive_timeout:
+            description:
+                - Number of seconds an idle connection to vCenter is kept open for reuse.
+            default: 15
+            env:
+                - name: VMWARE_SESSION_KEEPALIVE_TIMEOUT
+            type: float
+            version_added: 4.2.0
+        session_retries:
+            description:
+                - Number of times a request is sent again when vCenter is temporarily unavailable or when
+                  the connection fails.
+            default: 3
+            env:
+                - name: VMWARE_SESSION_RETRIES
+            type: int
+            version_added: 4.2.0
+        session_retry_backoff:
+            description:
+                - Base delay in seconds between two attempts. The delay doubles after each attempt and a
+                  random jitter is applied. A C(Retry-After) header sent by vCenter takes precedence.
+            default: 1.0
+            env:
+                - name: VMWARE_SESSION_RETRY_BACKOFF
+            type: float
+            version_added: 4.2.0
+        session_token_cache:
+            description:
+                - Store the vCenter session id in a local file and reuse it in the next lookups
+                  instead of logging in again.
+                - The file is only readable by the current user and is stored in the temporary directory.
+                - The file content is encrypted when the C(cryptography) Python library is available.
+            default: false
+            env:
+                - name: VMWARE_SESSION_TOKEN_CACHE
+            type: boolean
+            version_added: 4.2.0
         vcenter_hostname:
             description:
                 - The hostname or IP address of the vSphere vCenter.
@@ -66,11 +242,4 @@ class ModuleDocFragment(object):
             env:
                 - name: VMWARE_VALIDATE_CERTS
             type: boolean
-        object_type:
-            description:
-                - Should not be set by the user, it is set internally when using a specific lookup plugin.
-                - Describes the type of object to lookup. Example, cluster, datacenter, datastore, etc.
-            default: 'cluster'
-            type: str
-            required: False
 """
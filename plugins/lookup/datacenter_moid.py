@@ -21,6 +21,7 @@ requirements:
   - aiohttp
 extends_documentation_fragment:
   - vmware.vmware_rest.moid
+  - vmware.vmware_rest.moid.session
 """
 
 
@@ -138,7 +139,6 @@ class LookupModule(LookupBase):
     async def _run(self, terms, variables, **kwargs):
         self.set_options(var_options=variables, direct=kwargs)
         self.set_option("object_type", "datacenter")
-        result = await Lookup.entry_point(terms, self._options)
-        return [result]
+        return await Lookup.entry_point(terms, self._options)
 
     run = _run if not hasattr(LookupBase, "run_on_daemon") else LookupBase.run_on_daemon
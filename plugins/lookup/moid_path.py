@@ -0,0 +1,104 @@
+# Copyright: (c) 2021, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = r"""
+name: moid_path
+short_description: Look up the inventory path of vSphere objects from their MoID using vCenter REST API
+description:
+  - Returns the inventory path of the vSphere objects with the specified Managed Object Reference (MoID),
+    for example C(/my_dc/vm/production/my_vm) for C(vm-1026).
+  - The returned paths can be given to the other lookup plugins of the collection, for example
+    P(vmware.vmware_rest.vm_moid#lookup).
+  - The inventory of the vCenter is downloaded once and is shared with the lookups that use the same
+    session. The children of each datacenter, folder, cluster, host and resource pool are listed with
+    one request per child type, so the number of requests grows with the number of these containers,
+    not with the number of MoIDs. See O(inventory_snapshot_file) and O(inventory_snapshot_ttl) to
+    reuse the inventory in the next runs.
+  - The result is C(None) for a MoID that is not in the inventory.
+author:
+  - Ansible Cloud Team (@ansible-collections)
+version_added: 4.2.0
+requirements:
+  - vSphere 7.0.3 or greater
+  - python >= 3.6
+  - aiohttp
+extends_documentation_fragment:
+  - vmware.vmware_rest.moid.session
+options:
+  _terms:
+    description:
+      - The MoID of the objects you would like to get the path of, for example C(vm-1026) or C(host-1013).
+      - The path of each MoID is returned in the same order.
+        Use the C(query) function or C(wantlist=true) to get them as a list.
+    required: True
+    type: list
+    elements: string
+  inventory_snapshot_file:
+    description:
+      - Path of a file where the inventory is stored, to be reused by the next playbook runs
+        until it expires.
+    env:
+      - name: VMWARE_INVENTORY_SNAPSHOT_FILE
+    type: path
+  inventory_snapshot_ttl:
+    description:
+      - Number of seconds the inventory is used before it is downloaded again.
+    default: 300
+    env:
+      - name: VMWARE_INVENTORY_SNAPSHOT_TTL
+    type: float
+"""
+
+
+EXAMPLES = r"""
+- name: Get the path of the VM 'vm-1026'
+  ansible.builtin.debug:
+    msg: "{{ lookup('vmware.vmware_rest.moid_path', 'vm-1026') }}"
+
+- name: Look up the VMs that are powered off
+  vmware.vmware_rest.vcenter_vm_info:
+    filter_power_states:
+      - POWERED_OFF
+  register: my_vms
+
+- name: Get the path of all these VMs at once
+  ansible.builtin.debug:
+    msg: "{{ query('vmware.vmware_rest.moid_path', *my_vms.value | map(attribute='vm')) }}"
+
+- name: Keep the inventory in a file for 10 minutes, to reuse it in the next runs
+  ansible.builtin.debug:
+    msg: >-
+      {{ lookup('vmware.vmware_rest.moid_path', 'host-1013',
+      inventory_snapshot_file='~/.vmware_inventory.json',
+      inventory_snapshot_ttl=600) }}
+"""
+
+
+RETURN = r"""
+_raw:
+    description: Inventory path of the vSphere object
+    type: str
+    sample: /my_dc/vm/production/my_vm
+"""
+
+
+from ansible_collections.cloud.common.plugins.plugin_utils.turbo.lookup import (
+    TurboLookupBase as LookupBase,
+)
+from ansible_collections.vmware.vmware_rest.plugins.plugin_utils.lookup import (
+    ReverseLookup,
+)
+
+
+class LookupModule(LookupBase):
+    async def _run(self, terms, variables, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        return await ReverseLookup.entry_point(terms, self._options)
+
+    run = _run if not hasattr(LookupBase, "run_on_daemon") else LookupBase.run_on_daemon
@@ -21,6 +21,7 @@ requirements:
   - aiohttp
 extends_documentation_fragment:
   - vmware.vmware_rest.moid
+  - vmware.vmware_rest.moid.session
 """
 
 
@@ -80,6 +81,16 @@ EXAMPLES = r"""
   ansible.builtin.debug:
     msg: "{{ lookup('vmware.vmware_rest.folder_moid', '/my_dc/production/my_vm') }}"
 
+# Several VMs can be looked up at once, the results are returned in the same order.
+- name: Lookup the VMs 'my_vm1' and 'my_vm2' in the folder 'production'
+  ansible.builtin.debug:
+    msg: "{{ query('vmware.vmware_rest.vm_moid', '/my_dc/vm/production/my_vm1', '/my_dc/vm/production/my_vm2') }}"
+
+# The * and ? wildcards return the MoIDs of all of the matching VMs.
+- name: Lookup the VMs of all of the folders 'web-*', and the VMs 'db??' in the folder 'production'
+  ansible.builtin.debug:
+    msg: "{{ query('vmware.vmware_rest.vm_moid', '/my_dc/vm/web-*/', '/my_dc/vm/production/db??') }}"
+
 #
 # Usage in Playbooks
 #
@@ -125,7 +136,6 @@ class LookupModule(LookupBase):
     async def _run(self, terms, variables, **kwargs):
         self.set_options(var_options=variables, direct=kwargs)
         self.set_option("object_type", "vm")
-        result = await Lookup.entry_point(terms, self._options)
-        return [result]
+        return await Lookup.entry_point(terms, self._options)
 
     run = _run if not hasattr(LookupBase, "run_on_daemon") else LookupBase.run_on_daemon
@@ -28,24 +28,1090 @@
 # USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #
 
+import asyncio
+import atexit
+import base64
+import bisect
+import collections
+import email.utils
 import hashlib
 import importlib
 import json
+import os
+import random
 import re
+import ssl
+import stat
+import tempfile
+import threading
+import time
 import urllib.parse
 
-from ansible.module_utils.basic import missing_required_lib
+from ansible.module_utils.basic import env_fallback, missing_required_lib
 from ansible.module_utils.parsing.convert_bool import boolean
 
 
+def _load_json_codec():
+    """Return the (loads, dumps) functions used for the REST bodies.
+
+    orjson is several times faster than the json module on the large list
+    and detail answers, we use it when it is installed.
+    """
+    try:
+        orjson = importlib.import_module("orjson")
+    except ImportError:
+        return json.loads, json.dumps
+
+    def dumps(obj):
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:  # e.g: integer bigger than 64 bits
+            return json.dumps(obj)
+
+    return orjson.loads, dumps
+
+
+json_loads, json_dumps = _load_json_codec()
+
+
+# vCenter drops an API session after 30 minutes of inactivity, we close ours
+# a bit before that. Long-lived sessions are also recycled after
+# SESSION_MAX_AGE seconds.
+SESSION_IDLE_TIMEOUT = 1200
+SESSION_MAX_AGE = 3600
+
+# vcenter_rest_log_file settings
+LOG_MAX_BODY_SIZE = 64 * 1024
+LOG_MAX_FILE_SIZE = 50 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_FLUSH_INTERVAL = 0.5
+LOG_REDACTED_HEADERS = ("authorization", "vmware-api-session-id")
+
+# GET answers that can be kept in the opt-in response cache, by path prefix.
+# These resources seldom change during a playbook run.
+RESPONSE_CACHE_TTLS = {
+    "/api/vcenter/datacenter": 300,
+    "/api/vcenter/folder": 300,
+    "/api/vcenter/network": 300,
+    "/api/vcenter/datastore": 300,
+}
+RESPONSE_CACHE_MAX_SIZE = 64 * 1024 * 1024
+
+# Query filters of the list end-points, by uniquity key, see exists()
+EXISTS_QUERY_FILTERS = {
+    "/api/vcenter/cluster": {"cluster": "clusters", "name": "names"},
+    "/api/vcenter/datacenter": {"datacenter": "datacenters", "name": "names"},
+    "/api/vcenter/datastore": {"datastore": "datastores", "name": "names"},
+    "/api/vcenter/folder": {"folder": "folders", "name": "names"},
+    "/api/vcenter/host": {"host": "hosts", "name": "names"},
+    "/api/vcenter/network": {"network": "networks", "name": "names"},
+    "/api/vcenter/resource-pool": {
+        "resource_pool": "resource_pools",
+        "name": "names",
+    },
+    "/api/vcenter/vm": {"vm": "vms", "name": "names"},
+    "/api/content/library/item": {"library_id": "library_id"},
+}
+
+# The filters that split a listing when vCenter refuses to return all the
+# resources at once, by list end-point and by order of preference: the
+# name of the filter, the end-point that lists its values (or the values)
+# and the filters of the listing that also apply to this end-point.
+LIST_SHARD_FILTERS = {
+    "/api/vcenter/vm": (
+        ("datacenters", "/api/vcenter/datacenter", ()),
+        ("hosts", "/api/vcenter/host", ("datacenters", "clusters")),
+        (
+            "folders",
+            "/api/vcenter/folder?type=VIRTUAL_MACHINE",
+            ("datacenters",),
+        ),
+        ("power_states", ("POWERED_OFF", "POWERED_ON", "SUSPENDED"), ()),
+    ),
+}
+
+# Retry of the requests that fail because vCenter is temporarily unavailable
+RETRY_COUNT = 3
+RETRY_BACKOFF = 1.0
+RETRY_MAX_DELAY = 60
+RETRY_IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Phases of the requests measured by RequestTimings, in milliseconds
+TIMING_PHASES = ("queue", "dns", "connect", "ttfb", "body", "total")
+# Upper bounds of the buckets of the latency histogram, in milliseconds. The
+# last bucket of the histogram counts the slower requests.
+TIMING_HISTOGRAM_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# The path segments replaced by {id} in the endpoint templates, e.g: vm-12,
+# group-v3, 2000 or the UUID of a content library
+TIMING_ID_SEGMENT = re.compile(
+    r"^(\d+|[a-z]+-[a-z]*\d+|[0-9a-f]{8}(-[0-9a-f]{4}){3}-[0-9a-f]{12})$", re.I
+)
+
+DEFAULT_CONNECTION_LIMIT = 20
+DEFAULT_KEEPALIVE_TIMEOUT = 15.0
+DEFAULT_DNS_CACHE_TTL = 10
+
+
+class _RequestContextManager:
+    """Allow both ``await session.get()`` and ``async with session.get()``."""
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._resp = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        self._resp = await self._coro
+        return self._resp
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._resp.release()
+
+
+class BufferedResponse:
+    """A response with a body that has already been read.
+
+    The same object can be handed to several callers, each json() call
+    returns a new copy of the document.
+    """
+
+    def __init__(self, method, url, status, headers, body):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    async def read(self):
+        return self.body
+
+    async def text(self, encoding="utf-8"):
+        return self.body.decode(encoding, errors="replace")
+
+    async def json(self):
+        if not self.body.strip():
+            return None
+        return json_loads(self.body)
+
+    def release(self):
+        pass
+
+
+class _HTTPMethods:
+    """The request helpers of aiohttp.ClientSession, on top of request()."""
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+class RetryPolicy:
+    """When and how long to wait before sending a request again.
+
+    The idempotent requests are retried when vCenter is temporarily
+    unavailable or when the connection fails. The other requests are only
+    retried if the connection could not be established, since they have
+    not been received by vCenter. The delay grows exponentially, with a
+    full jitter, unless vCenter sends a Retry-After header.
+    """
+
+    def __init__(self, retries=RETRY_COUNT, backoff=RETRY_BACKOFF):
+        self.retries = retries
+        self.backoff = backoff
+
+    def retry_on_error(self, method, attempt, sent=True):
+        if attempt >= self.retries:
+            return False
+        return method in RETRY_IDEMPOTENT_METHODS or not sent
+
+    async def retry_on_response(self, method, resp, attempt):
+        if attempt >= self.retries or method not in RETRY_IDEMPOTENT_METHODS:
+            return False
+        if resp.status in RETRY_STATUSES:
+            return True
+        if resp.status == 500:
+            body = await resp.read()
+            return b"service unavailable" in body.lower()
+        return False
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+            try:
+                date = email.utils.parsedate_to_datetime(retry_after)
+                return min(max(date.timestamp() - time.time(), 0), RETRY_MAX_DELAY)
+            except (TypeError, ValueError):
+                pass
+        return random.uniform(0, min(self.backoff * 2**attempt, RETRY_MAX_DELAY))
+
+
+class ResponseCache:
+    """LRU cache of the GET answers of a pooled session.
+
+    The entries are stored with their creation time and the TTL is
+    evaluated on read, with the rules of the caller: ``ttls`` maps a path
+    prefix to a number of seconds, the longest prefix wins. The total size
+    of the cached bodies is bounded by ``max_size``. A write request
+    invalidates every entry under the cached prefix of its path.
+    """
+
+    def __init__(self, max_size=RESPONSE_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        # bumped on each invalidation, an answer requested before that
+        # must not be stored
+        self.generation = 0
+        self._entries = collections.OrderedDict()
+        self._prefixes = {}
+
+    @staticmethod
+    def _path(url):
+        return urllib.parse.urlsplit(str(url)).path
+
+    @staticmethod
+    def match(path, ttls):
+        """Return the (prefix, ttl) rule of a path."""
+        best = (None, 0)
+        for prefix, ttl in ttls.items():
+            prefix = prefix.rstrip("/")
+            if path != prefix and not path.startswith(prefix + "/"):
+                continue
+            if best[0] is None or len(prefix) > len(best[0]):
+                best = (prefix, ttl)
+        return best
+
+    def get(self, url, ttls):
+        key = str(url)
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        created_at, resp = entry
+        ttl = self.match(self._path(url), ttls)[1]
+        if time.monotonic() - created_at > ttl:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return resp
+
+    def put(self, url, resp, ttls, generation):
+        if generation != self.generation or resp.status != 200:
+            return
+        prefix, ttl = self.match(self._path(url), ttls)
+        if not ttl:
+            return
+        self._prefixes[prefix] = ttl
+        if len(resp.body) > self.max_size:
+            return
+        key = str(url)
+        self._drop(key)
+        self._entries[key] = (time.monotonic(), resp)
+        self.size += len(resp.body)
+        while self.size > self.max_size:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate(self, url):
+        path = self._path(url)
+        prefix = self.match(path, self._prefixes)[0] or path.rstrip("/")
+        self.generation += 1
+        for key in list(self._entries):
+            cached_path = self._path(key)
+            if cached_path == prefix or cached_path.startswith(prefix + "/"):
+                self._drop(key)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.size -= len(entry[1].body)
+
+
+class RequestTimings:
+    """Collect the duration of the phases of the requests of a SessionView.
+
+    The aiohttp trace hooks of trace_config() fill one record per request
+    sent with ``trace_request_ctx=self``. A phase that did not happen, e.g:
+    the DNS resolution of a reused connection, counts as 0. The connect
+    phase covers both the TCP connection and the TLS handshake.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    @staticmethod
+    def endpoint_template(method, url):
+        """Return the endpoint of a request, without the resource ids.
+
+        e.g: GET /api/vcenter/vm/vm-12/hardware/disk/2000 ->
+        GET /api/vcenter/vm/{id}/hardware/disk/{id}
+        """
+        parts = urllib.parse.urlsplit(str(url))
+        segments = [
+            "{id}" if TIMING_ID_SEGMENT.match(urllib.parse.unquote(i)) else i
+            for i in parts.path.split("/")
+        ]
+        endpoint = f"{method} {'/'.join(segments)}"
+        action = urllib.parse.parse_qs(parts.query).get("action")
+        if action:
+            endpoint += f"?action={action[0]}"
+        return endpoint
+
+    @staticmethod
+    def _percentile(values, q):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+    @staticmethod
+    def histogram(values):
+        """Count the ``values`` by TIMING_HISTOGRAM_BUCKETS."""
+        counts = [0] * (len(TIMING_HISTOGRAM_BUCKETS) + 1)
+        for value in values:
+            counts[bisect.bisect_left(TIMING_HISTOGRAM_BUCKETS, value)] += 1
+        return counts
+
+    def summary(self):
+        """Return the statistics of the requests, by endpoint.
+
+        That is the number of requests, the received bytes, the p50/p95 of
+        each phase and the histogram of the total duration.
+        """
+        by_endpoint = collections.defaultdict(list)
+        for record in self.records:
+            by_endpoint[record["endpoint"]].append(record)
+        summary = {}
+        for endpoint, records in sorted(by_endpoint.items()):
+            durations = [self._durations(record) for record in records]
+            summary[endpoint] = {
+                "count": len(records),
+                "bytes": sum(record["bytes"] for record in records),
+                "histogram": self.histogram(d["total"] for d in durations),
+            }
+            for name, q in (("p50", 0.5), ("p95", 0.95)):
+                summary[endpoint][name] = {
+                    phase: round(self._percentile([d[phase] for d in durations], q), 1)
+                    for phase in TIMING_PHASES
+                }
+        return summary
+
+    @staticmethod
+    def _durations(record):
+        def span(start, end):
+            if start is None or end is None:
+                return 0.0
+            return (end - start) * 1000
+
+        sent = record["headers_sent"] or record["start"]
+        end = record["body_end"] or record["headers_received"] or record["end"]
+        return {
+            "queue": sum((span(*i) for i in record["queue"]), 0.0),
+            "dns": sum((span(*i) for i in record["dns"]), 0.0),
+            "connect": sum((span(*i) for i in record["connect"]), 0.0),
+            "ttfb": span(sent, record["headers_received"]),
+            "body": span(record["headers_received"], record["body_end"]),
+            "total": span(record["start"], end),
+        }
+
+    @classmethod
+    def trace_config(cls, aiohttp):
+        """Return the aiohttp.TraceConfig that feeds the RequestTimings.
+
+        The hooks do nothing for the requests sent without a RequestTimings.
+        """
+
+        def record_of(trace_config_ctx):
+            if isinstance(trace_config_ctx.trace_request_ctx, cls):
+                return trace_config_ctx.timing_record
+
+        def phase_start(name):
+            async def hook(session, trace_config_ctx, params):
+                record = record_of(trace_config_ctx)
+                if record is not None:
+                    record[name].append([time.monotonic(), None])
+
+            return hook
+
+        def phase_end(name):
+            async def hook(session, trace_config_ctx, params):
+                record = record_of(trace_config_ctx)
+                if record is not None and record[name]:
+                    record[name][-1][1] = time.monotonic()
+
+            return hook
+
+        async def on_response_chunk_received(session, trace_config_ctx, params):
+            record = record_of(trace_config_ctx)
+            if record is not None:
+                record["body_end"] = time.monotonic()
+                record["bytes"] += len(params.chunk)
+
+        def event(name):
+            async def hook(session, trace_config_ctx, params):
+                record = record_of(trace_config_ctx)
+                if record is not None:
+                    record[name] = time.monotonic()
+
+            return hook
+
+        async def on_request_start(session, trace_config_ctx, params):
+            timings = trace_config_ctx.trace_request_ctx
+            if not isinstance(timings, cls):
+                return
+            trace_config_ctx.timing_record = {
+                "endpoint": cls.endpoint_template(params.method, params.url),
+                "start": time.monotonic(),
+                "queue": [],
+                "dns": [],
+                "connect": [],
+                "headers_sent": None,
+                "headers_received": None,
+                "body_end": None,
+                "end": None,
+                "bytes": 0,
+            }
+            timings.records.append(trace_config_ctx.timing_record)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_queued_start.append(phase_start("queue"))
+        trace_config.on_connection_queued_end.append(phase_end("queue"))
+        trace_config.on_dns_resolvehost_start.append(phase_start("dns"))
+        trace_config.on_dns_resolvehost_end.append(phase_end("dns"))
+        trace_config.on_connection_create_start.append(phase_start("connect"))
+        trace_config.on_connection_create_end.append(phase_end("connect"))
+        trace_config.on_request_headers_sent.append(event("headers_sent"))
+        trace_config.on_request_end.append(event("headers_received"))
+        trace_config.on_response_chunk_received.append(on_response_chunk_received)
+        trace_config.on_request_exception.append(event("end"))
+        return trace_config
+
+
+class SharedConnector:
+    """An aiohttp.TCPConnector shared by the sessions to the same vCenter.
+
+    The vCenter API session is carried by a header, so the sessions of
+    different credentials can reuse the same keep-alive connections. The
+    connector counts the new connections it opens, each of them costs a TCP
+    and a full TLS handshake, and the connections it could reuse instead.
+    The TLS sessions are not resumed, a new connection always pays a full
+    handshake.
+    """
+
+    def __init__(self, key, connector):
+        self.key = key
+        self.connector = connector
+        self.users = 0
+        self.new_connections = 0
+        self.reused = 0
+
+    @classmethod
+    def get(cls, aiohttp, hostname, validate_certs, pool_settings):
+        if validate_certs:
+            ssl_key = (
+                True,
+                os.environ.get("SSL_CERT_FILE"),
+                os.environ.get("SSL_CERT_DIR"),
+            )
+        else:
+            ssl_key = (False, None, None)
+        key = (hostname, ssl_key, json.dumps(pool_settings, sort_keys=True))
+        shared = cls._connectors.get(key)
+        if shared is None:
+            connector = aiohttp.TCPConnector(
+                ssl=ssl_context(*ssl_key),
+                limit=pool_settings["limit"],
+                limit_per_host=pool_settings["limit_per_host"],
+                keepalive_timeout=pool_settings["keepalive_timeout"],
+                ttl_dns_cache=pool_settings["dns_cache_ttl"],
+            )
+            shared = cls._connectors[key] = cls(key, connector)
+        shared.users += 1
+        return shared
+
+    async def release(self):
+        self.users -= 1
+        if self.users <= 0:
+            if self._connectors.get(self.key) is self:
+                del self._connectors[self.key]
+            await self.connector.close()
+
+    def trace_config(self, aiohttp):
+        async def on_connection_create_end(session, trace_config_ctx, params):
+            self.new_connections += 1
+
+        async def on_connection_reuseconn(session, trace_config_ctx, params):
+            self.reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def report(self):
+        return {
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused,
+            "sessions": self.users,
+        }
+
+
+SharedConnector._connectors = {}
+
+
+def ssl_context(validate_certs, cafile=None, capath=None):
+    """Return the SSLContext of the sessions with these settings.
+
+    The context is created once, the CA bundle is not loaded again for each
+    new session. Without certificate validation, there is nothing to load and
+    aiohttp gets ``False``.
+    """
+    if not validate_certs:
+        return False
+    key = (cafile, capath)
+    if key not in ssl_context._cache:
+        ssl_context._cache[key] = ssl.create_default_context(
+            cafile=cafile, capath=capath
+        )
+    return ssl_context._cache[key]
+
+
+ssl_context._cache = {}
+
+
+class PooledSession(_HTTPMethods):
+    """An authenticated HTTP session stored in the open_session() pool.
+
+    The object exposes the request methods of aiohttp.ClientSession. If
+    vCenter rejects the vmware-api-session-id with a 401, we log in again
+    and replay the request once. The answers are returned as
+    BufferedResponse, and concurrent GETs of the same URL share a single
+    request.
+
+    The session also owns the ResponseCache. It is only used by the
+    SessionView that enabled it, but all the write requests invalidate it.
+    The other caches built on top of the session, like the path resolutions
+    of the lookups, can register a callback in ``write_listeners`` to be
+    told about the write requests too.
+
+    Each SessionView counts as a user of the session until it is closed.
+    When the session expires, open_session() removes it from the pool, but
+    it is only closed once its last view is closed, so a module or a lookup
+    that is still running keeps a working session.
+    """
+
+    def __init__(
+        self,
+        aiohttp,
+        hostname,
+        auth,
+        shared_connector,
+        trace_configs,
+        pool_settings=None,
+        token_cache=None,
+    ):
+        self._aiohttp = aiohttp
+        self._hostname = hostname
+        self._auth = auth
+        self.shared_connector = shared_connector
+        self._connector = shared_connector.connector
+        self._trace_configs = trace_configs
+        self._login_lock = asyncio.Lock()
+        self._in_flight = 0
+        self._views = 0
+        self._evicted = False
+        self._get_flights = {}
+        self.response_cache = ResponseCache()
+        self.write_listeners = []
+        self.session_id = None
+        self.pool_settings = pool_settings or {}
+        self.token_cache = token_cache
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self._session = aiohttp.ClientSession(
+            connector=self._connector,
+            headers={"content-type": "application/json"},
+            connector_owner=False,
+            trace_configs=trace_configs,
+            json_serialize=json_dumps,
+        )
+
+    async def login(self):
+        exceptions = importlib.import_module(
+            "ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions"
+        )
+        async with self._aiohttp.ClientSession(
+            connector=self._connector,
+            connector_owner=False,
+            trace_configs=self._trace_configs,
+        ) as session:
+            try:
+                async with session.post(
+                    "https://{hostname}/rest/com/vmware/cis/session".format(
+                        hostname=self._hostname
+                    ),
+                    auth=self._auth,
+                ) as resp:
+                    if resp.status != 200:
+                        raise exceptions.EmbeddedModuleFailure(
+                            "Authentication failure. code: {0}, json: {1}".format(
+                                resp.status, await resp.text()
+                            )
+                        )
+                    json = await resp.json()
+            except self._aiohttp.client_exceptions.ClientConnectorError as e:
+                raise exceptions.EmbeddedModuleFailure(f"Authentication failure: {e}")
+
+        self.use_session_id(json["value"])
+        if self.token_cache:
+            self.token_cache.store(self.session_id)
+
+    def use_session_id(self, session_id):
+        self.session_id = session_id
+        self._session.headers["vmware-api-session-id"] = session_id
+
+    async def relogin(self, expired_session_id):
+        async with self._login_lock:
+            # Another request may have already refreshed the session
+            if self.session_id == expired_session_id:
+                await self.login()
+
+    def is_expired(self, now=None):
+        if self._in_flight:
+            return False
+        if now is None:
+            now = time.monotonic()
+        if now - self.last_used > SESSION_IDLE_TIMEOUT:
+            return True
+        return now - self.created_at > SESSION_MAX_AGE
+
+    async def close(self):
+        await self._session.close()
+        await self.shared_connector.release()
+
+    def acquire(self):
+        self._views += 1
+
+    async def release(self):
+        self._views -= 1
+        await self.close_if_unused()
+
+    async def evict(self):
+        """Called when the session leaves the pool, it is closed once unused."""
+        self._evicted = True
+        await self.close_if_unused()
+
+    async def close_if_unused(self):
+        if self._evicted and not self._views and not self._in_flight:
+            # close only once
+            self._evicted = False
+            await self.close()
+
+    async def _send(self, method, url, view=None, **kwargs):
+        retry_policy = view.retry_policy if view else None
+        if view and view.timings is not None:
+            kwargs["trace_request_ctx"] = view.timings
+        attempt = 0
+        while True:
+            try:
+                resp = await self._send_once(method, url, **kwargs)
+            except self._aiohttp.ClientConnectionError as e:
+                sent = not isinstance(e, self._aiohttp.ClientConnectorError)
+                if not retry_policy or not retry_policy.retry_on_error(
+                    method, attempt, sent
+                ):
+                    raise
+                delay = retry_policy.delay(attempt)
+            else:
+                if not retry_policy or not await retry_policy.retry_on_response(
+                    method, resp, attempt
+                ):
+                    return resp
+                delay = retry_policy.delay(attempt, resp.headers.get("Retry-After"))
+                resp.release()
+            attempt += 1
+            view.retries += 1
+            await asyncio.sleep(delay)
+
+    async def _send_once(self, method, url, **kwargs):
+        self._in_flight += 1
+        try:
+            session_id = self.session_id
+            resp = await self._session.request(method, url, **kwargs)
+            if resp.status == 401:
+                resp.release()
+                await self.relogin(session_id)
+                resp = await self._session.request(method, url, **kwargs)
+            return resp
+        finally:
+            self._in_flight -= 1
+            self.last_used = time.monotonic()
+
+    async def _send_buffered(self, method, url, view=None, **kwargs):
+        resp = await self._send(method, url, view=view, **kwargs)
+        try:
+            body = await resp.read()
+        finally:
+            resp.release()
+        return BufferedResponse(method, resp.url, resp.status, resp.headers, body)
+
+    async def _coalesced_get(self, url, view=None, **kwargs):
+        """Share one request between the concurrent GETs of the same URL."""
+        key = str(url)
+        flight = self._get_flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(
+                self._send_buffered("GET", url, view=view, **kwargs)
+            )
+            self._get_flights[key] = flight
+
+            def _landed(future):
+                if self._get_flights.get(key) is future:
+                    del self._get_flights[key]
+                if not future.cancelled():
+                    # mark the exception as retrieved if all the callers left
+                    future.exception()
+
+            flight.add_done_callback(_landed)
+        # a caller that gets cancelled must not cancel the others
+        return await asyncio.shield(flight)
+
+    async def _request(self, method, url, view=None, **kwargs):
+        if method != "GET":
+            self.response_cache.invalidate(url)
+            for listener in self.write_listeners:
+                listener(url)
+            return await self._send_buffered(method, url, view=view, **kwargs)
+        if set(kwargs) - {"timeout"}:
+            return await self._send_buffered(method, url, view=view, **kwargs)
+        cache_ttls = view.cache_ttls if view else None
+        if not cache_ttls:
+            return await self._coalesced_get(url, view=view, **kwargs)
+
+        resp = self.response_cache.get(url, cache_ttls)
+        if resp:
+            return resp
+        generation = self.response_cache.generation
+        resp = await self._coalesced_get(url, view=view, **kwargs)
+        self.response_cache.put(url, resp, cache_ttls, generation)
+        return resp
+
+    def request(self, method, url, **kwargs):
+        return _RequestContextManager(self._request(method, url, **kwargs))
+
+
+class SessionView(_HTTPMethods):
+    """The session handed to a module or a lookup by open_session().
+
+    The underlying PooledSession is shared by all the users of the same
+    vCenter credentials. The view carries the settings of one execution,
+    like the response cache rules and the retry policy, and its statistics.
+    """
+
+    def __init__(self, pooled, cache_ttls=None, retry_policy=None, timings=None):
+        self.pooled = pooled
+        self.cache_ttls = cache_ttls
+        self.retry_policy = retry_policy
+        self.retries = 0
+        self.timings = timings
+        self.closed = False
+        pooled.acquire()
+
+    async def close(self):
+        """Tell the pool that the execution does not use the session anymore."""
+        if not self.closed:
+            self.closed = True
+            await self.pooled.release()
+
+    @property
+    def pool_settings(self):
+        return self.pooled.pool_settings
+
+    def request(self, method, url, **kwargs):
+        return _RequestContextManager(
+            self.pooled._request(method, url, view=self, **kwargs)
+        )
+
+
+class RestLogger:
+    """Record the HTTP REST interactions in a JSON lines file.
+
+    The trace hooks only serialize the records in a buffer. The buffer is
+    written by batch, from a thread of the default executor, so the file
+    I/O never blocks the event loop. What is left in the buffer is written
+    when the interpreter exits. The file is rotated when it grows over
+    max_file_size.
+    """
+
+    _instances = {}
+
+    def __init__(
+        self,
+        path,
+        max_body_size=LOG_MAX_BODY_SIZE,
+        max_file_size=LOG_MAX_FILE_SIZE,
+        backup_count=LOG_BACKUP_COUNT,
+    ):
+        self.path = path
+        self.max_body_size = max_body_size
+        self.max_file_size = max_file_size
+        self.backup_count = backup_count
+        self._buffer = collections.deque()
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
+        atexit.register(self.flush)
+
+    @classmethod
+    def get(cls, path):
+        """Return the logger of a file, all the sessions share the same one."""
+        if path not in cls._instances:
+            cls._instances[path] = cls(path)
+        return cls._instances[path]
+
+    def log_request(
+        self, method, url, headers, latency, status=None, body=None, error=None
+    ):
+        record = {
+            "time": time.time(),
+            "method": method,
+            "url": str(url),
+            # the keys are multidict.istr, orjson only accepts str keys
+            "headers": {
+                str(k): "********" if k.lower() in LOG_REDACTED_HEADERS else v
+                for k, v in headers.items()
+            },
+            "status": status,
+            "latency_ms": round(latency * 1000, 3),
+        }
+        if error:
+            record["error"] = error
+        if body is not None:
+            if url.path == "/rest/com/vmware/cis/session":
+                # The answer is the session id
+                body = b"********"
+            if len(body) > self.max_body_size:
+                record["body_truncated"] = True
+                body = body[: self.max_body_size]
+            record["body"] = body.decode("utf-8", errors="replace")
+        self.log(record)
+
+    def log(self, record):
+        self._buffer.append(json_dumps(record) + "\n")
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        loop = asyncio.get_running_loop()
+        loop.call_later(LOG_FLUSH_INTERVAL, self._schedule_flush, loop)
+
+    def _schedule_flush(self, loop):
+        self._flush_scheduled = False
+        loop.run_in_executor(None, self.flush)
+
+    def flush(self):
+        with self._lock:
+            lines = []
+            while self._buffer:
+                lines.append(self._buffer.popleft())
+            if not lines:
+                return
+            data = "".join(lines).encode("utf-8")
+            try:
+                self._rotate(len(data))
+                with open(self.path, "ab") as fd:
+                    fd.write(data)
+            except OSError:
+                pass
+
+    def _rotate(self, incoming_size):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if not self.max_file_size or size + incoming_size <= self.max_file_size:
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+class SessionTokenCache:
+    """Keep the vCenter session id on disk between two module executions.
+
+    Without turbo mode, every module run starts a new process and has to log
+    in again. The session id is stored in a 0600 file named after the
+    open_session() digest, in a private directory of the temporary
+    directory. The content is encrypted with a key derived from the
+    credentials when the cryptography library is available.
+    """
+
+    def __init__(self, digest, hostname, username, password, directory=None):
+        if not directory:
+            directory = os.path.join(
+                tempfile.gettempdir(), f"vmware_rest_sessions_{os.getuid()}"
+            )
+        self.directory = directory
+        self.path = os.path.join(directory, digest)
+        self._fernet = None
+        try:
+            fernet = importlib.import_module("cryptography.fernet")
+        except ImportError:
+            return
+        m = hashlib.sha256()
+        m.update(b"vmware_rest session token cache")
+        m.update(hostname.encode())
+        m.update(username.encode())
+        m.update(password.encode())
+        self._fernet = fernet.Fernet(base64.urlsafe_b64encode(m.digest()))
+
+    def _check_directory(self):
+        try:
+            os.mkdir(self.directory, 0o700)
+        except FileExistsError:
+            pass
+        st = os.lstat(self.directory)
+        # Refuse a directory that another user could tamper with
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+            return False
+        return stat.S_IMODE(st.st_mode) & 0o077 == 0
+
+    def load(self):
+        try:
+            if not self._check_directory():
+                return None
+            st = os.stat(self.path)
+            if time.time() - st.st_mtime > SESSION_IDLE_TIMEOUT:
+                return None
+            with open(self.path, "rb") as fd:
+                content = fd.read()
+            if self._fernet:
+                content = self._fernet.decrypt(content)
+            session_id = json.loads(content)["session_id"]
+            # The session is about to be used, this resets the idle counter
+            os.utime(self.path)
+            return session_id
+        except Exception:
+            return None
+
+    def store(self, session_id):
+        content = json.dumps({"session_id": session_id}).encode()
+        if self._fernet:
+            content = self._fernet.encrypt(content)
+        tmp_path = f"{self.path}.{os.getpid()}"
+        try:
+            if not self._check_directory():
+                return
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+def connector_settings(
+    limit=None, limit_per_host=None, keepalive_timeout=None, dns_cache_ttl=None
+):
+    """Return the effective TCPConnector settings of a session.
+
+    An unset value falls back to the collection default. A limit of 0 means
+    no limit.
+    """
+    return {
+        "limit": DEFAULT_CONNECTION_LIMIT if limit is None else limit,
+        "limit_per_host": 0 if limit_per_host is None else limit_per_host,
+        "keepalive_timeout": (
+            DEFAULT_KEEPALIVE_TIMEOUT
+            if keepalive_timeout is None
+            else keepalive_timeout
+        ),
+        "dns_cache_ttl": (
+            DEFAULT_DNS_CACHE_TTL if dns_cache_ttl is None else dns_cache_ttl
+        ),
+    }
+
+
+def retry_settings(retries=None, backoff=None):
+    return {
+        "retries": RETRY_COUNT if retries is None else retries,
+        "backoff": RETRY_BACKOFF if backoff is None else backoff,
+    }
+
+
+def session_report(session, debug=False):
+    """Extra keys added to the module result to describe the session.
+
+    The result is only extended with ``session_timings`` or ``debug``. With
+    ``debug``, it also counts the new and the reused connections to vCenter.
+    """
+    report = {}
+    if session.timings is not None or debug:
+        report["session_pool"] = dict(session.pool_settings)
+        report["session_retries"] = session.retries
+    if session.timings is not None:
+        report["_rest_timings"] = session.timings.summary()
+    if debug:
+        report["session_tls"] = session.pooled.shared_connector.report()
+    return report
+
+
+async def evict_expired_sessions():
+    now = time.monotonic()
+    for digest, session in list(open_session._pool.items()):
+        if session.is_expired(now):
+            del open_session._pool[digest]
+            await session.evict()
+
+
 async def open_session(
     vcenter_hostname=None,
     vcenter_username=None,
     vcenter_password=None,
     validate_certs=True,
     log_file=None,
+    connection_limit=None,
+    connection_limit_per_host=None,
+    keepalive_timeout=None,
+    dns_cache_ttl=None,
+    token_cache=False,
+    response_cache=False,
+    response_cache_ttls=None,
+    retries=None,
+    retry_backoff=None,
+    timings=False,
 ):
     validate_certs = boolean(validate_certs)
+    if boolean(response_cache):
+        cache_ttls = dict(RESPONSE_CACHE_TTLS)
+        for prefix, ttl in (response_cache_ttls or {}).items():
+            cache_ttls[prefix] = float(ttl)
+    else:
+        cache_ttls = None
+    retry_policy = RetryPolicy(**retry_settings(retries, retry_backoff))
+    timings = RequestTimings() if boolean(timings) else None
+    pool_settings = connector_settings(
+        limit=connection_limit,
+        limit_per_host=connection_limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        dns_cache_ttl=dns_cache_ttl,
+    )
     m = hashlib.sha256()
     m.update(vcenter_hostname.encode())
     m.update(vcenter_username.encode())
@@ -53,10 +1119,13 @@ async def open_session(
     if log_file:
         m.update(log_file.encode())
     m.update(b"yes" if validate_certs else b"no")
+    m.update(json.dumps(pool_settings, sort_keys=True).encode())
     digest = m.hexdigest()
-    # TODO: Handle session timeout
+    await evict_expired_sessions()
     if digest in open_session._pool:
-        return open_session._pool[digest]
+        return SessionView(
+            open_session._pool[digest], cache_ttls, retry_policy, timings
+        )
 
     exceptions = importlib.import_module(
         "ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions"
@@ -69,66 +1138,218 @@ async def open_session(
     if not aiohttp:
         raise exceptions.EmbeddedModuleFailure(msg="Failed to import aiohttp")
 
+    trace_configs = [RequestTimings.trace_config(aiohttp)]
     if log_file:
+        rest_logger = RestLogger.get(log_file)
         trace_config = aiohttp.TraceConfig()
 
+        async def on_request_start(session, trace_config_ctx, params):
+            trace_config_ctx.start = time.monotonic()
+
         async def on_request_end(session, trace_config_ctx, params):
-            with open(log_file, "a+", encoding="utf-8") as fd:
-                answer = await params.response.text()
-                fd.write(
-                    f"{params.method}: {params.url}\n"
-                    f"headers: {params.headers}\n"
-                    f"  status: {params.response.status}\n"
-                    f"  answer: {answer}\n\n"
-                )
+            # aiohttp keeps the body, the module will not read it twice
+            body = await params.response.read()
+            rest_logger.log_request(
+                params.method,
+                params.url,
+                params.headers,
+                time.monotonic() - trace_config_ctx.start,
+                status=params.response.status,
+                body=body,
+            )
 
+        async def on_request_exception(session, trace_config_ctx, params):
+            rest_logger.log_request(
+                params.method,
+                params.url,
+                params.headers,
+                time.monotonic() - trace_config_ctx.start,
+                error=repr(params.exception),
+            )
+
+        trace_config.on_request_start.append(on_request_start)
         trace_config.on_request_end.append(on_request_end)
-        trace_configs = [trace_config]
-    else:
-        trace_configs = []
+        trace_config.on_request_exception.append(on_request_exception)
+        # The hooks run in order, the RequestTimings must see the response
+        # headers before we read the body.
+        trace_configs.append(trace_config)
 
     auth = aiohttp.BasicAuth(vcenter_username, vcenter_password)
-    if validate_certs:
-        connector = aiohttp.TCPConnector(limit=20)
+    shared_connector = SharedConnector.get(
+        aiohttp, vcenter_hostname, validate_certs, pool_settings
+    )
+    trace_configs.append(shared_connector.trace_config(aiohttp))
+    if boolean(token_cache):
+        token_cache = SessionTokenCache(
+            digest, vcenter_hostname, vcenter_username, vcenter_password
+        )
     else:
-        connector = aiohttp.TCPConnector(limit=20, ssl=False)
-    async with aiohttp.ClientSession(
-        connector=connector, connector_owner=False, trace_configs=trace_configs
-    ) as session:
-        try:
-            async with session.post(
-                "https://{hostname}/rest/com/vmware/cis/session".format(
-                    hostname=vcenter_hostname
-                ),
-                auth=auth,
-            ) as resp:
-                if resp.status != 200:
-                    raise exceptions.EmbeddedModuleFailure(
-                        "Authentication failure. code: {0}, json: {1}".format(
-                            resp.status, await resp.text()
-                        )
-                    )
-                json = await resp.json()
-        except aiohttp.client_exceptions.ClientConnectorError as e:
-            raise exceptions.EmbeddedModuleFailure(f"Authentication failure: {e}")
-
-    session_id = json["value"]
-    session = aiohttp.ClientSession(
-        connector=connector,
-        headers={
-            "vmware-api-session-id": session_id,
-            "content-type": "application/json",
-        },
-        connector_owner=False,
-        trace_configs=trace_configs,
+        token_cache = None
+    session = PooledSession(
+        aiohttp,
+        vcenter_hostname,
+        auth,
+        shared_connector,
+        trace_configs,
+        pool_settings,
+        token_cache,
     )
+    # A cached session id is validated lazily: if vCenter has expired it,
+    # the first request gets a 401 and PooledSession logs in again.
+    cached_session_id = token_cache.load() if token_cache else None
+    if cached_session_id:
+        session.use_session_id(cached_session_id)
+    else:
+        try:
+            await session.login()
+        except Exception:
+            await session.close()
+            raise
     open_session._pool[digest] = session
-    return session
+    return SessionView(session, cache_ttls, retry_policy, timings)
 
 
 open_session._pool = {}
 
 
+def connection_argument_spec():
+    """Return the argument_spec of the options shared by all the modules.
+
+    The options are documented in the vmware.vmware_rest.connection doc
+    fragment.
+    """
+    return {
+        "vcenter_hostname": dict(
+            type="str",
+            required=True,
+            fallback=(env_fallback, ["VMWARE_HOST"]),
+        ),
+        "vcenter_username": dict(
+            type="str",
+            required=True,
+            fallback=(env_fallback, ["VMWARE_USER"]),
+        ),
+        "vcenter_password": dict(
+            type="str",
+            required=True,
+            no_log=True,
+            fallback=(env_fallback, ["VMWARE_PASSWORD"]),
+        ),
+        "vcenter_validate_certs": dict(
+            type="bool",
+            required=False,
+            default=True,
+            fallback=(env_fallback, ["VMWARE_VALIDATE_CERTS"]),
+        ),
+        "vcenter_rest_log_file": dict(
+            type="str",
+            required=False,
+            fallback=(env_fallback, ["VMWARE_REST_LOG_FILE"]),
+        ),
+        "session_timeout": dict(
+            type="float",
+            required=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_TIMEOUT"]),
+        ),
+        "session_connection_limit": dict(
+            type="int",
+            required=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_CONNECTION_LIMIT"]),
+        ),
+        "session_connection_limit_per_host": dict(
+            type="int",
+            required=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_CONNECTION_LIMIT_PER_HOST"]),
+        ),
+        "session_keepalive_timeout": dict(
+            type="float",
+            required=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_KEEPALIVE_TIMEOUT"]),
+        ),
+        "session_dns_cache_ttl": dict(
+            type="int",
+            required=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_DNS_CACHE_TTL"]),
+        ),
+        "session_token_cache": dict(
+            type="bool",
+            required=False,
+            default=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_TOKEN_CACHE"]),
+        ),
+        "session_cache": dict(
+            type="bool",
+            required=False,
+            default=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_CACHE"]),
+        ),
+        "session_cache_ttls": dict(
+            type="dict",
+            required=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_CACHE_TTLS"]),
+        ),
+        "session_retries": dict(
+            type="int",
+            required=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_RETRIES"]),
+        ),
+        "session_retry_backoff": dict(
+            type="float",
+            required=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_RETRY_BACKOFF"]),
+        ),
+        "session_timings": dict(
+            type="bool",
+            required=False,
+            default=False,
+            fallback=(env_fallback, ["VMWARE_SESSION_TIMINGS"]),
+        ),
+    }
+
+
+async def run_module(module, entry_point):
+    """Open the vCenter session of ``module``, run ``entry_point`` and exit.
+
+    This is the main() shared by all the modules, ``entry_point`` is the
+    coroutine that does the work of the module.
+    """
+    for name in ["vcenter_hostname", "vcenter_username", "vcenter_password"]:
+        if not module.params[name]:
+            module.fail_json(f"{name} cannot be empty")
+    exceptions = importlib.import_module(
+        "ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions"
+    )
+    try:
+        session = await open_session(
+            vcenter_hostname=module.params["vcenter_hostname"],
+            vcenter_username=module.params["vcenter_username"],
+            vcenter_password=module.params["vcenter_password"],
+            validate_certs=module.params["vcenter_validate_certs"],
+            log_file=module.params["vcenter_rest_log_file"],
+            retries=module.params["session_retries"],
+            retry_backoff=module.params["session_retry_backoff"],
+            response_cache=module.params["session_cache"],
+            response_cache_ttls=module.params["session_cache_ttls"],
+            token_cache=module.params["session_token_cache"],
+            connection_limit=module.params["session_connection_limit"],
+            connection_limit_per_host=module.params[
+                "session_connection_limit_per_host"
+            ],
+            keepalive_timeout=module.params["session_keepalive_timeout"],
+            dns_cache_ttl=module.params["session_dns_cache_ttl"],
+            timings=module.params["session_timings"],
+        )
+    except exceptions.EmbeddedModuleFailure as err:
+        module.fail_json(err.get_message())
+    try:
+        result = await entry_point(module, session)
+        debug = module._debug or module._verbosity >= 3
+        result.update(session_report(session, debug=debug))
+    finally:
+        await session.close()
+    module.exit_json(**result)
+
+
 def gen_args(params, in_query_parameter):
     elements = []
     for i in in_query_parameter:
@@ -277,9 +1498,99 @@ async def list_devices(session, url):
         return _json
 
 
-async def build_full_device_list(session, url, device_list):
-    import asyncio
+def too_many_results(status, _json):
+    """Whether vCenter refused to list the resources because there are too many."""
+    if status != 400 or not isinstance(_json, dict):
+        return False
+    error_type = _json.get("error_type") or _json.get("type") or ""  # 7.0.2 <
+    return "unable_to_allocate_resource" in error_type.lower()
+
+
+async def list_resources(session, url, **kwargs):
+    """Return the status and the JSON answer of a list end-point.
+
+    When vCenter refuses to return that many resources, the listing is
+    split in shards with the filters of LIST_SHARD_FILTERS, e.g: by
+    datacenter, then by host. The shards are listed concurrently, split
+    again if they are still too large, and their resources are merged
+    and deduplicated.
+    """
+    async with session.get(url, **kwargs) as resp:
+        _json = await resp.json()
+        status = resp.status
+    if not too_many_results(status, _json):
+        return status, _json
+
+    parts = urllib.parse.urlsplit(str(url))
+    query = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    for filter_name, source, forwarded_filters in LIST_SHARD_FILTERS.get(
+        parts.path, ()
+    ):
+        values = [v for k, v in query if k == filter_name]
+        if len(values) == 1:
+            # already restricted to a single value
+            continue
+        if not values:
+            values = await list_shard_values(
+                session,
+                parts,
+                source,
+                [(k, v) for k, v in query if k in forwarded_filters],
+                **kwargs,
+            )
+            if values is None:
+                continue
+        other_filters = [(k, v) for k, v in query if k != filter_name]
+        shards = await asyncio.gather(
+            *[
+                list_resources(
+                    session,
+                    urllib.parse.urlunsplit(
+                        parts._replace(
+                            query=urllib.parse.urlencode(
+                                other_filters + [(filter_name, value)],
+                                quote_via=urllib.parse.quote,
+                            )
+                        )
+                    ),
+                    **kwargs,
+                )
+                for value in values
+            ]
+        )
+        # e.g: /api/vcenter/vm -> vm
+        id_key = get_device_type(parts.path).replace("-", "_")
+        resources = {}
+        for shard_status, shard_json in shards:
+            if shard_status != 200:
+                return shard_status, shard_json
+            if isinstance(shard_json, dict):  # 7.0.2 <
+                shard_json = shard_json["value"]
+            for resource in shard_json:
+                resources.setdefault(resource[id_key], resource)
+        return 200, list(resources.values())
+    return status, _json
+
+
+async def list_shard_values(session, parts, source, filters, **kwargs):
+    """Return the values of a filter of LIST_SHARD_FILTERS, None on error."""
+    if not isinstance(source, str):
+        return list(source)
+    url = add_query_filters(
+        urllib.parse.urlunsplit((parts.scheme, parts.netloc, source, "", "")),
+        filters,
+    )
+    status, _json = await list_resources(session, url, **kwargs)
+    if status != 200:
+        return None
+    if isinstance(_json, dict):  # 7.0.2 <
+        _json = _json["value"]
+    id_key = get_device_type(urllib.parse.urlsplit(source).path)
+    return [i[id_key] for i in _json]
+
 
+def get_device_ids(device_list):
+    """Return the ids of a device list, or None if it already has the details."""
     device_ids = []
 
     if isinstance(device_list, list):
@@ -294,17 +1605,218 @@ async def build_full_device_list(session, url, device_list):
         fields = list(i.values())
         if len(fields) != 1:
             # The list already comes with all the details
-            return device_list
+            return None
         device_ids.append(fields[0])
+    return device_ids
+
+
+def default_concurrency(session):
+    """Number of detail requests to run in parallel on a session.
+
+    There is no point in going above the size of the connection pool, the
+    extra requests would just wait for a free connection.
+    """
+    pool_settings = getattr(session, "pool_settings", {})
+    return pool_settings.get("limit") or DEFAULT_CONNECTION_LIMIT
+
+
+async def _iter_device_info(session, url, device_ids, concurrency=None):
+    """Yield (index, status, details) as the requests complete.
+
+    At most ``concurrency`` requests are in flight, and at most
+    ``concurrency`` results wait to be consumed.
+    """
+    if not concurrency:
+        concurrency = default_concurrency(session)
+    queue = asyncio.Queue(maxsize=concurrency)
+    ids = iter(enumerate(device_ids))
+    done = object()
 
-    tasks = [
-        asyncio.ensure_future(get_device_info(session, url, _id)) for _id in device_ids
+    async def worker():
+        for index, _id in ids:
+            try:
+                status, _json = await _get_device_info(session, url, _id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status, _json = None, {"error": repr(e)}
+            await queue.put((index, status, _json))
+        await queue.put(done)
+
+    workers = [
+        asyncio.ensure_future(worker())
+        for _ in range(min(concurrency, len(device_ids)))
     ]
+    try:
+        running = len(workers)
+        while running:
+            item = await queue.get()
+            if item is done:
+                running -= 1
+                continue
+            yield item
+    finally:
+        for w in workers:
+            w.cancel()
 
-    return [await i for i in tasks]
 
+async def iter_full_device_list(
+    session, url, device_list, concurrency=None, failures=None
+):
+    """Yield the details of the devices as soon as they are received.
 
-async def get_device_info(session, url, _id):
+    The memory footprint does not depend on the size of the list. The
+    devices that cannot be fetched are appended to ``failures``.
+    """
+    device_ids = get_device_ids(device_list)
+    if device_ids is None:
+        for i in device_list if isinstance(device_list, list) else device_list["value"]:
+            yield i
+        return
+
+    async for index, status, _json in _iter_device_info(
+        session, url, device_ids, concurrency
+    ):
+        if status == 200:
+            yield _json
+        elif failures is not None:
+            failures.append(_device_failure(device_ids[index], status, _json))
+
+
+async def build_full_device_list(
+    session, url, device_list, concurrency=None, failures=None
+):
+    """Fetch the details of the devices of a list, in the order of the list.
+
+    If ``failures`` is a list, the devices that cannot be fetched are
+    reported in it and skipped. Otherwise they are returned as None.
+    """
+    device_ids = get_device_ids(device_list)
+    if device_ids is None:
+        return device_list
+
+    results = [None] * len(device_ids)
+    failed = set()
+    async for index, status, _json in _iter_device_info(
+        session, url, device_ids, concurrency
+    ):
+        if status == 200:
+            results[index] = _json
+        elif failures is not None:
+            failures.append(_device_failure(device_ids[index], status, _json))
+            failed.add(index)
+    return [r for index, r in enumerate(results) if index not in failed]
+
+
+def project_properties(value, properties):
+    """Keep only the ``properties`` keys of a resource, e.g: cpu, memory."""
+    if not properties:
+        return value
+    return {k: value[k] for k in properties if k in value}
+
+
+async def iter_details(
+    session, url, resources, id_key, properties=None, concurrency=None, failures=None
+):
+    """Yield (index, resource) with the details of the resources of a list.
+
+    The details are fetched at ``url``/<id> with at most ``concurrency``
+    requests in flight, and are yielded as soon as they are received. They
+    are merged with the summary of the list and reduced to ``properties``,
+    so only the requested keys are kept in memory. The resources that
+    cannot be fetched are appended to ``failures``.
+    """
+    ids = [r[id_key] for r in resources]
+    async for index, status, _json in _iter_device_info(session, url, ids, concurrency):
+        if status == 200:
+            details = project_properties(
+                dict(resources[index], **_json["value"]), properties
+            )
+            yield index, dict({id_key: ids[index]}, **details)
+        elif failures is not None:
+            failures.append(_device_failure(ids[index], status, _json))
+
+
+async def list_details(
+    session, url, resources, id_key, properties=None, concurrency=None
+):
+    """Return the resources of a list with their details, in the same order.
+
+    See iter_details().
+    """
+    value = [None] * len(resources)
+    failures = []
+    async for index, details in iter_details(
+        session, url, resources, id_key, properties, concurrency, failures
+    ):
+        value[index] = details
+    _json = {"value": [i for i in value if i is not None]}
+    if failures:
+        _json["failed_devices"] = failures
+    return _json
+
+
+async def export_resources(session, params, resource, url, resources, id_key):
+    """Write the resources of a list in the JSON-lines file ``dest``.
+
+    With ``include_details``, or when the list only has ids, the details of
+    each resource are written as soon as they are received. The memory
+    footprint does not depend on the number of resources. The file is
+    replaced once it is complete. Return the path of the file and the
+    number of resources written.
+    """
+    failures = []
+    if id_key and params.get("include_details"):
+        details = iter_details(
+            session,
+            ("https://{vcenter_hostname}" + resource["list"]).format(**params),
+            resources,
+            id_key,
+            params.get("properties"),
+            params.get("concurrency"),
+            failures,
+        )
+        records = (i async for _, i in details)
+    elif id_key and resources and isinstance(resources[0], str):
+        devices = iter_full_device_list(session, str(url), resources, failures=failures)
+        records = (i["value"] async for i in devices)
+    else:
+        records = None
+
+    dest = params["dest"]
+    tmp_path = f"{dest}.{os.getpid()}"
+    count = 0
+    try:
+        with open(tmp_path, "w") as fd:
+            if records is None:
+                for i in resources:
+                    fd.write(json_dumps(i) + "\n")
+                count = len(resources)
+            else:
+                async for i in records:
+                    fd.write(json_dumps(i) + "\n")
+                    count += 1
+        os.replace(tmp_path, dest)
+    except OSError as e:
+        return {"failed": True, "changed": False, "msg": f"Unable to write {dest}: {e}"}
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    _json = {"value": {"dest": dest, "count": count}}
+    if failures:
+        _json["failed_devices"] = failures
+    return _json
+
+
+def _device_failure(_id, status, _json):
+    failure = {"id": str(_id), "status": status}
+    if isinstance(_json, dict):
+        failure["value"] = _json.get("value", _json)
+    return failure
+
+
+async def _get_device_info(session, url, _id):
     # remove the action=foo from the URL
     m = re.search("(.+)(action=[-a-z]+)(.*)", url)
     if m:
@@ -318,17 +1830,31 @@ async def get_device_info(session, url, _id):
         item_url = url + "/" + _id
 
     async with session.get(item_url) as resp:
-        if resp.status == 200:
+        try:
             _json = await resp.json()
+        except Exception:
+            _json = None
+        if resp.status == 200:
             if "value" not in _json:  # 7.0.2+
                 _json = {"value": _json}
             _json["id"] = str(_id)
-            return _json
+        return resp.status, _json
+
+
+async def get_device_info(session, url, _id):
+    status, _json = await _get_device_info(session, url, _id)
+    if status == 200:
+        return _json
 
 
 async def exists(
     params, session, url, uniquity_keys=None, per_id_url=None, comp_func=None
 ):
+    """Return the first device of the list at ``url`` that matches ``params``.
+
+    The uniquity keys are pushed in the query when the end-point supports a
+    matching filter, and the details are compared as soon as they arrive.
+    """
     if not uniquity_keys:
         uniquity_keys = []
     if not per_id_url:
@@ -356,15 +1882,64 @@ async def exists(
 
     if not comp_func:
         comp_func = default_comp_func
+        uniquity_keys += ["label", "pci_slot_number", "sata"]
+        if not any(params.get(k) for k in uniquity_keys):
+            # nothing to compare with, no device can match
+            return None
+    else:
+        uniquity_keys += ["label", "pci_slot_number", "sata"]
 
-    uniquity_keys += ["label", "pci_slot_number", "sata"]
-
+    url = add_query_filters(str(url), exists_query_filters(params, url, uniquity_keys))
     devices = await list_devices(session, url)
-    full_devices = await build_full_device_list(session, per_id_url, devices)
+    if isinstance(devices, dict) and "value" not in devices:
+        return None  # e.g: an error
+    # e.g: /api/vcenter/resource-pool -> resource_pool
+    id_key = get_device_type(urllib.parse.urlsplit(url).path).replace("-", "_")
+
+    # Stop as soon as a device matches, the pending requests are cancelled.
+    # A device that disappeared since the listing cannot match.
+    device_iterator = iter_full_device_list(session, per_id_url, devices, failures=[])
+    try:
+        async for device in device_iterator:
+            if isinstance(device, dict) and "value" not in device:
+                # The list already comes with all the details (7.0.2+)
+                device = {"value": device}
+                if id_key in device["value"]:
+                    device["id"] = device["value"][id_key]
+            if comp_func(device):
+                return device
+    finally:
+        await device_iterator.aclose()
+
+
+def exists_query_filters(params, url, uniquity_keys):
+    """Return the query filters that narrow a listing to the wanted device.
+
+    The filters are only an optimization, the devices are still compared
+    with the uniquity keys.
+    """
+    path = urllib.parse.urlsplit(str(url)).path
+    supported = EXISTS_QUERY_FILTERS.get(path, {})
+    filters = []
+    for k in uniquity_keys:
+        if k in supported and params.get(k) and isinstance(params[k], str):
+            filters.append((supported[k], params[k]))
+    return filters
+
 
-    for device in full_devices:
-        if comp_func(device):
-            return device
+def add_query_filters(url, filters):
+    """Add query parameters to an URL, unless they are already set."""
+    if not filters:
+        return url
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    already_set = {k for k, _ in query}
+    query += [(k, v) for k, v in filters if k not in already_set]
+    return urllib.parse.urlunsplit(
+        parts._replace(
+            query=urllib.parse.urlencode(query, quote_via=urllib.parse.quote)
+        )
+    )
 
 
 def set_subkey(root, path, value):
@@ -413,3 +1988,377 @@ def get_device_type(url):
         return "port"
     else:
         return device_type
+
+
+def info_url(params, resource, payload_format):
+    """Return the URL to call for an info module.
+
+    ``resource`` describes the end-points of the module:
+
+    - ``get``: the path of the resource, or the prefix of the path of a
+      given resource when the module can also list them,
+    - ``list``: the path of the list of the resources,
+    - ``id``: the option that holds the identifier of a resource.
+    """
+    import yarl
+
+    base = "https://{vcenter_hostname}"
+    if "list" not in resource:
+        _in_query_parameters = list(payload_format.values())[0]["query"].keys()
+        return (base + resource["get"]).format(**params) + gen_args(
+            params, _in_query_parameters
+        )
+    if resource.get("id") and params.get(resource["id"]):
+        _in_query_parameters = payload_format["get"]["query"].keys()
+        return yarl.URL(
+            (base + resource["get"]).format(**params)
+            + params[resource["id"]]
+            + gen_args(params, _in_query_parameters),
+            encoded=True,
+        )
+    _in_query_parameters = payload_format["list"]["query"].keys()
+    return yarl.URL(
+        (base + resource["list"]).format(**params)
+        + gen_args(params, _in_query_parameters),
+        encoded=True,
+    )
+
+
+async def info_entry_point(module, session, resource, payload_format):
+    """The entry_point() of the info modules, see info_url() for ``resource``."""
+    params = module.params
+    url = info_url(params, resource, payload_format)
+    if "list" not in resource:
+        async with session.get(url, **session_timeout(params)) as resp:
+            try:
+                if resp.headers["Content-Type"] == "application/json":
+                    _json = await resp.json()
+            except KeyError:
+                _json = {}
+            return await update_changed_flag(_json, resp.status, "get")
+
+    id_key = resource.get("id")
+    status, _json = await list_resources(session, url, **session_timeout(params))
+
+    if "value" not in _json:  # 7.0.2+
+        _json = {"value": _json}
+
+    if (
+        params.get("dest")
+        and not (id_key and params.get(id_key))
+        and status == 200
+        and isinstance(_json["value"], list)
+    ):
+        _json = await export_resources(
+            session, params, resource, url, _json["value"], id_key
+        )
+        if _json.get("failed"):
+            return _json
+        return await update_changed_flag(_json, status, "get")
+
+    if not id_key:
+        # the end-point can only list the resources
+        return await update_changed_flag(_json, status, "get")
+
+    if params.get(id_key):
+        _json["id"] = params.get(id_key)
+        if status == 200 and isinstance(_json["value"], dict):
+            _json["value"] = project_properties(
+                _json["value"], params.get("properties")
+            )
+    elif params.get("include_details") and isinstance(_json["value"], list):
+        # e.g: /api/vcenter/vm/{vm} for each VM of the list
+        _json = await list_details(
+            session,
+            ("https://{vcenter_hostname}" + resource["list"]).format(**params),
+            _json["value"],
+            id_key,
+            params.get("properties"),
+            params.get("concurrency"),
+        )
+    elif params.get("label"):  # TODO extend the list of filter
+        _json = await exists(params, session, str(url))
+    elif (
+        isinstance(_json["value"], list)
+        and len(_json["value"]) > 0
+        and isinstance(_json["value"][0], str)
+    ):
+        # this is a list of id, we fetch the details
+        failures = []
+        full_device_list = await build_full_device_list(
+            session, str(url), _json, failures=failures
+        )
+        _json = {"value": [i["value"] for i in full_device_list]}
+        if failures:
+            _json["failed_devices"] = failures
+
+    return await update_changed_flag(_json, status, "get")
+
+
+def operation_url(params, path, payload_format=None):
+    """Return the URL of an operation of a module built from default_module.j2.
+
+    The query parameters of the operation are added when ``payload_format``
+    is given.
+    """
+    _url = ("https://{vcenter_hostname}" + path).format(**params)
+    if payload_format is None:
+        return _url
+    return _url + gen_args(params, payload_format["query"].keys())
+
+
+async def _resolve_subdevice(params, session, resource, path):
+    # e.g: the {cdrom} of /api/vcenter/vm/{vm}/hardware/cdrom/{cdrom}
+    subdevice_type = get_subdevice_type(path)
+    if subdevice_type and not params[subdevice_type]:
+        _json = await exists(params, session, operation_url(params, resource["url"]))
+        if _json:
+            params[subdevice_type] = _json["id"]
+        return _json
+
+
+async def _read_json(resp, _json=None):
+    """Return the JSON answer, {} without a Content-Type, else ``_json``."""
+    try:
+        if resp.headers["Content-Type"] == "application/json":
+            _json = await resp.json()
+    except KeyError:
+        _json = {}
+    return _json
+
+
+async def _operation_action(params, session, resource, payload_format, operation):
+    _, method, path = resource["operations"][operation]
+    payload = prepare_payload(params, payload_format[operation])
+    _json = await _resolve_subdevice(params, session, resource, path)
+    _url = operation_url(params, path, payload_format[operation])
+    request = getattr(session, method)
+    async with request(_url, json=payload, **session_timeout(params)) as resp:
+        _json = await _read_json(resp, _json)
+        if "value" not in _json:  # 7.0.2
+            _json = {"value": _json}
+        return await update_changed_flag(_json, resp.status, operation)
+
+
+async def _operation_delete(params, session, resource, payload_format, operation):
+    _, method, path = resource["operations"][operation]
+    payload = prepare_payload(params, payload_format[operation])
+    _json = await _resolve_subdevice(params, session, resource, path)
+    _url = operation_url(params, path, payload_format[operation])
+    request = getattr(session, method)
+    async with request(_url, json=payload, **session_timeout(params)) as resp:
+        _json = await _read_json(resp, _json)
+        return await update_changed_flag(_json, resp.status, operation)
+
+
+async def _operation_set(params, session, resource, payload_format, operation):
+    _, method, path = resource["operations"][operation]
+    payload = prepare_payload(params, payload_format[operation])
+    _json = await _resolve_subdevice(params, session, resource, path)
+    _url = operation_url(params, path, payload_format[operation])
+    async with session.get(_url, json=payload, **session_timeout(params)) as resp:
+        before = await resp.json()
+
+    request = getattr(session, method)
+    async with request(_url, json=payload, **session_timeout(params)) as resp:
+        _json = await _read_json(resp, _json)
+        if "value" not in _json:  # 7.0.2
+            _json = {"value": _json}
+
+        # The PUT answer does not let us know if the resource has actually been
+        # modified
+        if resp.status < 300:
+            async with session.get(
+                _url, json=payload, **session_timeout(params)
+            ) as resp_get:
+                after = await resp_get.json()
+                if before == after:
+                    return await update_changed_flag(after, resp_get.status, "get")
+        return await update_changed_flag(_json, resp.status, operation)
+
+
+async def _operation_update(params, session, resource, payload_format, operation):
+    _, method, path = resource["operations"][operation]
+    id_key = str(resource.get("id"))
+    payload = prepare_payload(params, payload_format[operation])
+    _url = operation_url(params, path)
+    async with session.get(_url, **session_timeout(params)) as resp:
+        _json = await resp.json()
+        if "value" in _json:
+            value = _json["value"]
+        else:  # 7.0.2 and greater
+            value = _json
+        for k, v in value.items():
+            if k in payload:
+                if isinstance(payload[k], dict) and isinstance(v, dict):
+                    to_delete = True
+                    for _k in list(payload[k].keys()):
+                        if payload[k][_k] != v.get(_k):
+                            to_delete = False
+                    if to_delete:
+                        del payload[k]
+                elif payload[k] == v:
+                    del payload[k]
+                elif payload[k] == {}:
+                    del payload[k]
+
+        if payload == {} or payload == {"spec": {}}:
+            # Nothing has changed
+            if "value" not in _json:  # 7.0.2
+                _json = {"value": _json}
+            _json["id"] = params.get(id_key)
+            return await update_changed_flag(_json, resp.status, "get")
+    request = getattr(session, method)
+    async with request(_url, json=payload, **session_timeout(params)) as resp:
+        _json = await _read_json(resp, _json)
+        if "value" not in _json:  # 7.0.2
+            _json = {"value": _json}
+
+        # e.g: content_configuration
+        if not _json and resp.status == 204:
+            async with session.get(_url, **session_timeout(params)) as resp_get:
+                _json_get = await resp_get.json()
+                if _json_get:
+                    _json = _json_get
+
+        _json["id"] = params.get(id_key)
+        return await update_changed_flag(_json, resp.status, operation)
+
+
+async def _lookup_with_filters(params, session, resource, url):
+    id_key = resource["id"]
+    search_filter = ""
+    lookup_filter = resource["lookup_filter"]
+    if lookup_filter:
+        if lookup_filter not in params:
+            return
+        search_filter = f"&{lookup_filter}s={params.get(lookup_filter)}"
+
+    if "name" not in params:
+        return
+    async with session.get(f"{url}?names={params['name']}{search_filter}") as resp:
+        _json = await resp.json()
+        if isinstance(_json, list) and len(_json) == 1:
+            return await get_device_info(session, url, _json[0][id_key])
+
+
+async def _find_existing(params, session, resource):
+    """Return the resource that ``create`` would create, if it already exists."""
+    id_key = resource["id"]
+    url = operation_url(params, resource["url"])
+    # exists() extends the list
+    uniquity_keys = list(resource["uniquity_keys"])
+
+    _json = None
+
+    if params[id_key]:
+        _json = await get_device_info(session, url, params[id_key])
+
+    if not _json and uniquity_keys:
+        _json = await exists(
+            params,
+            session,
+            url=url,
+            uniquity_keys=uniquity_keys,
+            per_id_url=url,
+            comp_func=None,
+        )
+
+    if not _json and "lookup_filter" in resource:
+        _json = await _lookup_with_filters(params, session, resource, url)
+    return _json
+
+
+async def _operation_create(params, session, resource, payload_format, operation):
+    _, method, path = resource["operations"][operation]
+    _json = None
+    if "id" in resource:
+        _json = await _find_existing(params, session, resource)
+        if _json:
+            if "value" not in _json:  # 7.0.2+
+                _json = {"value": _json}
+            if "update" in resource["operations"]:
+                params[resource["id"]] = _json["id"]
+                return await run_operation(
+                    params, session, resource, payload_format, "update"
+                )
+
+            return await update_changed_flag(_json, 200, "get")
+
+    payload = prepare_payload(params, payload_format[operation])
+    _url = operation_url(params, path)
+    request = getattr(session, method)
+    async with request(_url, json=payload, **session_timeout(params)) as resp:
+        if resp.status == 500:
+            text = await resp.text()
+            exceptions = importlib.import_module(
+                "ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions"
+            )
+            raise exceptions.EmbeddedModuleFailure(
+                f"Request has failed: status={resp.status}, {text}"
+            )
+        _json = await _read_json(resp, _json)
+
+        if (resp.status in [200, 201]) and "error" not in _json:
+            if isinstance(_json, str):  # 7.0.2 and greater
+                _id = _json  # TODO: fetch the object
+            elif isinstance(_json, dict) and "value" not in _json:
+                _id = list(_json["value"].values())[0]
+            elif isinstance(_json, dict) and "value" in _json:
+                _id = _json["value"]
+            _json_device_info = await get_device_info(session, _url, _id)
+            if _json_device_info:
+                _json = _json_device_info
+
+        return await update_changed_flag(_json, resp.status, operation)
+
+
+OPERATION_TEMPLATES = {
+    "action": _operation_action,
+    "create": _operation_create,
+    "delete": _operation_delete,
+    "set": _operation_set,
+    "update": _operation_update,
+}
+
+
+async def run_operation(params, session, resource, payload_format, operation):
+    """Run an operation of a module built from default_module.j2."""
+    template = resource["operations"][operation][0]
+    return await OPERATION_TEMPLATES[template](
+        params, session, resource, payload_format, operation
+    )
+
+
+async def operation_entry_point(module, session, resource, payload_format):
+    """The entry_point() of the modules built from default_module.j2.
+
+    ``resource`` describes the end-points of the module:
+
+    - ``url``: the path of the list of the resources,
+    - ``operations``: the ``(template, HTTP method, path)`` of each
+      operation, ``template`` is the code of default_module.j2 that runs
+      it, see OPERATION_TEMPLATES,
+    - ``id``: the option that holds the identifier of a resource. Without
+      it, ``create`` does not search for an existing resource,
+    - ``uniquity_keys``: the options that identify an existing resource,
+    - ``lookup_filter``: when set, ``create`` also searches for an existing
+      resource by name, and by this option if it is not empty.
+    """
+    operations = resource["operations"]
+    if "state" not in module.params:
+        # the module has a single operation
+        operation = next(iter(operations))
+    elif module.params["state"] == "present":
+        if "create" in operations:
+            operation = "create"
+        else:
+            operation = "update"
+    elif module.params["state"] == "absent":
+        operation = "delete"
+    else:
+        operation = module.params["state"]
+
+    return await run_operation(
+        module.params, session, resource, payload_format, operation
+    )
@@ -11,52 +11,8 @@ DOCUMENTATION = r"""
 module: appliance_access_consolecli_info
 short_description: Get enabled state of the console-based controlled CLI (TTY1).
 description: Get enabled state of the console-based controlled CLI (TTY1).
-options:
-    session_timeout:
-        description:
-        - 'Timeout settings for client session. '
-        - 'The maximal number of seconds for the whole operation including connection
-            establishment, request sending and response. '
-        - The default value is 300s.
-        type: float
-        version_added: 2.1.0
-    vcenter_hostname:
-        description:
-        - The hostname or IP address of the vSphere vCenter
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_HOST) will be used instead.
-        required: true
-        type: str
-    vcenter_password:
-        description:
-        - The vSphere vCenter password
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_PASSWORD) will be used instead.
-        required: true
-        type: str
-    vcenter_rest_log_file:
-        description:
-        - 'You can use this optional parameter to set the location of a log file. '
-        - 'This file will be used to record the HTTP REST interaction. '
-        - 'The file will be stored on the host that run the module. '
-        - 'If the value is not specified in the task, the value of '
-        - environment variable C(VMWARE_REST_LOG_FILE) will be used instead.
-        type: str
-    vcenter_username:
-        description:
-        - The vSphere vCenter username
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_USER) will be used instead.
-        required: true
-        type: str
-    vcenter_validate_certs:
-        default: true
-        description:
-        - Allows connection when SSL certificates are not valid. Set to C(false) when
-            certificates are not trusted.
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_VALIDATE_CERTS) will be used instead.
-        type: bool
+extends_documentation_fragment:
+- vmware.vmware_rest.connection
 author:
 - Ansible Cloud Team (@ansible-collections)
 version_added: 2.0.0
@@ -87,12 +43,10 @@ PAYLOAD_FORMAT = {
     "get": {"query": {}, "body": {}, "path": {}}
 }  # pylint: disable=line-too-long
 
-from ansible.module_utils.basic import env_fallback
+# The end-points of the module, see info_url() in module_utils
+RESOURCE = {"get": "/api/appliance/access/consolecli"}
 
 try:
-    from ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions import (
-        EmbeddedModuleFailure,
-    )
     from ansible_collections.cloud.common.plugins.module_utils.turbo.module import (
         AnsibleTurboModule as AnsibleModule,
     )
@@ -101,48 +55,14 @@ try:
 except ImportError:
     from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.vmware.vmware_rest.plugins.module_utils.vmware_rest import (
-    gen_args,
-    open_session,
-    session_timeout,
-    update_changed_flag,
+    connection_argument_spec,
+    info_entry_point,
+    run_module,
 )
 
 
 def prepare_argument_spec():
-    argument_spec = {
-        "vcenter_hostname": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_HOST"]),
-        ),
-        "vcenter_username": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_USER"]),
-        ),
-        "vcenter_password": dict(
-            type="str",
-            required=True,
-            no_log=True,
-            fallback=(env_fallback, ["VMWARE_PASSWORD"]),
-        ),
-        "vcenter_validate_certs": dict(
-            type="bool",
-            required=False,
-            default=True,
-            fallback=(env_fallback, ["VMWARE_VALIDATE_CERTS"]),
-        ),
-        "vcenter_rest_log_file": dict(
-            type="str",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_REST_LOG_FILE"]),
-        ),
-        "session_timeout": dict(
-            type="float",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_SESSION_TIMEOUT"]),
-        ),
-    }
+    argument_spec = connection_argument_spec()
 
     return argument_spec
 
@@ -154,50 +74,12 @@ async def main():
     module = AnsibleModule(
         argument_spec=module_args, required_if=required_if, supports_check_mode=True
     )
-    if not module.params["vcenter_hostname"]:
-        module.fail_json("vcenter_hostname cannot be empty")
-    if not module.params["vcenter_username"]:
-        module.fail_json("vcenter_username cannot be empty")
-    if not module.params["vcenter_password"]:
-        module.fail_json("vcenter_password cannot be empty")
-    try:
-        session = await open_session(
-            vcenter_hostname=module.params["vcenter_hostname"],
-            vcenter_username=module.params["vcenter_username"],
-            vcenter_password=module.params["vcenter_password"],
-            validate_certs=module.params["vcenter_validate_certs"],
-            log_file=module.params["vcenter_rest_log_file"],
-        )
-    except EmbeddedModuleFailure as err:
-        module.fail_json(err.get_message())
-    result = await entry_point(module, session)
-    module.exit_json(**result)
+    await run_module(module, entry_point)
 
 
 # template: info_no_list_module.j2
-def build_url(params):
-    return ("https://{vcenter_hostname}" "/api/appliance/access/consolecli").format(
-        **params
-    )
-
-
 async def entry_point(module, session):
-    return await _info(module.params, session)
-
-
-async def _info(params, session):
-    payload_format = list(PAYLOAD_FORMAT.values())[0]
-    _in_query_parameters = payload_format["query"].keys()
-    _url = ("https://{vcenter_hostname}" "/api/appliance/access/consolecli").format(
-        **params
-    ) + gen_args(params, _in_query_parameters)
-    async with session.get(_url, **session_timeout(params)) as resp:
-        try:
-            if resp.headers["Content-Type"] == "application/json":
-                _json = await resp.json()
-        except KeyError:
-            _json = {}
-        return await update_changed_flag(_json, resp.status, "get")
+    return await info_entry_point(module, session, RESOURCE, PAYLOAD_FORMAT)
 
 
 if __name__ == "__main__":
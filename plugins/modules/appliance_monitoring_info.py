@@ -12,57 +12,14 @@ module: appliance_monitoring_info
 short_description: Get monitored item info
 description: Get monitored item info
 options:
-    session_timeout:
-        description:
-        - 'Timeout settings for client session. '
-        - 'The maximal number of seconds for the whole operation including connection
-            establishment, request sending and response. '
-        - The default value is 300s.
-        type: float
-        version_added: 2.1.0
     stat_id:
         description:
         - statistic item id
         - The parameter must be the id of a resource returned by M(vmware.vmware_rest.appliance_monitoring_info).
             Required with I(state=['get'])
         type: str
-    vcenter_hostname:
-        description:
-        - The hostname or IP address of the vSphere vCenter
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_HOST) will be used instead.
-        required: true
-        type: str
-    vcenter_password:
-        description:
-        - The vSphere vCenter password
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_PASSWORD) will be used instead.
-        required: true
-        type: str
-    vcenter_rest_log_file:
-        description:
-        - 'You can use this optional parameter to set the location of a log file. '
-        - 'This file will be used to record the HTTP REST interaction. '
-        - 'The file will be stored on the host that run the module. '
-        - 'If the value is not specified in the task, the value of '
-        - environment variable C(VMWARE_REST_LOG_FILE) will be used instead.
-        type: str
-    vcenter_username:
-        description:
-        - The vSphere vCenter username
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_USER) will be used instead.
-        required: true
-        type: str
-    vcenter_validate_certs:
-        default: true
-        description:
-        - Allows connection when SSL certificates are not valid. Set to C(false) when
-            certificates are not trusted.
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_VALIDATE_CERTS) will be used instead.
-        type: bool
+extends_documentation_fragment:
+- vmware.vmware_rest.connection
 author:
 - Ansible Cloud Team (@ansible-collections)
 version_added: 2.0.0
@@ -917,12 +874,14 @@ PAYLOAD_FORMAT = {
     "list": {"query": {}, "body": {}, "path": {}},
 }  # pylint: disable=line-too-long
 
-from ansible.module_utils.basic import env_fallback
+# The end-points of the module, see info_url() in module_utils
+RESOURCE = {
+    "list": "/api/appliance/monitoring",
+    "get": "/api/appliance/monitoring/",
+    "id": "stat_id",
+}
 
 try:
-    from ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions import (
-        EmbeddedModuleFailure,
-    )
     from ansible_collections.cloud.common.plugins.module_utils.turbo.module import (
         AnsibleTurboModule as AnsibleModule,
     )
@@ -931,50 +890,14 @@ try:
 except ImportError:
     from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.vmware.vmware_rest.plugins.module_utils.vmware_rest import (
-    build_full_device_list,
-    exists,
-    gen_args,
-    open_session,
-    session_timeout,
-    update_changed_flag,
+    connection_argument_spec,
+    info_entry_point,
+    run_module,
 )
 
 
 def prepare_argument_spec():
-    argument_spec = {
-        "vcenter_hostname": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_HOST"]),
-        ),
-        "vcenter_username": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_USER"]),
-        ),
-        "vcenter_password": dict(
-            type="str",
-            required=True,
-            no_log=True,
-            fallback=(env_fallback, ["VMWARE_PASSWORD"]),
-        ),
-        "vcenter_validate_certs": dict(
-            type="bool",
-            required=False,
-            default=True,
-            fallback=(env_fallback, ["VMWARE_VALIDATE_CERTS"]),
-        ),
-        "vcenter_rest_log_file": dict(
-            type="str",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_REST_LOG_FILE"]),
-        ),
-        "session_timeout": dict(
-            type="float",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_SESSION_TIMEOUT"]),
-        ),
-    }
+    argument_spec = connection_argument_spec()
 
     argument_spec["stat_id"] = {"type": "str"}
 
@@ -988,68 +911,12 @@ async def main():
     module = AnsibleModule(
         argument_spec=module_args, required_if=required_if, supports_check_mode=True
     )
-    if not module.params["vcenter_hostname"]:
-        module.fail_json("vcenter_hostname cannot be empty")
-    if not module.params["vcenter_username"]:
-        module.fail_json("vcenter_username cannot be empty")
-    if not module.params["vcenter_password"]:
-        module.fail_json("vcenter_password cannot be empty")
-    try:
-        session = await open_session(
-            vcenter_hostname=module.params["vcenter_hostname"],
-            vcenter_username=module.params["vcenter_username"],
-            vcenter_password=module.params["vcenter_password"],
-            validate_certs=module.params["vcenter_validate_certs"],
-            log_file=module.params["vcenter_rest_log_file"],
-        )
-    except EmbeddedModuleFailure as err:
-        module.fail_json(err.get_message())
-    result = await entry_point(module, session)
-    module.exit_json(**result)
+    await run_module(module, entry_point)
 
 
 # template: info_list_and_get_module.j2
-def build_url(params):
-    import yarl
-
-    if params.get("stat_id"):
-        _in_query_parameters = PAYLOAD_FORMAT["get"]["query"].keys()
-        return yarl.URL(
-            ("https://{vcenter_hostname}" "/api/appliance/monitoring/").format(**params)
-            + params["stat_id"]
-            + gen_args(params, _in_query_parameters),
-            encoded=True,
-        )
-    _in_query_parameters = PAYLOAD_FORMAT["list"]["query"].keys()
-    return yarl.URL(
-        ("https://{vcenter_hostname}" "/api/appliance/monitoring").format(**params)
-        + gen_args(params, _in_query_parameters),
-        encoded=True,
-    )
-
-
 async def entry_point(module, session):
-    url = build_url(module.params)
-    async with session.get(url, **session_timeout(module.params)) as resp:
-        _json = await resp.json()
-
-        if "value" not in _json:  # 7.0.2+
-            _json = {"value": _json}
-
-        if module.params.get("stat_id"):
-            _json["id"] = module.params.get("stat_id")
-        elif module.params.get("label"):  # TODO extend the list of filter
-            _json = await exists(module.params, session, str(url))
-        elif (
-            isinstance(_json["value"], list)
-            and len(_json["value"]) > 0
-            and isinstance(_json["value"][0], str)
-        ):
-            # this is a list of id, we fetch the details
-            full_device_list = await build_full_device_list(session, str(url), _json)
-            _json = {"value": [i["value"] for i in full_device_list]}
-
-        return await update_changed_flag(_json, resp.status, "get")
+    return await info_entry_point(module, session, RESOURCE, PAYLOAD_FORMAT)
 
 
 if __name__ == "__main__":
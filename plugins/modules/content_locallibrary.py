@@ -205,14 +205,6 @@ options:
         - 'When clients pass a value of this structure as a parameter, the field must
             be the id of a resource returned by M(vmware.vmware_rest.vcenter_cluster_info). '
         type: str
-    session_timeout:
-        description:
-        - 'Timeout settings for client session. '
-        - 'The maximal number of seconds for the whole operation including connection
-            establishment, request sending and response. '
-        - The default value is 300s.
-        type: float
-        version_added: 2.1.0
     state:
         choices:
         - absent
@@ -443,43 +435,6 @@ options:
             security policy will be changed to the value specified in LibraryModel.security-policy-id,
             if any.
         type: bool
-    vcenter_hostname:
-        description:
-        - The hostname or IP address of the vSphere vCenter
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_HOST) will be used instead.
-        required: true
-        type: str
-    vcenter_password:
-        description:
-        - The vSphere vCenter password
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_PASSWORD) will be used instead.
-        required: true
-        type: str
-    vcenter_rest_log_file:
-        description:
-        - 'You can use this optional parameter to set the location of a log file. '
-        - 'This file will be used to record the HTTP REST interaction. '
-        - 'The file will be stored on the host that run the module. '
-        - 'If the value is not specified in the task, the value of '
-        - environment variable C(VMWARE_REST_LOG_FILE) will be used instead.
-        type: str
-    vcenter_username:
-        description:
-        - The vSphere vCenter username
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_USER) will be used instead.
-        required: true
-        type: str
-    vcenter_validate_certs:
-        default: true
-        description:
-        - Allows connection when SSL certificates are not valid. Set to C(false) when
-            certificates are not trusted.
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_VALIDATE_CERTS) will be used instead.
-        type: bool
     version:
         description:
         - 'A version number which is updated on metadata changes. This value allows
@@ -495,6 +450,8 @@ options:
             operation. Leaving it unset during update indicates that you do not need
             to detect concurrent updates.
         type: str
+extends_documentation_fragment:
+- vmware.vmware_rest.connection
 author:
 - Ansible Cloud Team (@ansible-collections)
 version_added: 2.0.0
@@ -1484,12 +1441,24 @@ PAYLOAD_FORMAT = {
     },
 }  # pylint: disable=line-too-long
 
-from ansible.module_utils.basic import env_fallback
+# The end-points of the module, see operation_entry_point() in module_utils
+RESOURCE = {
+    "url": "/api/content/local-library",
+    "id": "library_id",
+    "uniquity_keys": ["name"],
+    "operations": {
+        "create": ("create", "post", "/api/content/local-library"),
+        "delete": ("delete", "delete", "/api/content/local-library/{library_id}"),
+        "publish": (
+            "action",
+            "post",
+            "/api/content/local-library/{library_id}?action=publish",
+        ),
+        "update": ("update", "patch", "/api/content/local-library/{library_id}"),
+    },
+}
 
 try:
-    from ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions import (
-        EmbeddedModuleFailure,
-    )
     from ansible_collections.cloud.common.plugins.module_utils.turbo.module import (
         AnsibleTurboModule as AnsibleModule,
     )
@@ -1498,52 +1467,16 @@ try:
 except ImportError:
     from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.vmware.vmware_rest.plugins.module_utils.vmware_rest import (
+    connection_argument_spec,
     exists,
-    gen_args,
-    get_device_info,
-    get_subdevice_type,
-    open_session,
-    prepare_payload,
+    operation_entry_point,
+    run_module,
     session_timeout,
-    update_changed_flag,
 )
 
 
 def prepare_argument_spec():
-    argument_spec = {
-        "vcenter_hostname": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_HOST"]),
-        ),
-        "vcenter_username": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_USER"]),
-        ),
-        "vcenter_password": dict(
-            type="str",
-            required=True,
-            no_log=True,
-            fallback=(env_fallback, ["VMWARE_PASSWORD"]),
-        ),
-        "vcenter_validate_certs": dict(
-            type="bool",
-            required=False,
-            default=True,
-            fallback=(env_fallback, ["VMWARE_VALIDATE_CERTS"]),
-        ),
-        "vcenter_rest_log_file": dict(
-            type="str",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_REST_LOG_FILE"]),
-        ),
-        "session_timeout": dict(
-            type="float",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_SESSION_TIMEOUT"]),
-        ),
-    }
+    argument_spec = connection_argument_spec()
 
     argument_spec["client_token"] = {"no_log": True, "type": "str"}
     argument_spec["creation_time"] = {"type": "str"}
@@ -1579,202 +1512,12 @@ async def main():
     module = AnsibleModule(
         argument_spec=module_args, required_if=required_if, supports_check_mode=True
     )
-    if not module.params["vcenter_hostname"]:
-        module.fail_json("vcenter_hostname cannot be empty")
-    if not module.params["vcenter_username"]:
-        module.fail_json("vcenter_username cannot be empty")
-    if not module.params["vcenter_password"]:
-        module.fail_json("vcenter_password cannot be empty")
-    try:
-        session = await open_session(
-            vcenter_hostname=module.params["vcenter_hostname"],
-            vcenter_username=module.params["vcenter_username"],
-            vcenter_password=module.params["vcenter_password"],
-            validate_certs=module.params["vcenter_validate_certs"],
-            log_file=module.params["vcenter_rest_log_file"],
-        )
-    except EmbeddedModuleFailure as err:
-        module.fail_json(err.get_message())
-    result = await entry_point(module, session)
-    module.exit_json(**result)
+    await run_module(module, entry_point)
 
 
 # template: default_module.j2
-def build_url(params):
-    return ("https://{vcenter_hostname}" "/api/content/local-library").format(**params)
-
-
 async def entry_point(module, session):
-
-    if module.params["state"] == "present":
-        if "_create" in globals():
-            operation = "create"
-        else:
-            operation = "update"
-    elif module.params["state"] == "absent":
-        operation = "delete"
-    else:
-        operation = module.params["state"]
-
-    func = globals()["_" + operation]
-
-    return await func(module.params, session)
-
-
-async def _create(params, session):
-
-    lookup_url = per_id_url = build_url(params)
-    uniquity_keys = ["name"]
-    comp_func = None
-
-    _json = None
-
-    if params["library_id"]:
-        _json = await get_device_info(session, build_url(params), params["library_id"])
-
-    if not _json and (uniquity_keys or comp_func):
-        _json = await exists(
-            params,
-            session,
-            url=lookup_url,
-            uniquity_keys=uniquity_keys,
-            per_id_url=per_id_url,
-            comp_func=comp_func,
-        )
-
-    if _json:
-        if "value" not in _json:  # 7.0.2+
-            _json = {"value": _json}
-        if "_update" in globals():
-            params["library_id"] = _json["id"]
-            return await globals()["_update"](params, session)
-
-        return await update_changed_flag(_json, 200, "get")
-
-    payload = prepare_payload(params, PAYLOAD_FORMAT["create"])
-    _url = ("https://{vcenter_hostname}" "/api/content/local-library").format(**params)
-    async with session.post(_url, json=payload, **session_timeout(params)) as resp:
-        if resp.status == 500:
-            text = await resp.text()
-            raise EmbeddedModuleFailure(
-                f"Request has failed: status={resp.status}, {text}"
-            )
-        try:
-            if resp.headers["Content-Type"] == "application/json":
-                _json = await resp.json()
-        except KeyError:
-            _json = {}
-
-        if (resp.status in [200, 201]) and "error" not in _json:
-            if isinstance(_json, str):  # 7.0.2 and greater
-                _id = _json  # TODO: fetch the object
-            elif isinstance(_json, dict) and "value" not in _json:
-                _id = list(_json["value"].values())[0]
-            elif isinstance(_json, dict) and "value" in _json:
-                _id = _json["value"]
-            _json_device_info = await get_device_info(session, _url, _id)
-            if _json_device_info:
-                _json = _json_device_info
-
-        return await update_changed_flag(_json, resp.status, "create")
-
-
-async def _delete(params, session):
-    _in_query_parameters = PAYLOAD_FORMAT["delete"]["query"].keys()
-    payload = prepare_payload(params, PAYLOAD_FORMAT["delete"])
-    subdevice_type = get_subdevice_type("/api/content/local-library/{library_id}")
-    if subdevice_type and not params[subdevice_type]:
-        _json = await exists(params, session, build_url(params))
-        if _json:
-            params[subdevice_type] = _json["id"]
-    _url = (
-        "https://{vcenter_hostname}" "/api/content/local-library/{library_id}"
-    ).format(**params) + gen_args(params, _in_query_parameters)
-    async with session.delete(_url, json=payload, **session_timeout(params)) as resp:
-        try:
-            if resp.headers["Content-Type"] == "application/json":
-                _json = await resp.json()
-        except KeyError:
-            _json = {}
-        return await update_changed_flag(_json, resp.status, "delete")
-
-
-async def _publish(params, session):
-    _in_query_parameters = PAYLOAD_FORMAT["publish"]["query"].keys()
-    payload = prepare_payload(params, PAYLOAD_FORMAT["publish"])
-    subdevice_type = get_subdevice_type(
-        "/api/content/local-library/{library_id}?action=publish"
-    )
-    if subdevice_type and not params[subdevice_type]:
-        _json = await exists(params, session, build_url(params))
-        if _json:
-            params[subdevice_type] = _json["id"]
-    _url = (
-        "https://{vcenter_hostname}"
-        # aa
-        "/api/content/local-library/{library_id}?action=publish"
-    ).format(**params) + gen_args(params, _in_query_parameters)
-    async with session.post(_url, json=payload, **session_timeout(params)) as resp:
-        try:
-            if resp.headers["Content-Type"] == "application/json":
-                _json = await resp.json()
-        except KeyError:
-            _json = {}
-        if "value" not in _json:  # 7.0.2
-            _json = {"value": _json}
-
-        return await update_changed_flag(_json, resp.status, "publish")
-
-
-async def _update(params, session):
-    payload = prepare_payload(params, PAYLOAD_FORMAT["update"])
-    _url = (
-        "https://{vcenter_hostname}" "/api/content/local-library/{library_id}"
-    ).format(**params)
-    async with session.get(_url, **session_timeout(params)) as resp:
-        _json = await resp.json()
-        if "value" in _json:
-            value = _json["value"]
-        else:  # 7.0.2 and greater
-            value = _json
-        for k, v in value.items():
-            if k in payload:
-                if isinstance(payload[k], dict) and isinstance(v, dict):
-                    to_delete = True
-                    for _k in list(payload[k].keys()):
-                        if payload[k][_k] != v.get(_k):
-                            to_delete = False
-                    if to_delete:
-                        del payload[k]
-                elif payload[k] == v:
-                    del payload[k]
-                elif payload[k] == {}:
-                    del payload[k]
-
-        if payload == {} or payload == {"spec": {}}:
-            # Nothing has changed
-            if "value" not in _json:  # 7.0.2
-                _json = {"value": _json}
-            _json["id"] = params.get("library_id")
-            return await update_changed_flag(_json, resp.status, "get")
-    async with session.patch(_url, json=payload, **session_timeout(params)) as resp:
-        try:
-            if resp.headers["Content-Type"] == "application/json":
-                _json = await resp.json()
-        except KeyError:
-            _json = {}
-        if "value" not in _json:  # 7.0.2
-            _json = {"value": _json}
-
-        # e.g: content_configuration
-        if not _json and resp.status == 204:
-            async with session.get(_url, **session_timeout(params)) as resp_get:
-                _json_get = await resp_get.json()
-                if _json_get:
-                    _json = _json_get
-
-        _json["id"] = params.get("library_id")
-        return await update_changed_flag(_json, resp.status, "update")
+    return await operation_entry_point(module, session, RESOURCE, PAYLOAD_FORMAT)
 
 
 if __name__ == "__main__":
@@ -52,14 +52,6 @@ options:
         - The port of the host.
         - If unset, port 443 will be used.
         type: int
-    session_timeout:
-        description:
-        - 'Timeout settings for client session. '
-        - 'The maximal number of seconds for the whole operation including connection
-            establishment, request sending and response. '
-        - The default value is 300s.
-        type: float
-        version_added: 2.1.0
     state:
         choices:
         - absent
@@ -90,43 +82,8 @@ options:
         description:
         - The administrator account on the host. Required with I(state=['present'])
         type: str
-    vcenter_hostname:
-        description:
-        - The hostname or IP address of the vSphere vCenter
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_HOST) will be used instead.
-        required: true
-        type: str
-    vcenter_password:
-        description:
-        - The vSphere vCenter password
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_PASSWORD) will be used instead.
-        required: true
-        type: str
-    vcenter_rest_log_file:
-        description:
-        - 'You can use this optional parameter to set the location of a log file. '
-        - 'This file will be used to record the HTTP REST interaction. '
-        - 'The file will be stored on the host that run the module. '
-        - 'If the value is not specified in the task, the value of '
-        - environment variable C(VMWARE_REST_LOG_FILE) will be used instead.
-        type: str
-    vcenter_username:
-        description:
-        - The vSphere vCenter username
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_USER) will be used instead.
-        required: true
-        type: str
-    vcenter_validate_certs:
-        default: true
-        description:
-        - Allows connection when SSL certificates are not valid. Set to C(false) when
-            certificates are not trusted.
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_VALIDATE_CERTS) will be used instead.
-        type: bool
+extends_documentation_fragment:
+- vmware.vmware_rest.connection
 author:
 - Ansible Cloud Team (@ansible-collections)
 version_added: 0.1.0
@@ -178,12 +135,21 @@ PAYLOAD_FORMAT = {
     "delete": {"query": {}, "body": {}, "path": {"host": "host"}},
 }  # pylint: disable=line-too-long
 
-from ansible.module_utils.basic import env_fallback
+# The end-points of the module, see operation_entry_point() in module_utils
+RESOURCE = {
+    "url": "/api/vcenter/host",
+    "id": "host",
+    "uniquity_keys": ["host"],
+    "lookup_filter": "folder",
+    "operations": {
+        "connect": ("action", "post", "/api/vcenter/host/{host}?action=connect"),
+        "create": ("create", "post", "/api/vcenter/host"),
+        "delete": ("delete", "delete", "/api/vcenter/host/{host}"),
+        "disconnect": ("action", "post", "/api/vcenter/host/{host}?action=disconnect"),
+    },
+}
 
 try:
-    from ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions import (
-        EmbeddedModuleFailure,
-    )
     from ansible_collections.cloud.common.plugins.module_utils.turbo.module import (
         AnsibleTurboModule as AnsibleModule,
     )
@@ -192,52 +158,14 @@ try:
 except ImportError:
     from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.vmware.vmware_rest.plugins.module_utils.vmware_rest import (
-    exists,
-    gen_args,
-    get_device_info,
-    get_subdevice_type,
-    open_session,
-    prepare_payload,
-    session_timeout,
-    update_changed_flag,
+    connection_argument_spec,
+    operation_entry_point,
+    run_module,
 )
 
 
 def prepare_argument_spec():
-    argument_spec = {
-        "vcenter_hostname": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_HOST"]),
-        ),
-        "vcenter_username": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_USER"]),
-        ),
-        "vcenter_password": dict(
-            type="str",
-            required=True,
-            no_log=True,
-            fallback=(env_fallback, ["VMWARE_PASSWORD"]),
-        ),
-        "vcenter_validate_certs": dict(
-            type="bool",
-            required=False,
-            default=True,
-            fallback=(env_fallback, ["VMWARE_VALIDATE_CERTS"]),
-        ),
-        "vcenter_rest_log_file": dict(
-            type="str",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_REST_LOG_FILE"]),
-        ),
-        "session_timeout": dict(
-            type="float",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_SESSION_TIMEOUT"]),
-        ),
-    }
+    argument_spec = connection_argument_spec()
 
     argument_spec["folder"] = {"type": "str"}
     argument_spec["force_add"] = {"type": "bool"}
@@ -267,191 +195,12 @@ async def main():
     module = AnsibleModule(
         argument_spec=module_args, required_if=required_if, supports_check_mode=True
     )
-    if not module.params["vcenter_hostname"]:
-        module.fail_json("vcenter_hostname cannot be empty")
-    if not module.params["vcenter_username"]:
-        module.fail_json("vcenter_username cannot be empty")
-    if not module.params["vcenter_password"]:
-        module.fail_json("vcenter_password cannot be empty")
-    try:
-        session = await open_session(
-            vcenter_hostname=module.params["vcenter_hostname"],
-            vcenter_username=module.params["vcenter_username"],
-            vcenter_password=module.params["vcenter_password"],
-            validate_certs=module.params["vcenter_validate_certs"],
-            log_file=module.params["vcenter_rest_log_file"],
-        )
-    except EmbeddedModuleFailure as err:
-        module.fail_json(err.get_message())
-    result = await entry_point(module, session)
-    module.exit_json(**result)
+    await run_module(module, entry_point)
 
 
 # template: default_module.j2
-def build_url(params):
-    return ("https://{vcenter_hostname}" "/api/vcenter/host").format(**params)
-
-
 async def entry_point(module, session):
-
-    if module.params["state"] == "present":
-        if "_create" in globals():
-            operation = "create"
-        else:
-            operation = "update"
-    elif module.params["state"] == "absent":
-        operation = "delete"
-    else:
-        operation = module.params["state"]
-
-    func = globals()["_" + operation]
-
-    return await func(module.params, session)
-
-
-async def _connect(params, session):
-    _in_query_parameters = PAYLOAD_FORMAT["connect"]["query"].keys()
-    payload = prepare_payload(params, PAYLOAD_FORMAT["connect"])
-    subdevice_type = get_subdevice_type("/api/vcenter/host/{host}?action=connect")
-    if subdevice_type and not params[subdevice_type]:
-        _json = await exists(params, session, build_url(params))
-        if _json:
-            params[subdevice_type] = _json["id"]
-    _url = (
-        "https://{vcenter_hostname}"
-        # aa
-        "/api/vcenter/host/{host}?action=connect"
-    ).format(**params) + gen_args(params, _in_query_parameters)
-    async with session.post(_url, json=payload, **session_timeout(params)) as resp:
-        try:
-            if resp.headers["Content-Type"] == "application/json":
-                _json = await resp.json()
-        except KeyError:
-            _json = {}
-        if "value" not in _json:  # 7.0.2
-            _json = {"value": _json}
-
-        return await update_changed_flag(_json, resp.status, "connect")
-
-
-async def _create(params, session):
-
-    lookup_url = per_id_url = build_url(params)
-    uniquity_keys = ["host"]
-    comp_func = None
-
-    async def lookup_with_filters(params, session, url):
-        search_filter = ""
-
-        if "folder" not in params:
-            return
-        search_filter = f"&folders={params.get('folder')}"
-
-        if "name" not in params:
-            return
-        async with session.get(f"{url}?names={params['name']}{search_filter}") as resp:
-            _json = await resp.json()
-            if isinstance(_json, list) and len(_json) == 1:
-                return await get_device_info(session, url, _json[0]["host"])
-
-    _json = None
-
-    if params["host"]:
-        _json = await get_device_info(session, build_url(params), params["host"])
-
-    if not _json and (uniquity_keys or comp_func):
-        _json = await exists(
-            params,
-            session,
-            url=lookup_url,
-            uniquity_keys=uniquity_keys,
-            per_id_url=per_id_url,
-            comp_func=comp_func,
-        )
-
-    if not _json:
-        _json = await lookup_with_filters(params, session, build_url(params))
-
-    if _json:
-        if "value" not in _json:  # 7.0.2+
-            _json = {"value": _json}
-        if "_update" in globals():
-            params["host"] = _json["id"]
-            return await globals()["_update"](params, session)
-
-        return await update_changed_flag(_json, 200, "get")
-
-    payload = prepare_payload(params, PAYLOAD_FORMAT["create"])
-    _url = ("https://{vcenter_hostname}" "/api/vcenter/host").format(**params)
-    async with session.post(_url, json=payload, **session_timeout(params)) as resp:
-        if resp.status == 500:
-            text = await resp.text()
-            raise EmbeddedModuleFailure(
-                f"Request has failed: status={resp.status}, {text}"
-            )
-        try:
-            if resp.headers["Content-Type"] == "application/json":
-                _json = await resp.json()
-        except KeyError:
-            _json = {}
-
-        if (resp.status in [200, 201]) and "error" not in _json:
-            if isinstance(_json, str):  # 7.0.2 and greater
-                _id = _json  # TODO: fetch the object
-            elif isinstance(_json, dict) and "value" not in _json:
-                _id = list(_json["value"].values())[0]
-            elif isinstance(_json, dict) and "value" in _json:
-                _id = _json["value"]
-            _json_device_info = await get_device_info(session, _url, _id)
-            if _json_device_info:
-                _json = _json_device_info
-
-        return await update_changed_flag(_json, resp.status, "create")
-
-
-async def _delete(params, session):
-    _in_query_parameters = PAYLOAD_FORMAT["delete"]["query"].keys()
-    payload = prepare_payload(params, PAYLOAD_FORMAT["delete"])
-    subdevice_type = get_subdevice_type("/api/vcenter/host/{host}")
-    if subdevice_type and not params[subdevice_type]:
-        _json = await exists(params, session, build_url(params))
-        if _json:
-            params[subdevice_type] = _json["id"]
-    _url = ("https://{vcenter_hostname}" "/api/vcenter/host/{host}").format(
-        **params
-    ) + gen_args(params, _in_query_parameters)
-    async with session.delete(_url, json=payload, **session_timeout(params)) as resp:
-        try:
-            if resp.headers["Content-Type"] == "application/json":
-                _json = await resp.json()
-        except KeyError:
-            _json = {}
-        return await update_changed_flag(_json, resp.status, "delete")
-
-
-async def _disconnect(params, session):
-    _in_query_parameters = PAYLOAD_FORMAT["disconnect"]["query"].keys()
-    payload = prepare_payload(params, PAYLOAD_FORMAT["disconnect"])
-    subdevice_type = get_subdevice_type("/api/vcenter/host/{host}?action=disconnect")
-    if subdevice_type and not params[subdevice_type]:
-        _json = await exists(params, session, build_url(params))
-        if _json:
-            params[subdevice_type] = _json["id"]
-    _url = (
-        "https://{vcenter_hostname}"
-        # aa
-        "/api/vcenter/host/{host}?action=disconnect"
-    ).format(**params) + gen_args(params, _in_query_parameters)
-    async with session.post(_url, json=payload, **session_timeout(params)) as resp:
-        try:
-            if resp.headers["Content-Type"] == "application/json":
-                _json = await resp.json()
-        except KeyError:
-            _json = {}
-        if "value" not in _json:  # 7.0.2
-            _json = {"value": _json}
-
-        return await update_changed_flag(_json, resp.status, "disconnect")
+    return await operation_entry_point(module, session, RESOURCE, PAYLOAD_FORMAT)
 
 
 if __name__ == "__main__":
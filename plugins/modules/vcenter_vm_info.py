@@ -21,6 +21,12 @@ options:
             contain the id of resources returned by M(vmware.vmware_rest.vcenter_cluster_info).
         elements: str
         type: list
+    concurrency:
+        description:
+        - Maximum number of VM details fetched at the same time with I(include_details).
+        - The default value is the size of the connection pool, see I(session_connection_limit).
+        type: int
+        version_added: 4.2.0
     datacenters:
         aliases:
         - filter_datacenters
@@ -32,6 +38,18 @@ options:
             contain the id of resources returned by M(vmware.vmware_rest.vcenter_datacenter_info).
         elements: str
         type: list
+    dest:
+        description:
+        - Path of a file where the listed VMs are written, one JSON document per
+            line, instead of being returned in C(value).
+        - The file is written on the host that runs the module, and is replaced once
+            all the VMs are written.
+        - With I(include_details), the VMs are written as soon as their details are
+            received.
+        - C(value) then only gives the path of the file in C(dest) and the number of
+            VMs written in C(count).
+        type: path
+        version_added: 4.2.0
     folders:
         aliases:
         - filter_folders
@@ -52,6 +70,15 @@ options:
             contain the id of resources returned by M(vmware.vmware_rest.vcenter_host_info).
         elements: str
         type: list
+    include_details:
+        default: false
+        description:
+        - Return the details of each listed VM (hardware, CPU, memory, disks, ...), as
+            with I(vm), instead of its summary.
+        - The details of the VMs are fetched concurrently, see I(concurrency).
+        - The VMs that cannot be fetched are reported in C(failed_devices).
+        type: bool
+        version_added: 4.2.0
     names:
         aliases:
         - filter_names
@@ -67,6 +94,15 @@ options:
         - If unset or empty, virtual machines in any power state match the filter.
         elements: str
         type: list
+    properties:
+        description:
+        - The keys of the details of the VMs to keep, e.g. C(cpu), C(memory) or C(disks).
+            The other keys are dropped as soon as the details are received.
+        - The C(vm) key is always kept when I(include_details) is set.
+        - By default, all the keys are returned.
+        elements: str
+        type: list
+        version_added: 4.2.0
     resource_pools:
         description:
         - Resource pools that must contain the virtual machine for the virtual machine
@@ -76,51 +112,6 @@ options:
             contain the id of resources returned by M(vmware.vmware_rest.vcenter_resourcepool_info).
         elements: str
         type: list
-    session_timeout:
-        description:
-        - 'Timeout settings for client session. '
-        - 'The maximal number of seconds for the whole operation including connection
-            establishment, request sending and response. '
-        - The default value is 300s.
-        type: float
-        version_added: 2.1.0
-    vcenter_hostname:
-        description:
-        - The hostname or IP address of the vSphere vCenter
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_HOST) will be used instead.
-        required: true
-        type: str
-    vcenter_password:
-        description:
-        - The vSphere vCenter password
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_PASSWORD) will be used instead.
-        required: true
-        type: str
-    vcenter_rest_log_file:
-        description:
-        - 'You can use this optional parameter to set the location of a log file. '
-        - 'This file will be used to record the HTTP REST interaction. '
-        - 'The file will be stored on the host that run the module. '
-        - 'If the value is not specified in the task, the value of '
-        - environment variable C(VMWARE_REST_LOG_FILE) will be used instead.
-        type: str
-    vcenter_username:
-        description:
-        - The vSphere vCenter username
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_USER) will be used instead.
-        required: true
-        type: str
-    vcenter_validate_certs:
-        default: true
-        description:
-        - Allows connection when SSL certificates are not valid. Set to C(false) when
-            certificates are not trusted.
-        - If the value is not specified in the task, the value of environment variable
-            C(VMWARE_VALIDATE_CERTS) will be used instead.
-        type: bool
     vm:
         description:
         - Virtual machine identifier.
@@ -135,6 +126,8 @@ options:
             contain the id of resources returned by M(vmware.vmware_rest.vcenter_vm_info).
         elements: str
         type: list
+extends_documentation_fragment:
+- vmware.vmware_rest.connection
 author:
 - Ansible Cloud Team (@ansible-collections)
 version_added: 0.1.0
@@ -201,6 +194,19 @@ EXAMPLES = r"""
     filter_names:
     - test_vm1
 
+- name: Collect the CPU, memory and disks of all the powered on VMs
+  vmware.vmware_rest.vcenter_vm_info:
+    power_states:
+    - POWERED_ON
+    include_details: true
+    properties:
+    - name
+    - cpu
+    - memory
+    - disks
+    concurrency: 20
+  register: vm_report
+
 - name: Collect information about a specific VM
   vmware.vmware_rest.vcenter_vm_info:
     vm: '{{ search_result.value[0].vm }}'
@@ -329,12 +335,10 @@ PAYLOAD_FORMAT = {
     },
 }  # pylint: disable=line-too-long
 
-from ansible.module_utils.basic import env_fallback
+# The end-points of the module, see info_url() in module_utils
+RESOURCE = {"list": "/api/vcenter/vm", "get": "/api/vcenter/vm/", "id": "vm"}
 
 try:
-    from ansible_collections.cloud.common.plugins.module_utils.turbo.exceptions import (
-        EmbeddedModuleFailure,
-    )
     from ansible_collections.cloud.common.plugins.module_utils.turbo.module import (
         AnsibleTurboModule as AnsibleModule,
     )
@@ -343,69 +347,37 @@ try:
 except ImportError:
     from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.vmware.vmware_rest.plugins.module_utils.vmware_rest import (
-    build_full_device_list,
-    exists,
-    gen_args,
-    open_session,
-    session_timeout,
-    update_changed_flag,
+    connection_argument_spec,
+    info_entry_point,
+    run_module,
 )
 
 
 def prepare_argument_spec():
-    argument_spec = {
-        "vcenter_hostname": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_HOST"]),
-        ),
-        "vcenter_username": dict(
-            type="str",
-            required=True,
-            fallback=(env_fallback, ["VMWARE_USER"]),
-        ),
-        "vcenter_password": dict(
-            type="str",
-            required=True,
-            no_log=True,
-            fallback=(env_fallback, ["VMWARE_PASSWORD"]),
-        ),
-        "vcenter_validate_certs": dict(
-            type="bool",
-            required=False,
-            default=True,
-            fallback=(env_fallback, ["VMWARE_VALIDATE_CERTS"]),
-        ),
-        "vcenter_rest_log_file": dict(
-            type="str",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_REST_LOG_FILE"]),
-        ),
-        "session_timeout": dict(
-            type="float",
-            required=False,
-            fallback=(env_fallback, ["VMWARE_SESSION_TIMEOUT"]),
-        ),
-    }
+    argument_spec = connection_argument_spec()
 
     argument_spec["clusters"] = {"type": "list", "elements": "str"}
+    argument_spec["concurrency"] = {"type": "int"}
     argument_spec["datacenters"] = {
         "aliases": ["filter_datacenters"],
         "type": "list",
         "elements": "str",
     }
+    argument_spec["dest"] = {"type": "path"}
     argument_spec["folders"] = {
         "aliases": ["filter_folders"],
         "type": "list",
         "elements": "str",
     }
     argument_spec["hosts"] = {"type": "list", "elements": "str"}
+    argument_spec["include_details"] = {"type": "bool", "default": False}
     argument_spec["names"] = {
         "aliases": ["filter_names"],
         "type": "list",
         "elements": "str",
     }
     argument_spec["power_states"] = {"type": "list", "elements": "str"}
+    argument_spec["properties"] = {"type": "list", "elements": "str"}
     argument_spec["resource_pools"] = {"type": "list", "elements": "str"}
     argument_spec["vm"] = {"type": "str"}
     argument_spec["vms"] = {"type": "list", "elements": "str"}
@@ -420,68 +392,12 @@ async def main():
     module = AnsibleModule(
         argument_spec=module_args, required_if=required_if, supports_check_mode=True
     )
-    if not module.params["vcenter_hostname"]:
-        module.fail_json("vcenter_hostname cannot be empty")
-    if not module.params["vcenter_username"]:
-        module.fail_json("vcenter_username cannot be empty")
-    if not module.params["vcenter_password"]:
-        module.fail_json("vcenter_password cannot be empty")
-    try:
-        session = await open_session(
-            vcenter_hostname=module.params["vcenter_hostname"],
-            vcenter_username=module.params["vcenter_username"],
-            vcenter_password=module.params["vcenter_password"],
-            validate_certs=module.params["vcenter_validate_certs"],
-            log_file=module.params["vcenter_rest_log_file"],
-        )
-    except EmbeddedModuleFailure as err:
-        module.fail_json(err.get_message())
-    result = await entry_point(module, session)
-    module.exit_json(**result)
+    await run_module(module, entry_point)
 
 
 # template: info_list_and_get_module.j2
-def build_url(params):
-    import yarl
-
-    if params.get("vm"):
-        _in_query_parameters = PAYLOAD_FORMAT["get"]["query"].keys()
-        return yarl.URL(
-            ("https://{vcenter_hostname}" "/api/vcenter/vm/").format(**params)
-            + params["vm"]
-            + gen_args(params, _in_query_parameters),
-            encoded=True,
-        )
-    _in_query_parameters = PAYLOAD_FORMAT["list"]["query"].keys()
-    return yarl.URL(
-        ("https://{vcenter_hostname}" "/api/vcenter/vm").format(**params)
-        + gen_args(params, _in_query_parameters),
-        encoded=True,
-    )
-
-
 async def entry_point(module, session):
-    url = build_url(module.params)
-    async with session.get(url, **session_timeout(module.params)) as resp:
-        _json = await resp.json()
-
-        if "value" not in _json:  # 7.0.2+
-            _json = {"value": _json}
-
-        if module.params.get("vm"):
-            _json["id"] = module.params.get("vm")
-        elif module.params.get("label"):  # TODO extend the list of filter
-            _json = await exists(module.params, session, str(url))
-        elif (
-            isinstance(_json["value"], list)
-            and len(_json["value"]) > 0
-            and isinstance(_json["value"][0], str)
-        ):
-            # this is a list of id, we fetch the details
-            full_device_list = await build_full_device_list(session, str(url), _json)
-            _json = {"value": [i["value"] for i in full_device_list]}
-
-        return await update_changed_flag(_json, resp.status, "get")
+    return await info_entry_point(module, session, RESOURCE, PAYLOAD_FORMAT)
 
 
 if __name__ == "__main__":
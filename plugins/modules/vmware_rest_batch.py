@@ -0,0 +1,298 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2021, Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+
+DOCUMENTATION = r"""
+module: vmware_rest_batch
+short_description: Run a list of REST requests on the vCenter concurrently
+description:
+- Send a list of requests to the vCenter REST API concurrently, through the pooled
+    session of the module, and return the result of each of them.
+- This is much faster than a loop on a module when the same kind of request is
+    sent on hundreds of resources, e.g. to power on a list of VMs.
+- The C(changed) and C(failed) flags of each request are computed like in the other
+    modules of the collection.
+- The module fails if at least one of the requests fails.
+- In check mode, only the C(GET) requests are sent, the other ones are returned
+    with C(skipped) set.
+options:
+    concurrency:
+        description:
+        - Maximum number of requests sent at the same time.
+        - The default value is the size of the connection pool, see I(session_connection_limit).
+        - The value must be greater than C(0).
+        type: int
+    operations:
+        description:
+        - The list of the requests to send.
+        elements: dict
+        required: true
+        suboptions:
+            body:
+                description:
+                - The JSON document sent as the body of the request.
+                type: raw
+            method:
+                choices:
+                - DELETE
+                - GET
+                - PATCH
+                - POST
+                - PUT
+                default: GET
+                description:
+                - The HTTP method of the request.
+                type: str
+            operation:
+                description:
+                - The kind of operation, used to compute the C(changed) flag, e.g
+                    C(create), C(update), C(delete) or the name of an action.
+                - By default, the value of the C(action) query parameter, or an
+                    operation deduced from the I(method).
+                type: str
+            params:
+                description:
+                - The values of the placeholders of I(path).
+                - The other keys are passed as query parameters.
+                type: dict
+            path:
+                description:
+                - The path of the REST endpoint, e.g. C(/api/vcenter/vm/{vm}/power?action=start).
+                - The C({name}) placeholders are replaced by the values of I(params).
+                required: true
+                type: str
+        type: list
+extends_documentation_fragment:
+- vmware.vmware_rest.connection
+author:
+- Ansible Cloud Team (@ansible-collections)
+version_added: 4.2.0
+requirements:
+- vSphere 7.0.3 or greater
+- python >= 3.6
+- aiohttp
+notes:
+- Tested on vSphere 7.0.3
+"""
+
+EXAMPLES = r"""
+- name: Look up the powered off VMs
+  vmware.vmware_rest.vcenter_vm_info:
+    filter_power_states:
+    - POWERED_OFF
+  register: my_vms
+
+- name: Prepare the requests to turn the power of the VMs on
+  ansible.builtin.set_fact:
+    power_on: "{{ power_on | default([]) + [{'method': 'POST', 'path': '/api/vcenter/vm/{vm}/power?action=start', 'params': {'vm': item.vm}}] }}"
+  loop: "{{ my_vms.value }}"
+
+- name: Turn the power of the VMs on
+  vmware.vmware_rest.vmware_rest_batch:
+    concurrency: 10
+    operations: "{{ power_on }}"
+
+- name: Collect the details of two VMs
+  vmware.vmware_rest.vmware_rest_batch:
+    operations:
+    - path: /api/vcenter/vm/{vm}
+      params:
+        vm: vm-1023
+    - path: /api/vcenter/vm/{vm}
+      params:
+        vm: vm-1024
+  register: result
+"""
+
+RETURN = r"""
+value:
+  description: The result of each request, in the order of I(operations)
+  returned: On success
+  sample:
+  - changed: true
+    failed: false
+    method: POST
+    path: /api/vcenter/vm/vm-1023/power?action=start
+    status: 204
+    value: {}
+  - changed: false
+    failed: false
+    method: POST
+    path: /api/vcenter/vm/vm-1024/power?action=start
+    status: 400
+    value:
+      error_type: ALREADY_IN_DESIRED_STATE
+      messages:
+      - args: []
+        default_message: Virtual machine is already powered on.
+        id: com.vmware.api.vcenter.vm.power.already_powered_on
+  type: list
+"""
+
+import asyncio
+import string
+import urllib.parse
+
+try:
+    from ansible_collections.cloud.common.plugins.module_utils.turbo.module import (
+        AnsibleTurboModule as AnsibleModule,
+    )
+
+    AnsibleModule.collection_name = "vmware.vmware_rest"
+except ImportError:
+    from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.vmware.vmware_rest.plugins.module_utils.vmware_rest import (
+    add_query_filters,
+    connection_argument_spec,
+    default_concurrency,
+    run_module,
+    session_timeout,
+    update_changed_flag,
+)
+
+# The operation passed to update_changed_flag() when the path has no action
+METHOD_OPERATIONS = {
+    "DELETE": "delete",
+    "GET": "get",
+    "PATCH": "update",
+    "POST": "create",
+    "PUT": "set",
+}
+
+
+def prepare_argument_spec():
+    argument_spec = connection_argument_spec()
+
+    argument_spec["concurrency"] = {"type": "int"}
+    argument_spec["operations"] = {
+        "required": True,
+        "type": "list",
+        "elements": "dict",
+        "options": {
+            "body": {"type": "raw"},
+            "method": {
+                "type": "str",
+                "default": "GET",
+                "choices": ["DELETE", "GET", "PATCH", "POST", "PUT"],
+            },
+            "operation": {"type": "str"},
+            "params": {"type": "dict"},
+            "path": {"required": True, "type": "str"},
+        },
+    }
+
+    return argument_spec
+
+
+async def main():
+    module_args = prepare_argument_spec()
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    if module.params["concurrency"] is not None and module.params["concurrency"] < 1:
+        module.fail_json(msg="concurrency must be greater than 0")
+    await run_module(module, entry_point)
+
+
+def build_path(operation):
+    """Fill the placeholders of the path, the other params go in the query."""
+    params = operation["params"] or {}
+    placeholders = {
+        name for _, name, _, _ in string.Formatter().parse(operation["path"]) if name
+    }
+    missing = placeholders - params.keys()
+    if missing:
+        raise ValueError(f"no value in params for: {', '.join(sorted(missing))}")
+    path = operation["path"].format(
+        **{k: urllib.parse.quote(str(params[k]), safe="") for k in placeholders}
+    )
+    query = []
+    for k, v in params.items():
+        if k in placeholders or v is None:
+            continue
+        for i in v if isinstance(v, list) else [v]:
+            query.append((k, str(i).lower() if isinstance(i, bool) else str(i)))
+    return add_query_filters(path, query)
+
+
+def get_operation(operation, path):
+    if operation["operation"]:
+        return operation["operation"]
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)
+    if query.get("action"):
+        return query["action"][0]
+    return METHOD_OPERATIONS[operation["method"]]
+
+
+async def _run_operation(params, session, operation, check_mode=False):
+    result = {"method": operation["method"], "path": build_path(operation)}
+    if check_mode and operation["method"] != "GET":
+        result.update(changed=False, failed=False, skipped=True)
+        return result
+
+    kwargs = session_timeout(params)
+    if operation["body"] is not None:
+        kwargs["json"] = operation["body"]
+    _url = f"https://{params['vcenter_hostname']}{result['path']}"
+    async with session.request(operation["method"], _url, **kwargs) as resp:
+        _json = None
+        if resp.headers.get("Content-Type", "").startswith("application/json"):
+            _json = await resp.json()
+        result["status"] = resp.status
+
+    result.update(
+        await update_changed_flag(
+            _json, resp.status, get_operation(operation, result["path"])
+        )
+    )
+    # The actions (e.g: power?action=start) are not known by update_changed_flag()
+    result.setdefault("failed", resp.status >= 400)
+    result.setdefault("changed", not result["failed"] and operation["method"] != "GET")
+    return result
+
+
+async def entry_point(module, session):
+    operations = module.params["operations"]
+    concurrency = module.params["concurrency"] or default_concurrency(session)
+    results = [None] * len(operations)
+    todo = iter(enumerate(operations))
+
+    async def worker():
+        for index, operation in todo:
+            try:
+                results[index] = await _run_operation(
+                    module.params, session, operation, module.check_mode
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                results[index] = {
+                    "method": operation["method"],
+                    "path": operation["path"],
+                    "changed": False,
+                    "failed": True,
+                    "msg": str(e) or repr(e),
+                }
+
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, len(operations)))])
+
+    failed = sum(1 for r in results if r["failed"])
+    out = {
+        "value": results,
+        "changed": any(r["changed"] for r in results),
+        "failed": bool(failed),
+    }
+    if failed:
+        out["msg"] = f"{failed} of the {len(results)} operations failed"
+    return out
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    current_loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(current_loop)
+        current_loop.run_until_complete(main())
+    finally:
+        current_loop.close()
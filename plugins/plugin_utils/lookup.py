@@ -8,12 +8,20 @@ __metaclass__ = type
 
 
 import asyncio
+import collections
+import fnmatch
+import json
+import os
+import sqlite3
+import time
 import urllib
+import weakref
 
 from ansible.errors import AnsibleLookupError
 from ansible.module_utils._text import to_native
 from ansible_collections.vmware.vmware_rest.plugins.module_utils.vmware_rest import (
     gen_args,
+    list_resources,
     open_session,
 )
 
@@ -41,6 +49,232 @@ FILTER_MAPPINGS = {
     "network": {"parent_folders": "folders"},
 }
 
+# The types of object that can be in the middle of a path, by order of
+# precedence: the filter they set for the next part of the path, the types
+# of object they can contain and the filters of their own parent they accept.
+PARENT_TYPES = (
+    (
+        "resource_pool",
+        "resource_pools",
+        ("vm",),
+        {"datacenters", "resource_pools", "hosts", "clusters"},
+    ),
+    (
+        "cluster",
+        "clusters",
+        ("vm", "host", "resource_pool"),
+        {"datacenters", "parent_folders"},
+    ),
+    (
+        "host",
+        "hosts",
+        ("vm", "resource_pool"),
+        {"datacenters", "parent_folders", "clusters"},
+    ),
+    (
+        "folder",
+        "parent_folders",
+        ("datacenter", "folder", "cluster", "host", "datastore", "vm", "network"),
+        {"datacenters", "parent_folders"},
+    ),
+)
+
+# The types of object that can be in the middle of the path of a lookup type
+# without containing it, for example the host of a datastore. Such a part only
+# has to exist, the next part is searched with the filters of its parent. The
+# resource pools are not in the folders, and the pools of a path, such as the
+# 'Resources' pool of a cluster, are searched below the cluster or the host.
+PASS_THROUGH_TYPES = {
+    "datastore": ("cluster", "host"),
+    "network": ("cluster", "host"),
+    "resource_pool": ("resource_pool", "folder"),
+}
+
+MOID_CACHE_MAX_ENTRIES = 100000
+
+# Maximum number of names sent in the 'names' filter of a single request
+LOOKUP_NAMES_PER_REQUEST = 100
+
+# The wildcards that make a part of a path match several objects, see fnmatch
+PATH_WILDCARDS = ("*", "?")
+
+# The object types contained by a folder, by folder type
+FOLDER_CHILDREN = {
+    "DATACENTER": ("folder", "datacenter"),
+    "VIRTUAL_MACHINE": ("folder", "vm"),
+    "HOST": ("folder", "cluster", "host"),
+    "DATASTORE": ("folder", "datastore"),
+    "NETWORK": ("folder", "network"),
+}
+
+# The snapshot of an object of the inventory, the last fields are the MoID
+# of its parents
+InventoryRecord = collections.namedtuple(
+    "InventoryRecord",
+    [
+        "moid",
+        "name",
+        "object_type",
+        "datacenter",
+        "folder",
+        "cluster",
+        "host",
+        "resource_pool",
+        "parent_resource_pool",
+    ],
+)
+
+
+class MoidCache:
+    """TTL cache of the path resolutions of the lookups.
+
+    There is one cache per pooled session, so all the lookup plugins that
+    run in the same turbo daemon with the same credentials share it. The
+    key is the object type, its name and the filters of its parent, the
+    value is the MoID, or None when nothing was found. The TTL is set by
+    the caller when the entry is stored.
+
+    A write request of the session drops the entries of the object type of
+    its path, and the negative entries if the type is not known, since
+    the request may have created the object.
+    """
+
+    _instances = weakref.WeakKeyDictionary()
+
+    def __init__(self, max_entries=MOID_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    @classmethod
+    def for_session(cls, session):
+        pooled = session.pooled
+        cache = cls._instances.get(pooled)
+        if cache is None:
+            cache = cls._instances[pooled] = cls()
+            pooled.write_listeners.append(cache.invalidate)
+        return cache
+
+    @staticmethod
+    def key(object_type, object_name, filters):
+        return (
+            object_type,
+            object_name,
+            tuple(sorted((k, str(v)) for k, v in filters.items() if k != "names")),
+        )
+
+    def get(self, key):
+        """Return a (found, moid) tuple."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, key, moid, ttl):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + ttl, moid)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, url):
+        path = urllib.parse.urlsplit(str(url)).path.split("/")
+        # e.g: /api/vcenter/resource-pool/resgroup-9 -> resource_pool
+        object_type = path[3].replace("-", "_") if len(path) > 3 else None
+        if object_type in FILTER_MAPPINGS:
+            stale = [k for k in self._entries if k[0] == object_type]
+        else:
+            stale = [k for k, v in self._entries.items() if v[1] is None]
+        for k in stale:
+            del self._entries[k]
+
+
+class LookupResultCache:
+    """
+    A SQLite file that keeps the MoID found for each path, to reuse it in the next playbook runs.
+    The rows are keyed by vCenter hostname, object type and path. They also keep the name of the
+    object and the filters of its parent, so the cached MoIDs can be validated with a few requests
+    before they are used, see Lookup.search_for_objects_moid_with_cache().
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        try:
+            # the file is created with restricted permissions before sqlite opens it
+            os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+            self.db = sqlite3.connect(path, timeout=30)
+            with self.db:
+                self.db.execute(
+                    "CREATE TABLE IF NOT EXISTS moids (hostname TEXT, object_type TEXT, path TEXT, "
+                    "moid TEXT, name TEXT, filters TEXT, created_at REAL, "
+                    "PRIMARY KEY (hostname, object_type, path))"
+                )
+        except (OSError, sqlite3.Error) as e:
+            raise AnsibleLookupError(
+                f"Unable to open the lookup cache {path}: {to_native(e)}"
+            )
+
+    def get(self, hostname, object_type, paths):
+        """Returns the (MoID, name, parent filters) tuple of the paths that are cached and not expired."""
+        paths = list(dict.fromkeys(paths))
+        entries = {}
+        try:
+            # stay below the maximum number of parameters of a statement
+            for i in range(0, len(paths), 500):
+                chunk = paths[i : i + 500]
+                rows = self.db.execute(
+                    "SELECT path, moid, name, filters FROM moids WHERE hostname = ? AND object_type = ? "
+                    f"AND created_at >= ? AND path IN ({', '.join('?' * len(chunk))})",
+                    [hostname, object_type, time.time() - self.ttl] + chunk,
+                )
+                for path, moid, name, filters in rows:
+                    entries[path] = (moid, name, json.loads(filters))
+        except sqlite3.Error as e:
+            raise AnsibleLookupError(
+                f"Unable to read the lookup cache {self.path}: {to_native(e)}"
+            )
+        return entries
+
+    def put(self, hostname, object_type, entries):
+        """
+        Stores the results of a lookup, and drops the expired ones.
+        Params:
+            entries: list, the (path, MoID, name, parent filters) tuple of each result
+        """
+        now = time.time()
+        try:
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO moids VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            hostname,
+                            object_type,
+                            path,
+                            moid,
+                            name,
+                            json.dumps(filters),
+                            now,
+                        )
+                        for path, moid, name, filters in entries
+                    ],
+                )
+                self.db.execute(
+                    "DELETE FROM moids WHERE created_at < ?", (now - self.ttl,)
+                )
+        except sqlite3.Error as e:
+            raise AnsibleLookupError(
+                f"Unable to write the lookup cache {self.path}: {to_native(e)}"
+            )
+
+    def close(self):
+        self.db.close()
+
 
 class VcenterApi:
     def __init__(self, hostname, session):
@@ -80,8 +314,283 @@ class VcenterApi:
 
     async def fetch_object_with_filters(self, object_type, filters):
         _url = self.build_url(object_type, filters)
-        async with self.session.get(_url) as response:
-            return await response.json()
+        _, result = await list_resources(self.session, _url)
+        return result
+
+
+class InventoryIndex(VcenterApi):
+    """
+    A snapshot of the vCenter inventory, that answers the searches of the lookups locally.
+    The objects are downloaded once, parent by parent, with fetch_object_with_filters(), so we know
+    the datacenter, folder, cluster, host and resource pool of each of them. The index keeps an
+    InventoryRecord per object, and a map from the object type and name to the records.
+    The snapshot is shared by the lookups that use the same session, and can be stored in a file
+    to be reused by the next runs, until it is older than its TTL.
+    """
+
+    _instances = weakref.WeakKeyDictionary()
+
+    def __init__(self, hostname, session, records=(), created_at=None):
+        super(InventoryIndex, self).__init__(hostname, session)
+        self.created_at = time.time() if created_at is None else created_at
+        self._ready = None
+        self._records = {}
+        self._by_name = collections.defaultdict(list)
+        for record in records:
+            self.add(InventoryRecord(*record))
+
+    @classmethod
+    async def for_session(cls, hostname, session, ttl, path=None):
+        """Returns the index of the session, and downloads it first if needed."""
+        pooled = session.pooled
+        index = cls._instances.get(pooled)
+        if index is None or time.time() - index.created_at > ttl:
+            index = (path and cls.load(hostname, session, path, ttl)) or cls(
+                hostname, session
+            )
+            cls._instances[pooled] = index
+        if index._ready is None:
+            index._ready = asyncio.ensure_future(index.download(path))
+        try:
+            # a caller that gets cancelled must not cancel the download
+            await asyncio.shield(index._ready)
+        except Exception:
+            if cls._instances.get(pooled) is index:
+                del cls._instances[pooled]
+            raise
+        return index
+
+    @classmethod
+    def load(cls, hostname, session, path, ttl):
+        try:
+            with open(path) as fd:
+                content = json.load(fd)
+        except (OSError, ValueError):
+            return None
+        if (
+            content.get("vcenter_hostname") != hostname
+            or time.time() - content["created_at"] > ttl
+        ):
+            return None
+        index = cls(hostname, session, content["records"], content["created_at"])
+        index._ready = asyncio.get_running_loop().create_future()
+        index._ready.set_result(None)
+        return index
+
+    def store(self, path):
+        content = {
+            "vcenter_hostname": self.hostname,
+            "created_at": self.created_at,
+            "records": list(self._records.values()),
+        }
+        tmp_path = f"{path}.{os.getpid()}"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(content, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            raise AnsibleLookupError(
+                f"Unable to write the inventory snapshot {path}: {to_native(e)}"
+            )
+
+    def add(self, record):
+        self._records[record.moid] = record
+        self._by_name[(record.object_type, record.name)].append(record)
+
+    async def _list(self, object_type, filters):
+        result = await super(InventoryIndex, self).fetch_object_with_filters(
+            object_type, filters
+        )
+        if not isinstance(result, list):
+            raise AnsibleLookupError(
+                f"Unable to list the {object_type} objects with the filters {filters}: {result}"
+            )
+        return [(obj[object_type], obj) for obj in result]
+
+    async def _list_children(self, relations):
+        """
+        Lists the children of several parents concurrently.
+        Params:
+            relations: list, the (object type, filter name, parent MoID) of each request
+        Returns:
+            list, the (object type, filter name, parent MoID, children) of each request
+        """
+        results = await asyncio.gather(
+            *[
+                self._list(object_type, {filter_name: parent})
+                for object_type, filter_name, parent in relations
+            ]
+        )
+        return [
+            relation + (children,) for relation, children in zip(relations, results)
+        ]
+
+    async def download(self, path=None):
+        if self._records:
+            return
+        objects = {}
+        parents = collections.defaultdict(dict)
+
+        def found(object_type, moid, obj, **new_parents):
+            objects.setdefault(moid, (object_type, obj["name"], obj))
+            parents[moid].update(new_parents)
+
+        for moid, obj in await self._list("datacenter", {}):
+            found("datacenter", moid, obj)
+        for moid, obj in await self._list("datacenter", {"folders": "group-d1"}):
+            found("datacenter", moid, obj, folder="group-d1")
+        datacenters = [m for m, o in objects.items() if o[0] == "datacenter"]
+
+        for _, _, dc, children in await self._list_children(
+            [("folder", "datacenters", dc) for dc in datacenters]
+        ):
+            for moid, obj in children:
+                found("folder", moid, obj, datacenter=dc)
+        folders = [m for m, o in objects.items() if o[0] == "folder"]
+
+        relations = []
+        for folder in folders:
+            folder_type = objects[folder][2].get("type")
+            for object_type in FOLDER_CHILDREN.get(folder_type, ()):
+                filter_name = "parent_folders" if object_type == "folder" else "folders"
+                relations.append((object_type, filter_name, folder))
+        for object_type, _, folder, children in await self._list_children(relations):
+            for moid, obj in children:
+                found(object_type, moid, obj, folder=folder)
+
+        clusters = [m for m, o in objects.items() if o[0] == "cluster"]
+        relations = [("host", "clusters", c) for c in clusters] + [
+            ("resource_pool", "clusters", c) for c in clusters
+        ]
+        for object_type, _, cluster, children in await self._list_children(relations):
+            for moid, obj in children:
+                found(object_type, moid, obj, cluster=cluster)
+
+        hosts = [m for m, o in objects.items() if o[0] == "host"]
+        relations = [("vm", "hosts", h) for h in hosts] + [
+            ("resource_pool", "hosts", h) for h in hosts
+        ]
+        for object_type, _, host, children in await self._list_children(relations):
+            for moid, obj in children:
+                found(object_type, moid, obj, host=host)
+
+        resource_pools = [m for m, o in objects.items() if o[0] == "resource_pool"]
+        relations = [("vm", "resource_pools", r) for r in resource_pools] + [
+            ("resource_pool", "parent_resource_pools", r) for r in resource_pools
+        ]
+        for object_type, filter_name, rp, children in await self._list_children(
+            relations
+        ):
+            for moid, obj in children:
+                if filter_name == "resource_pools":
+                    found(object_type, moid, obj, resource_pool=rp)
+                else:
+                    found(object_type, moid, obj, parent_resource_pool=rp)
+
+        def datacenter_of(moid):
+            # the objects inherit the datacenter of their folder, cluster or host
+            seen = set()
+            while moid and moid not in seen:
+                seen.add(moid)
+                _parents = parents[moid]
+                if _parents.get("datacenter"):
+                    return _parents["datacenter"]
+                moid = next(
+                    (
+                        _parents[k]
+                        for k in ("folder", "cluster", "host", "parent_resource_pool")
+                        if _parents.get(k) in objects
+                    ),
+                    None,
+                )
+            return None
+
+        for moid, (object_type, name, _) in objects.items():
+            _parents = parents[moid]
+            if object_type == "vm" and not _parents.get("cluster"):
+                # the VMs are listed per host, they are in the cluster of their host
+                _parents["cluster"] = parents[_parents.get("host")].get("cluster")
+            self.add(
+                InventoryRecord(
+                    moid,
+                    name,
+                    object_type,
+                    moid if object_type == "datacenter" else datacenter_of(moid),
+                    _parents.get("folder"),
+                    _parents.get("cluster"),
+                    _parents.get("host"),
+                    _parents.get("resource_pool"),
+                    _parents.get("parent_resource_pool"),
+                )
+            )
+        self.created_at = time.time()
+        if path:
+            self.store(path)
+
+    def parent_of(self, record):
+        """Returns the record of the parent of an object in the paths of the lookups."""
+        if record.object_type == "host":
+            fields = ("cluster", "folder")
+        elif record.object_type == "resource_pool":
+            fields = ("parent_resource_pool", "cluster", "host")
+        else:
+            fields = ("folder",)
+        for field in fields:
+            parent = self._records.get(getattr(record, field))
+            if parent:
+                return parent
+        if record.object_type != "datacenter":
+            return self._records.get(record.datacenter)
+        return None
+
+    def path_of(self, moid):
+        """Returns the path of an object, for example /my_dc/vm/my_folder/my_vm, or None if it is unknown."""
+        record = self._records.get(moid)
+        parts = []
+        while record and record.moid not in parts:
+            parts.append(record.moid)
+            record = self.parent_of(record)
+        if not parts or self._records[parts[-1]].object_type != "datacenter":
+            return None
+        return "/" + "/".join(self._records[m].name for m in reversed(parts))
+
+    def record_field(self, object_type, filter_name):
+        """Returns the field of InventoryRecord that a vCenter filter applies to."""
+        if filter_name == f"{object_type}s":
+            return "moid"
+        return {
+            "names": "name",
+            "datacenters": "datacenter",
+            "folders": "folder",
+            "parent_folders": "folder",
+            "clusters": "cluster",
+            "hosts": "host",
+            "resource_pools": "resource_pool",
+            "parent_resource_pools": "parent_resource_pool",
+        }.get(filter_name)
+
+    async def fetch_object_with_filters(self, object_type, filters):
+        filters = {
+            k: set(v) if isinstance(v, list) else {v}
+            for k, v in self.correct_filter_names(filters, object_type).items()
+            if v
+        }
+        names = filters.pop("names", None)
+        if names is None:
+            candidates = [
+                r for r in self._records.values() if r.object_type == object_type
+            ]
+        else:
+            candidates = [
+                r for name in names for r in self._by_name.get((object_type, name), [])
+            ]
+        fields = [(self.record_field(object_type, k), v) for k, v in filters.items()]
+        return [
+            {object_type: r.moid, "name": r.name}
+            for r in candidates
+            if all(field and getattr(r, field) in v for field, v in fields)
+        ]
 
 
 class Lookup:
@@ -90,33 +599,75 @@ class Lookup:
         self.api = VcenterApi(options["vcenter_hostname"], session)
         self.active_filters = {}
         self.object_type = options["object_type"]
+        self.cache_ttl = options.get("lookup_cache_ttl")
+        self.moid_cache = MoidCache.for_session(session) if self.cache_ttl else None
 
     @classmethod
     async def entry_point(cls, terms, options):
-        if not terms or not terms[0]:
+        session = await cls.get_session(terms, options)
+        try:
+            return await cls.search(terms, options, session)
+        finally:
+            # The session is a SessionView of a pooled session: an expired
+            # pooled session is only closed once all its views are closed.
+            await session.close()
+
+    @classmethod
+    async def search(cls, terms, options, session):
+        lookup = cls(options, session)
+        lookup._options["_terms"] = terms[0]
+        if options.get("inventory_snapshot"):
+            lookup.api = await InventoryIndex.for_session(
+                options["vcenter_hostname"],
+                session,
+                options.get("inventory_snapshot_ttl") or 0,
+                options.get("inventory_snapshot_file"),
+            )
+
+        if options.get("lookup_cache_file"):
+            cache = LookupResultCache(
+                options["lookup_cache_file"], options.get("lookup_cache_file_ttl") or 0
+            )
+            try:
+                return await asyncio.create_task(
+                    lookup.search_for_objects_moid_with_cache(terms, cache)
+                )
+            finally:
+                cache.close()
+
+        task = asyncio.create_task(lookup.search_for_objects_moid_top_down(terms))
+        return await task
+
+    @staticmethod
+    async def get_session(terms, options):
+        if not terms or not all(terms):
             raise AnsibleLookupError(
                 "Option _terms is required but no object has been specified"
             )
-        session = None
         try:
-            session = await open_session(
+            return await open_session(
                 vcenter_hostname=options["vcenter_hostname"],
                 vcenter_username=options["vcenter_username"],
                 vcenter_password=options["vcenter_password"],
                 validate_certs=options.get("vcenter_validate_certs"),
                 log_file=options.get("vcenter_rest_log_file"),
+                connection_limit=options.get("session_connection_limit"),
+                connection_limit_per_host=options.get(
+                    "session_connection_limit_per_host"
+                ),
+                keepalive_timeout=options.get("session_keepalive_timeout"),
+                dns_cache_ttl=options.get("session_dns_cache_ttl"),
+                token_cache=options.get("session_token_cache"),
+                response_cache=options.get("session_cache"),
+                response_cache_ttls=options.get("session_cache_ttls"),
+                retries=options.get("session_retries"),
+                retry_backoff=options.get("session_retry_backoff"),
             )
         except Exception as e:
             raise AnsibleLookupError(
                 f'Unable to connect to vCenter or ESXi API at {options["vcenter_hostname"]}: {to_native(e)}'
             )
 
-        lookup = cls(options, session)
-        lookup._options["_terms"] = terms[0]
-
-        task = asyncio.create_task(lookup.search_for_object_moid_top_down())
-        return await task
-
     async def search_for_object_moid_top_down(self):
         """
         Searches for the lookup term in VSphere. Uses a top down approach to progress
@@ -124,86 +675,404 @@ class Lookup:
         desired object. This guarantees we find the correct object even if multiple have the
         same name, possibly at the cost of performance.
         """
-        object_path = self._options["_terms"]
-        return_all_children = object_path.endswith("/")
-        path_parts = [_part for _part in object_path.split("/") if _part]
+        results = await self.search_for_objects_moid_top_down([self._options["_terms"]])
+        return results[0]
 
-        for index, path_part in enumerate(path_parts):
-            if index == len(path_parts) - 1:
-                # were at the end of the object path. Either return the object, or return
-                # all of the objects it contains (for example, the children inside of a folder)
-                if return_all_children:
-                    await self.process_intermediate_path_part(path_part)
-                    return await self.get_all_children_in_object()
-                else:
-                    return await self.get_object_moid_by_name_and_type(path_part)
+    async def search_for_objects_moid_top_down(self, object_paths, parent_filters=None):
+        """
+        Searches for several lookup terms at once, with the same top down approach as
+        search_for_object_moid_top_down(). The paths are stored in a prefix tree, so a prefix
+        shared by several paths is only resolved once, and the objects with the same parent are
+        searched together, with a single request per object type.
+        Params:
+            object_paths: list, The paths to search for
+            parent_filters: list, Optional list filled with the filters used to search for the object
+                of each path, None for the paths that return a list
+        Returns:
+            list, the result of each path, in the same order
+        """
+        results = [None] * len(object_paths)
+        patterns = []
+        root = _PathNode(None)
+        for index, object_path in enumerate(object_paths):
+            path_parts = [_part for _part in object_path.split("/") if _part]
+            if not path_parts:
+                raise AnsibleLookupError(
+                    "No objects could be found due to an invalid search path"
+                )
+            if any(self.is_pattern(_part) for _part in path_parts):
+                patterns.append(index)
+                continue
+            node = root
+            for path_part in path_parts:
+                node = node.children.setdefault(path_part, _PathNode(path_part))
+            if object_path.endswith("/"):
+                # we want all of the objects it contains (for example, the children inside of a folder)
+                node.children_of.append(index)
+            else:
+                node.moid_of.append(index)
+
+        _, *matches = await asyncio.gather(
+            self.resolve_path_tree(root, results, parent_filters),
+            *[
+                self.search_for_objects_moid_by_pattern(object_paths[index])
+                for index in patterns
+            ],
+        )
+        for index, moids in zip(patterns, matches):
+            results[index] = moids
+        return results
+
+    async def resolve_path_tree(self, root, results, parent_filters=None):
+        """
+        Resolves the prefix tree of search_for_objects_moid_top_down() level by level, and stores
+        the result of each path in results, and the filters of its parent in parent_filters.
+        """
+        level = [root]
+        while level:
+            await asyncio.gather(*[self.resolve_children(node) for node in level])
+            next_level = []
+            listings = []
+            for node in level:
+                for child in node.children.values():
+                    for index in child.moid_of:
+                        results[index] = child.moid
+                        if parent_filters is not None:
+                            parent_filters[index] = node.filters
+                    if child.filters is None:
+                        # nothing can be found below a part that does not exist
+                        self.set_missing_results(child, results)
+                        continue
+                    if child.children_of:
+                        listings.append(child)
+                    if child.children:
+                        next_level.append(child)
+            children = await asyncio.gather(
+                *[self.get_all_children_in_object(node.filters) for node in listings]
+            )
+            for node, node_children in zip(listings, children):
+                for index in node.children_of:
+                    results[index] = node_children
+            level = next_level
+
+    @staticmethod
+    def set_missing_results(node, results):
+        """Sets the results of the paths below a node of the prefix tree that was not found."""
+        for index in node.children_of:
+            results[index] = []
+        for child in node.children.values():
+            for index in child.moid_of:
+                results[index] = None
+            Lookup.set_missing_results(child, results)
+
+    @staticmethod
+    def is_pattern(path_part):
+        return any(wildcard in path_part for wildcard in PATH_WILDCARDS)
 
+    async def search_for_objects_moid_by_pattern(self, object_path):
+        """
+        Searches for the objects of a path with wildcards, for example /my_dc/vm/web-*/ or
+        /my_dc/host/cluster-*/esx??. The path is resolved level by level: the children of all of
+        the parents that matched the previous part are listed concurrently, with a single request
+        per parent and object type, and their names are matched locally.
+        Params:
+            object_path: str, The path to search for
+        Returns:
+            list, the MoIDs of the matching objects
+        """
+        path_parts = [_part for _part in object_path.split("/") if _part]
+        if not object_path.endswith("/"):
+            path_parts, last_part = path_parts[:-1], path_parts[-1]
+
+        parents = [{}]
+        for path_part in path_parts:
+            if self.is_pattern(path_part):
+                resolved = await asyncio.gather(
+                    *[
+                        self.match_intermediate_path_parts(path_part, filters)
+                        for filters in parents
+                    ]
+                )
+                parents = [
+                    _filters for _resolved in resolved for _, _filters in _resolved
+                ]
             else:
-                # were in the middle of an object path, lookup the object at this level
-                # and add it to the filters for the next round of searching
-                await self.process_intermediate_path_part(path_part)
+                resolved = await asyncio.gather(
+                    *[
+                        self.resolve_intermediate_path_parts([path_part], filters)
+                        for filters in parents
+                    ]
+                )
+                # a part that does not exist matches nothing
+                parents = [
+                    _resolved[path_part][1]
+                    for _resolved in resolved
+                    if _resolved[path_part][1] is not None
+                ]
+
+        if object_path.endswith("/"):
+            children = await asyncio.gather(
+                *[self.get_all_children_in_object(filters) for filters in parents]
+            )
+        elif self.is_pattern(last_part):
+            matches = await asyncio.gather(
+                *[
+                    self.get_object_moids_by_pattern_and_type(
+                        last_part, filters=filters
+                    )
+                    for filters in parents
+                ]
+            )
+            children = [[moid for moid, _ in _matches] for _matches in matches]
+        else:
+            moids = await asyncio.gather(
+                *[
+                    self.get_object_moids_by_names_and_type(
+                        [last_part], filters=filters
+                    )
+                    for filters in parents
+                ]
+            )
+            children = [[_moids[last_part]] for _moids in moids]
+        return list(
+            dict.fromkeys(
+                moid for _children in children for moid in _children or () if moid
+            )
+        )
+
+    async def search_for_objects_moid_with_cache(self, object_paths, cache):
+        """
+        Searches for several lookup terms like search_for_objects_moid_top_down(), but starts with
+        the MoIDs of a LookupResultCache. The cached MoIDs are validated with their name and the
+        filters of their parent, so an object that was renamed, moved or deleted is searched again.
+        Params:
+            object_paths: list, The paths to search for
+            cache: LookupResultCache, The results of the previous runs
+        Returns:
+            list, the result of each path, in the same order
+        """
+        hostname = self._options["vcenter_hostname"]
+        results = await self.validate_cached_moids(
+            cache.get(hostname, self.object_type, object_paths)
+        )
+        todo = [path for path in dict.fromkeys(object_paths) if path not in results]
+        if todo:
+            parent_filters = [None] * len(todo)
+            found = await self.search_for_objects_moid_top_down(todo, parent_filters)
+            results.update(zip(todo, found))
+            cache.put(
+                hostname,
+                self.object_type,
+                [
+                    (path, moid, path.split("/")[-1], filters)
+                    for path, moid, filters in zip(todo, found, parent_filters)
+                    if moid and filters is not None
+                ],
+            )
+        return [results[path] for path in object_paths]
+
+    async def validate_cached_moids(self, entries):
+        """
+        Checks that the cached objects still have the same name and parent. The objects with the
+        same parent are checked together, with their MoIDs and names in the filters of a single request.
+        Params:
+            entries: dict, the (MoID, name, parent filters) tuple of each path
+        Returns:
+            dict, the MoID of each path that is still valid
+        """
+        groups = collections.defaultdict(list)
+        for path, (moid, name, filters) in entries.items():
+            groups[json.dumps(filters, sort_keys=True)].append((path, moid, name))
+
+        requests = []
+        for filters, group in groups.items():
+            for i in range(0, len(group), LOOKUP_NAMES_PER_REQUEST):
+                chunk = group[i : i + LOOKUP_NAMES_PER_REQUEST]
+                names = {urllib.parse.unquote(name) for _, _, name in chunk}
+                names.update(name for _, _, name in chunk)
+                _filters = dict(json.loads(filters), names=sorted(names))
+                _filters[f"{self.object_type}s"] = [moid for _, moid, _ in chunk]
+                requests.append((chunk, _filters))
+        results = await asyncio.gather(
+            *[
+                self.api.fetch_object_with_filters(self.object_type, _filters)
+                for _, _filters in requests
+            ]
+        )
+
+        valid = {}
+        for (chunk, _), result in zip(requests, results):
+            if not isinstance(result, list):
+                # the MoIDs are searched again
                 continue
+            found = {(obj[self.object_type], obj["name"]) for obj in result}
+            for path, moid, name in chunk:
+                if {(moid, name), (moid, urllib.parse.unquote(name))} & found:
+                    valid[path] = moid
+        return valid
 
-        raise AnsibleLookupError(
-            "No objects could be found due to an invalid search path"
+    async def resolve_children(self, node):
+        """
+        Resolves the children of a node of the path tree. The objects in the middle of a path
+        are searched with resolve_intermediate_path_parts(), the objects at the end of a path
+        with get_object_moids_by_names_and_type().
+        """
+        intermediate = [
+            c.name for c in node.children.values() if c.children or c.children_of
+        ]
+        final = [c.name for c in node.children.values() if c.moid_of]
+        resolved, moids = await asyncio.gather(
+            self.resolve_intermediate_path_parts(intermediate, node.filters),
+            self.get_object_moids_by_names_and_type(final, filters=node.filters),
         )
+        for name, child in node.children.items():
+            if name in resolved:
+                child.filters = resolved[name][1]
+            if child.moid_of:
+                child.moid = moids[name]
 
     async def process_intermediate_path_part(self, intermediate_object_name):
         """
-        Finds and returns the MoID for an object in the middle of a search path. Different vSphere objects can be
-        children of other types of vSphere objects.
-          - VMs could be in a resource pool, a host, or a folder
-          - Networks could be in a host, or in a folder
-          - Hosts could be in a cluster, or in a folder
-          - Datastores could in a host, or in a folder
-          - Resource pools could be in a cluster, or a host
-        We start with the most restrictive searches and progressively expand the search area until something is found.
-        We also update the filters to include the proper object filter for the next round of searches.
+        Finds and returns the MoID for an object in the middle of a search path, and updates
+        the active filters for the next round of searches.
         Params:
             intermediate_object_name: str, The name of the current object to search for
         Returns:
             str or None, a single MoID or none if nothing was found
         """
-        if not self.active_filters.get("datacenter"):
-            result = await self.get_object_moid_by_name_and_type(
-                intermediate_object_name, "datacenter"
-            )
-            self.active_filters["datacenters"] = result
-            return result
+        resolved = await self.resolve_intermediate_path_parts(
+            [intermediate_object_name], self.active_filters
+        )
+        result, self.active_filters = resolved[intermediate_object_name]
+        return result
 
-        if self.object_type == "vm":
-            result = await self.get_object_moid_by_name_and_type(
-                intermediate_object_name, "resource_pool"
-            )
-            if result:
-                self.set_new_filters_with_datacenter({"resource_pools": result})
-                return result
+    async def resolve_intermediate_path_parts(self, intermediate_object_names, filters):
+        """
+        Finds the MoIDs of objects in the middle of a search path, with the same parent. Different
+        vSphere objects can be children of other types of vSphere objects.
+          - VMs could be in a resource pool, a cluster, a host, or a folder
+          - Networks could be in a cluster, a host, or in a folder
+          - Hosts could be in a cluster, or in a folder
+          - Datastores could in a cluster, a host, or in a folder
+          - Resource pools could be in a cluster, a host, another resource pool or a folder
+        The candidate types are searched concurrently, the most restrictive one that matches wins (see PARENT_TYPES).
+        We also compute the filters to use for the next round of searches. A name that is not found
+        has no filters, nothing can be found below it.
+        Params:
+            intermediate_object_names: list, The names of the objects to search for
+            filters: dict, The filters of their parent
+        Returns:
+            dict, the (MoID, filters for the next round) tuple of each name, (None, None) if it is not found
+        """
+        if not intermediate_object_names:
+            return {}
 
-        if self.object_type in ("host", "resource_pool"):
-            result = await self.get_object_moid_by_name_and_type(
-                intermediate_object_name, "cluster"
+        if not filters.get("datacenters"):
+            moids = await self.get_object_moids_by_names_and_type(
+                intermediate_object_names, "datacenter"
             )
-            if result:
-                self.set_new_filters_with_datacenter({"clusters": result})
-                return result
+            return {
+                name: (moid, dict(filters, datacenters=moid)) if moid else (None, None)
+                for name, moid in moids.items()
+            }
 
-        if self.object_type in ("vm", "network", "datastore", "resource_pool"):
-            result = await self.get_object_moid_by_name_and_type(
-                intermediate_object_name, "host"
-            )
-            if result:
-                self.set_new_filters_with_datacenter({"hosts": result})
-                return result
+        candidates = self.get_parent_type_candidates(filters)
+        results = await asyncio.gather(
+            *[
+                self.get_object_moids_by_names_and_type(
+                    intermediate_object_names,
+                    _object_type,
+                    filters,
+                    unique=filter_name is not None,
+                )
+                for _object_type, filter_name in candidates
+            ],
+            return_exceptions=True,
+        )
+        resolved = {}
+        for name in intermediate_object_names:
+            for (_object_type, filter_name), result in zip(candidates, results):
+                # an error only matters if no candidate of higher precedence matched
+                if isinstance(result, BaseException):
+                    raise result
+                if result[name]:
+                    resolved[name] = (
+                        result[name],
+                        self.filters_of_children(filters, filter_name, result[name]),
+                    )
+                    break
+            else:
+                resolved[name] = (None, None)
+        return resolved
 
-        # resource pools cant continue past this point
-        if self.object_type == "resource_pool":
-            return None
+    async def match_intermediate_path_parts(self, pattern, filters):
+        """
+        Finds the objects in the middle of a search path whose name matches a pattern, like
+        resolve_intermediate_path_parts() does for a name. When objects of several candidate
+        types have the same name, the type with the highest precedence wins.
+        Params:
+            pattern: str, The pattern of the names of the objects to search for
+            filters: dict, The filters of their parent
+        Returns:
+            list, the (MoID, filters for the next round) tuple of each matching object
+        """
+        if not filters.get("datacenters"):
+            matches = await self.get_object_moids_by_pattern_and_type(
+                pattern, "datacenter"
+            )
+            return [(moid, dict(filters, datacenters=moid)) for moid, _ in matches]
 
-        result = await self.get_object_moid_by_name_and_type(
-            intermediate_object_name, "folder"
+        candidates = self.get_parent_type_candidates(filters)
+        results = await asyncio.gather(
+            *[
+                self.get_object_moids_by_pattern_and_type(
+                    pattern, _object_type, filters
+                )
+                for _object_type, _ in candidates
+            ]
         )
-        self.set_new_filters_with_datacenter({"parent_folders": result})
-        return result
+        resolved = []
+        name_types = {}
+        for (_object_type, filter_name), matches in zip(candidates, results):
+            for moid, name in matches:
+                if name_types.setdefault(name, _object_type) == _object_type:
+                    resolved.append(
+                        (moid, self.filters_of_children(filters, filter_name, moid))
+                    )
+        return resolved
+
+    def get_parent_type_candidates(self, filters):
+        """
+        Returns the (object type, filter name) of the types of object that can contain the
+        lookup type, and that can be searched for with the filters of their parent. They are
+        followed by the types of PASS_THROUGH_TYPES, with None as filter name.
+        """
+        parent_filters = {k for k, v in filters.items() if v} - {"names"}
+        pass_through = PASS_THROUGH_TYPES.get(self.object_type, ())
+        candidates = [
+            (_object_type, filter_name)
+            for _object_type, filter_name, children, supported_filters in PARENT_TYPES
+            if self.object_type in children and parent_filters <= supported_filters
+        ]
+        return candidates + [
+            (_object_type, None)
+            for _object_type, _, _, supported_filters in PARENT_TYPES
+            if _object_type in pass_through and parent_filters <= supported_filters
+        ]
+
+    @classmethod
+    def filters_of_children(cls, filters, filter_name, moid):
+        """
+        Returns the filters of the next round of searches, below an object in the middle of a path.
+        Params:
+            filters: dict, The filters of the parent of the object
+            filter_name: str, The filter set by the type of the object, None for a pass-through type
+            moid: str, The MoID of the object
+        """
+        if filter_name is None:
+            # the object does not contain the lookup type, neither does its folder
+            return {k: v for k, v in filters.items() if k != "parent_folders"}
+        return cls.filters_with_datacenter(filters, {filter_name: moid})
 
     async def get_object_moid_by_name_and_type(self, object_name, _object_type=None):
         """
@@ -215,21 +1084,119 @@ class Lookup:
         Returns:
             str, a single MoID
         """
+        moids = await self.get_object_moids_by_names_and_type(
+            [object_name], _object_type
+        )
+        return moids[object_name]
+
+    async def get_object_moids_by_names_and_type(
+        self, object_names, _object_type=None, filters=None, unique=True
+    ):
+        """
+        Returns the MoIDs of objects with a specific type and filter set, and the given names. The
+        names are sent together in the 'names' filter of the request, LOOKUP_NAMES_PER_REQUEST at a time.
+        Params:
+            object_names: list, the names of the objects to search for
+            _object_type: str, Optional name of the object type to search for. Defaults to the lookup plugin type
+            filters: dict, Optional filters of the request. Defaults to the active filters
+            unique: bool, Optional, if False the first of several objects with the same name is returned
+                instead of an error, and the result is not cached
+        Returns:
+            dict, the MoID (or None) of each name
+        """
         if not _object_type:
             _object_type = self.object_type
 
         if _object_type == "datacenter":
             _filters = {"folders": "group-d1"}
         else:
-            _filters = self.active_filters
+            _filters = self.active_filters if filters is None else filters
+        _filters = {k: v for k, v in _filters.items() if k != "names"}
 
-        _filters["names"] = object_name
-        _result = await self.api.fetch_object_with_filters(_object_type, _filters)
+        moids = {}
+        todo = []
+        for object_name in dict.fromkeys(object_names):
+            if self.moid_cache and unique:
+                found, moids[object_name] = self.moid_cache.get(
+                    MoidCache.key(_object_type, object_name, _filters)
+                )
+                if found:
+                    continue
+            todo.append(object_name)
 
-        object_moid = self.get_single_moid_from_result(
-            _result, _object_type, object_name
+        chunks = [
+            todo[i : i + LOOKUP_NAMES_PER_REQUEST]
+            for i in range(0, len(todo), LOOKUP_NAMES_PER_REQUEST)
+        ]
+        results = await asyncio.gather(
+            *[
+                self.api.fetch_object_with_filters(
+                    _object_type, dict(_filters, names=chunk)
+                )
+                for chunk in chunks
+            ]
         )
-        return object_moid
+        for chunk, _result in zip(chunks, results):
+            if not isinstance(_result, list):
+                raise AnsibleLookupError(
+                    f"Unable to search for the {_object_type} objects with the filters {_filters}: {_result}"
+                )
+            for object_name in chunk:
+                names = (object_name, urllib.parse.unquote(object_name))
+                matching = [obj for obj in _result if obj.get("name") in names]
+                if not unique:
+                    moids[object_name] = next(
+                        (obj[_object_type] for obj in matching), None
+                    )
+                    continue
+                moids[object_name] = self.get_single_moid_from_result(
+                    matching, _object_type, object_name
+                )
+                if self.moid_cache:
+                    self.moid_cache.put(
+                        MoidCache.key(_object_type, object_name, _filters),
+                        moids[object_name],
+                        self.cache_ttl,
+                    )
+        return moids
+
+    async def get_object_moids_by_pattern_and_type(
+        self, pattern, _object_type=None, filters=None
+    ):
+        """
+        Returns the objects with a specific type and filter set, whose name matches a pattern. The
+        objects are listed with a single request, and their names are matched locally.
+        Params:
+            pattern: str, the pattern of the names, with the * and ? wildcards
+            _object_type: str, Optional name of the object type to search for. Defaults to the lookup plugin type
+            filters: dict, Optional filters of the request. Defaults to the active filters
+        Returns:
+            list, the (MoID, name) tuple of each matching object
+        """
+        if not _object_type:
+            _object_type = self.object_type
+
+        if _object_type == "datacenter":
+            _filters = {"folders": "group-d1"}
+        else:
+            _filters = self.active_filters if filters is None else filters
+        _filters = {k: v for k, v in _filters.items() if k != "names"}
+
+        result = await self.api.fetch_object_with_filters(_object_type, _filters)
+        if not isinstance(result, list):
+            raise AnsibleLookupError(
+                f"Unable to list the {_object_type} objects with the filters {_filters}: {result}"
+            )
+        # only the wildcards of PATH_WILDCARDS are supported, [ is a regular character
+        patterns = {
+            _pattern.replace("[", "[[]")
+            for _pattern in (pattern, urllib.parse.unquote(pattern))
+        }
+        return [
+            (obj[_object_type], obj["name"])
+            for obj in result
+            if any(fnmatch.fnmatchcase(obj["name"], _pattern) for _pattern in patterns)
+        ]
 
     @staticmethod
     def get_single_moid_from_result(result, object_type, object_name=None):
@@ -242,6 +1209,10 @@ class Lookup:
         Returns:
             str or None, a single MoID or none if nothing was found
         """
+        if not isinstance(result, (list, type(None))):
+            raise AnsibleLookupError(
+                f"Unable to search for the {object_type} {object_name}: {result}"
+            )
         if not result or not object_name:
             return None
 
@@ -268,16 +1239,32 @@ class Lookup:
         except (TypeError, KeyError, IndexError) as e:
             raise AnsibleLookupError(to_native(e))
 
-    async def get_all_children_in_object(self):
-        results = await self.api.fetch_object_with_filters(
-            self.object_type, self.active_filters
-        )
+    async def get_all_children_in_object(self, filters=None):
+        _filters = self.active_filters if filters is None else filters
+        results = await self.api.fetch_object_with_filters(self.object_type, _filters)
+        if not isinstance(results, list):
+            raise AnsibleLookupError(
+                f"Unable to list the {self.object_type} objects with the filters {_filters}: {results}"
+            )
 
         try:
             return [result[self.object_type] for result in results]
         except KeyError:
             return None
 
+    @staticmethod
+    def filters_with_datacenter(filters, new_filters):
+        """
+        Returns the new filters, with the datacenter filter of the current filters since that is always used.
+        Params:
+            filters: dict, The current filters
+            new_filters: dict, The new filters you want to apply as active
+        """
+        _dc = filters.get("datacenters")
+        if _dc:
+            new_filters["datacenters"] = _dc
+        return new_filters
+
     def set_new_filters_with_datacenter(self, new_filters):
         """
         Deletes filter key value pairs from the active filter dict and replaces them with the new filters.
@@ -285,7 +1272,38 @@ class Lookup:
         Params:
             new_filters: dict, The new filters you want to apply as active
         """
-        _dc = self.active_filters.get("datacenters")
-        self.active_filters = new_filters
-        if _dc:
-            self.active_filters["datacenters"] = _dc
+        self.active_filters = self.filters_with_datacenter(
+            self.active_filters, new_filters
+        )
+
+
+class ReverseLookup:
+    @classmethod
+    async def entry_point(cls, terms, options):
+        """Returns the path of each MoID of terms, from an InventoryIndex of the vCenter."""
+        session = await Lookup.get_session(terms, options)
+        try:
+            index = await InventoryIndex.for_session(
+                options["vcenter_hostname"],
+                session,
+                options.get("inventory_snapshot_ttl") or 0,
+                options.get("inventory_snapshot_file"),
+            )
+        finally:
+            await session.close()
+        return [index.path_of(moid) for moid in terms]
+
+
+class _PathNode:
+    """A part of the searched paths, in the prefix tree of Lookup.search_for_objects_moid_top_down()."""
+
+    def __init__(self, name):
+        self.name = name
+        self.children = {}
+        # the filters to search for the children of the node
+        self.filters = {}
+        self.moid = None
+        # the index of the paths that end with the node, and of the paths that
+        # end with the node and a trailing /
+        self.moid_of = []
+        self.children_of = []
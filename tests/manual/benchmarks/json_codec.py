@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""Compare the decode throughput of the JSON codecs on a vcenter_vm_info answer.
+
+The script builds a synthetic answer with the details of 10k VMs and
+decodes it with the stdlib json module and with the codec selected by
+module_utils/vmware_rest.py (orjson when it is installed).
+
+Usage: python tests/manual/benchmarks/json_codec.py [VM_COUNT]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "plugins"))
+
+from module_utils.vmware_rest import json_dumps, json_loads  # noqa: E402
+
+
+def vm_details(index):
+    return {
+        "vm": f"vm-{index}",
+        "name": f"test_vm{index}",
+        "power_state": "POWERED_ON",
+        "guest_OS": "RHEL_8_64",
+        "cpu": {"count": 2, "cores_per_socket": 1, "hot_add_enabled": False},
+        "memory": {"size_MiB": 4096, "hot_add_enabled": True},
+        "disks": {
+            str(16000 + d): {
+                "label": f"Hard disk {d + 1}",
+                "type": "SCSI",
+                "capacity": 16106127360,
+                "backing": {
+                    "type": "VMDK_FILE",
+                    "vmdk_file": f"[datastore1] test_vm{index}/disk{d}.vmdk",
+                },
+                "scsi": {"bus": 0, "unit": d},
+            }
+            for d in range(2)
+        },
+        "nics": {
+            "4000": {
+                "label": "Network adapter 1",
+                "type": "VMXNET3",
+                "mac_address": "00:50:56:b1:%02x:%02x"
+                % (index // 256 % 256, index % 256),
+                "backing": {"type": "STANDARD_PORTGROUP", "network": "network-1041"},
+                "state": "CONNECTED",
+            }
+        },
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    body = json.dumps([vm_details(i) for i in range(count)]).encode()
+    size_mb = len(body) / 1024 / 1024
+    print(f"answer: {count} VMs, {size_mb:.1f} MB, codec: {json_loads.__module__}")
+    for name, loads in (("json", json.loads), ("module_utils", json_loads)):
+        best = min(timeit.repeat(lambda: loads(body), number=1, repeat=5))
+        print(f"decode {name:>12}: {best * 1000:8.1f} ms, {size_mb / best:8.1f} MB/s")
+    document = json.loads(body)
+    for name, dumps in (("json", json.dumps), ("module_utils", json_dumps)):
+        best = min(timeit.repeat(lambda: dumps(document), number=1, repeat=5))
+        print(f"encode {name:>12}: {best * 1000:8.1f} ms, {size_mb / best:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
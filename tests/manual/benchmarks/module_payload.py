@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""Measure the AnsiballZ payload and the start-up time of the modules.
+
+The payload is built by ansible-core exactly like when a task runs. The
+start-up time covers the compilation of the module source, the import of its
+module_utils and the creation of its argument_spec, this is what the module
+does before it sends its first request.
+
+The collection and its dependencies (cloud.common) must be installed in one
+of the directories of ANSIBLE_COLLECTIONS_PATH.
+
+Usage: ANSIBLE_COLLECTIONS_PATH=~/.ansible/collections \
+    python tests/manual/benchmarks/module_payload.py
+"""
+
+import glob
+import os
+import statistics
+import time
+
+from ansible.executor import module_common
+from ansible.parsing.dataloader import DataLoader
+from ansible.template import Templar
+from ansible.utils.collection_loader._collection_finder import (
+    _AnsibleCollectionFinder,
+)
+
+MODULES = sorted(
+    glob.glob(
+        os.path.join(
+            os.path.dirname(__file__), "..", "..", "..", "plugins", "modules", "*.py"
+        )
+    )
+)
+
+
+def payload_size(templar, path):
+    name = os.path.basename(path)[:-3]
+    built = module_common.modify_module(
+        module_name=f"vmware.vmware_rest.{name}",
+        module_path=path,
+        module_args={},
+        templar=templar,
+        task_vars={"ansible_python_interpreter": "/usr/bin/python3"},
+        module_compression="ZIP_DEFLATED",
+    )
+    return len(built.b_module_data)
+
+
+def startup_time(paths, rounds=3):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for path in paths:
+            with open(path) as fd:
+                code = compile(fd.read(), path, "exec")
+            module_globals = {"__name__": "benchmark"}
+            exec(code, module_globals)
+            module_globals["prepare_argument_spec"]()
+        timings.append((time.perf_counter() - start) / len(paths))
+    return min(timings)
+
+
+def main():
+    paths = os.environ.get("ANSIBLE_COLLECTIONS_PATH", "").split(os.pathsep)
+    _AnsibleCollectionFinder(paths=[p for p in paths if p])._install()
+    templar = Templar(loader=DataLoader())
+
+    sizes = [payload_size(templar, path) for path in MODULES]
+    print(f"modules: {len(MODULES)}")
+    print(f"source: {sum(os.path.getsize(p) for p in MODULES)} bytes")
+    print(
+        f"AnsiballZ payload: {sum(sizes)} bytes, {statistics.mean(sizes):.0f} per module"
+    )
+    print(f"start-up: {startup_time(MODULES) * 1000:.2f}ms per module")
+
+
+if __name__ == "__main__":
+    main()
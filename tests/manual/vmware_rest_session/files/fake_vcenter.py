@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""A fake vCenter to test the session handling of the modules.
+
+The server only knows the datacenters. The /fake end-points configure the
+faults to inject and return what the server has received:
+
+- POST /fake/reset: forget the requests and the logins, the JSON body sets
+  the faults:
+    - token_uses: the number of requests a session id is valid for, then
+      the server answers 401,
+    - failures: the status codes of the next answers,
+    - retry_after: the Retry-After header of these answers,
+    - delay: the seconds to wait before each answer.
+- GET /fake/stats: the number of logins and the requests received.
+- POST /fake/stop: stop the server.
+
+Usage: fake_vcenter.py PORT CERT_FILE KEY_FILE
+"""
+
+import asyncio
+import json
+import ssl
+import sys
+import time
+import uuid
+
+from aiohttp import web
+
+
+def json_response(data, status=200):
+    # The modules compare the Content-Type with "application/json", aiohttp
+    # would add a charset.
+    return web.Response(
+        body=json.dumps(data).encode(),
+        status=status,
+        headers={"Content-Type": "application/json"},
+    )
+
+
+class FakeVCenter:
+    def __init__(self):
+        self.datacenters = {"datacenter-1": "dc1"}
+        self.reset({})
+
+    def reset(self, faults):
+        self.tokens = {}
+        self.logins = 0
+        self.requests = []
+        self.token_uses = faults.get("token_uses")
+        self.failures = list(faults.get("failures", []))
+        self.retry_after = faults.get("retry_after")
+        self.delay = faults.get("delay", 0)
+
+    async def login(self, request):
+        self.logins += 1
+        token = uuid.uuid4().hex
+        self.tokens[token] = self.token_uses
+        return json_response({"value": token})
+
+    async def api(self, request):
+        record = {
+            "method": request.method,
+            "path": request.path_qs,
+            "time": time.time(),
+        }
+        self.requests.append(record)
+        response = await self.answer(request)
+        record["status"] = response.status
+        return response
+
+    async def answer(self, request):
+        token = request.headers.get("vmware-api-session-id")
+        if token not in self.tokens or self.tokens[token] == 0:
+            return json_response({"error_type": "UNAUTHENTICATED"}, status=401)
+        if self.tokens[token] is not None:
+            self.tokens[token] -= 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.failures:
+            headers = {}
+            if self.retry_after is not None:
+                headers["Retry-After"] = str(self.retry_after)
+            return web.Response(status=self.failures.pop(0), headers=headers)
+
+        parts = request.path.split("/")[3:]
+        if parts[:1] != ["datacenter"]:
+            return json_response({"error_type": "NOT_FOUND"}, status=404)
+        if request.method == "GET" and len(parts) == 1:
+            names = request.query.getall("names", [])
+            return json_response(
+                [
+                    {"datacenter": moid, "name": name}
+                    for moid, name in self.datacenters.items()
+                    if not names or name in names
+                ]
+            )
+        if request.method == "GET" and parts[1] in self.datacenters:
+            return json_response({"name": self.datacenters[parts[1]]})
+        if request.method == "POST" and len(parts) == 1:
+            moid = f"datacenter-{len(self.datacenters) + 1}"
+            self.datacenters[moid] = (await request.json())["name"]
+            return json_response(moid, status=201)
+        if request.method == "DELETE" and parts[1] in self.datacenters:
+            del self.datacenters[parts[1]]
+            return web.Response(status=204)
+        return json_response({"error_type": "NOT_FOUND"}, status=404)
+
+    async def fake_reset(self, request):
+        self.reset(await request.json())
+        return json_response({})
+
+    async def fake_stats(self, request):
+        return json_response({"logins": self.logins, "requests": self.requests})
+
+    async def fake_stop(self, request):
+        asyncio.get_running_loop().call_later(0.1, sys.exit, 0)
+        return json_response({})
+
+
+def main():
+    port, cert_file, key_file = sys.argv[1:4]
+    fake = FakeVCenter()
+    app = web.Application()
+    app.router.add_post("/rest/com/vmware/cis/session", fake.login)
+    app.router.add_post("/fake/reset", fake.fake_reset)
+    app.router.add_get("/fake/stats", fake.fake_stats)
+    app.router.add_post("/fake/stop", fake.fake_stop)
+    app.router.add_route("*", "/api/vcenter/{tail:.*}", fake.api)
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ssl_context.load_cert_chain(cert_file, key_file)
+    web.run_app(
+        app, host="127.0.0.1", port=int(port), ssl_context=ssl_context, print=None
+    )
+
+
+if __name__ == "__main__":
+    main()
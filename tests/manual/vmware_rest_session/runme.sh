@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+source ../init.sh
+
+exec ansible-playbook run.yml